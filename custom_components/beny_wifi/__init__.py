@@ -3,6 +3,7 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.storage import Store
 from .const import (
     CONF_ANTI_OVERLOAD,
     CONF_ANTI_OVERLOAD_VALUE,
@@ -27,9 +28,16 @@ from .const import (
     SECTION_DEVICE,
     SECTION_CURRENT_LIMITS,
     SECTION_DLB,
+    POLL_MAX_IN_FLIGHT,
+    POLL_SCHEDULER,
+    SNAPSHOT_STORAGE_VERSION,
+    DLB_CONFIG_STORAGE_VERSION,
+    TRANSPORT_HUB,
     get_config_parameter
 )
 from .coordinator import BenyWifiUpdateCoordinator
+from .scheduler import BenyWifiPollScheduler
+from .transport import BenyWifiTransportHub
 from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
@@ -53,16 +61,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     scan_interval = get_config_parameter(entry, SECTION_CONNECTION, SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
     _LOGGER.info(f"Using scan interval: {scan_interval} seconds")
     
+    # All chargers share one UDP endpoint and their polls are spread over the interval
+    hub = hass.data.setdefault(TRANSPORT_HUB, BenyWifiTransportHub())
+    scheduler = hass.data.setdefault(POLL_SCHEDULER, BenyWifiPollScheduler(POLL_MAX_IN_FLIGHT))
     # FIXED: Pass entry as the second parameter
-    coordinator = BenyWifiUpdateCoordinator(hass, entry, ip_address, port, scan_interval)
+    coordinator = BenyWifiUpdateCoordinator(hass, entry, ip_address, port, scan_interval, hub, scheduler)
+    await coordinator.async_load_dlb_config()
     
-    # Perform the first update to ensure connection works
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as ex:
-        _LOGGER.error(f"Error setting up coordinator: {ex}")
-        raise ConfigEntryNotReady from ex
+    # Set up from the data saved by the previous run and poll the charger in the
+    # background, so a slow or sleeping charger does not hold up startup.
+    # Without saved data the first update has to succeed to know the charger works.
+    if await coordinator.async_restore_snapshot():
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception as ex:
+            _LOGGER.error(f"Error setting up coordinator: {ex}")
+            raise ConfigEntryNotReady from ex
     
+    scheduler.register(coordinator)
+
+    # Keep the coordinator's cached request frames in sync with entry updates
+    entry.async_on_unload(entry.add_update_listener(coordinator.async_config_entry_updated))
+
     # Store the coordinator for use by platforms
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
@@ -86,10 +110,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     # Clean up resources
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await entry_data["coordinator"].async_shutdown()
     
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the data saved for a config entry."""
+    await Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
+    await Store(hass, DLB_CONFIG_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.dlb_config").async_remove()
+
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", config_entry.version)
@@ -39,7 +39,7 @@ class BenyWifiBinarySensor(CoordinatorEntity, BinarySensorEntity):
 
     def __init__(self, coordinator, key, device_class, serial, device_model, icon=None):
         """Initialize the binary sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=key)
         self.coordinator = coordinator
         self.key = key
         self._attr_translation_key = key
@@ -82,11 +82,15 @@ class BenyWifiSendMaxCurrentButton(BenyWifiBaseButton):
 
     async def async_press(self) -> None:
         """Handle the button press - send current max_current value to device."""
+        # Send a value still waiting for the write delay right away
+        if await self.coordinator.async_flush_write("max_current_control"):
+            return
+
         # Find entity from entity registry
         number_state = get_entity_state_by_key(self.hass, self._config_entry, "max_current_control", "number")
         
         if number_state is None or number_state.state in ("unknown", "unavailable"):
-            _LOGGER.error("Number entity %s has no valid state", number_entity_id)
+            _LOGGER.error("Number entity max_current_control has no valid state")
             return
         
         try:
@@ -112,7 +116,7 @@ class BenyWifiSendMaxCurrentButton(BenyWifiBaseButton):
             
         except (ValueError, TypeError) as e:
             _LOGGER.error(
-                f"Error converting max current value from {number_entity_id}: "
+                f"Error converting max current value from max_current_control: "
                 f"state={number_state.state}, error: {e}"
             )
 
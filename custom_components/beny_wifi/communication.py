@@ -1,21 +1,21 @@
-import logging  # noqa: D100
+from binascii import unhexlify  # noqa: D100
+from functools import lru_cache
+import logging
+import re
 
 from .const import (  # noqa: D100
     CHARGER_COMMAND,
     CHARGER_STATE,
     CLIENT_MESSAGE,
-    COMMON,
     REQUEST_TYPE,
     SERVER_MESSAGE,
     TIMER_STATE,
-    calculate_checksum,
-    validate_checksum,
 )
 from .conversions import (  # type: ignore  # noqa: PGH003
     convert_weekdays_to_dict,
-    get_ip,
-    get_message_type,
+    get_message_type,  # noqa: F401
     get_model,
+    lookup_message_type,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -32,11 +32,171 @@ _DLB_SENTINEL_THRESHOLD = 0xFF00
 _DLB_POWER_DIVISOR = 100
 
 
-def read_message(data, msg_type:str | None = None) -> dict:  # noqa: C901
+# Field converters used by the compiled decoders. Each one stores a decoded
+# field into the message dict: converter(msg, param, value).
+def _store_int(msg: dict, param: str, value: int) -> None:
+    msg[param] = value
+
+
+def _store_enum_name(enum, strict: bool = False):
+    """Return a converter storing the enum member name.
+
+    Unknown values are stored as None, or raise ValueError if strict.
+    """
+    names = {member.value: member.name for member in enum}
+
+    def store(msg: dict, param: str, value: int) -> None:
+        name = names.get(value)
+        if name is None:
+            if strict:
+                raise ValueError(f"{value} is not a valid {enum.__name__}")
+            _LOGGER.error(f"Invalid value for {param}: {value}")  # noqa: G004
+        msg[param] = name
+
+    return store
+
+
+def _store_scaled(divisor: int):
+    """Return a converter storing the value divided by divisor as float."""
+
+    def store(msg: dict, param: str, value: int) -> None:
+        msg[param] = float(value) / divisor
+
+    return store
+
+
+def _store_signed16_scaled(divisor: int):
+    """Return a converter storing a signed 16-bit two's complement value divided by divisor."""
+
+    def store(msg: dict, param: str, value: int) -> None:
+        if value >= 0x8000:
+            value -= 0x10000
+        msg[param] = float(value) / divisor
+
+    return store
+
+
+def _store_fault_code(msg: dict, param: str, value: int) -> None:
+    # summary fault code is exposed as numeric, the coordinator maps it to a slug
+    msg["fault_code_numeric"] = value
+
+
+def _store_weekdays(msg: dict, param: str, value: int) -> None:
+    msg["schedule"] = "disabled" if value == 0 else "enabled"
+    msg[param] = convert_weekdays_to_dict(value)
+
+
+def _store_ip(msg: dict, param: str, value: int) -> None:
+    msg[param] = ".".join(str(octet) for octet in value.to_bytes(4, "big"))
+
+
+def _model_from_frame(msg: dict, raw: bytes, data) -> None:
+    msg["model"] = get_model(data if isinstance(data, str) else bytes(data).decode("ascii"))
+
+
+# 3-phase DLB packet (msg_len=0x21, 33 bytes, msg_int=33).
+# Each power field has three 16-bit per-phase values; totals are the sum of all phases.
+# All phases are signed 16-bit two's complement (negative grid = exporting to grid,
+# negative solar/ev/house are valid for net-flow CT setups).
+# Reverse-engineered from BCP-AT1N-L capture vs Z-Box ground truth (÷100 gives kW totals).
+_FIELD_MAP_3P = {
+    "solar_phase1": "solar_power", "solar_phase2": "solar_power", "solar_phase3": "solar_power",
+    "ev_phase1":    "ev_power",    "ev_phase2":    "ev_power",    "ev_phase3":    "ev_power",
+    "house_phase1": "house_power", "house_phase2": "house_power", "house_phase3": "house_power",
+    "grid_phase1":  "grid_power",  "grid_phase2":  "grid_power",  "grid_phase3":  "grid_power",
+}
+_DLB_3P_PHASES = tuple(
+    (_FIELD_MAP_3P[param], pos.start // 2)
+    for param, pos in SERVER_MESSAGE.SEND_DLB_3P.value["structure"].items()
+)
+
+
+def _sum_dlb_3p_phases(msg: dict, raw: bytes, data: str) -> None:
+    phase_sums = {"solar_power": 0.0, "ev_power": 0.0, "house_power": 0.0, "grid_power": 0.0}
+    for target, start in _DLB_3P_PHASES:
+        if start + 2 > len(raw):
+            raise ValueError(f"Frame too short for {target}: {data}")
+        value = (raw[start] << 8) | raw[start + 1]
+        if value >= 0x8000:
+            value -= 0x10000
+        phase_sums[target] += float(value) / _DLB_POWER_DIVISOR
+    for field, total in phase_sums.items():
+        msg[field] = round(total, 2)
+
+
+_VALUES_CONVERTERS = {
+    "state": _store_enum_name(CHARGER_STATE),
+    "timer_state": _store_enum_name(TIMER_STATE),
+    "total_kwh": _store_scaled(10),
+    "fault_code": _store_fault_code,
+    "request_type": _store_enum_name(REQUEST_TYPE),
+}
+_DLB_POWER_CONVERTERS = {
+    param: _store_signed16_scaled(_DLB_POWER_DIVISOR)
+    for param in ("solar_power", "ev_power", "house_power", "grid_power")
+}
+
+# Messages decoded by read_message: message -> (field converters, fields decoded at all,
+# post-processing hook). Fields without a converter are stored as plain integers,
+# None as field list decodes every field of the structure.
+_DECODER_SPECS = {
+    SERVER_MESSAGE.SEND_VALUES_1P: (_VALUES_CONVERTERS, None, None),
+    SERVER_MESSAGE.SEND_VALUES_3P: (_VALUES_CONVERTERS, None, None),
+    SERVER_MESSAGE.SEND_DLB: (_DLB_POWER_CONVERTERS, None, None),
+    SERVER_MESSAGE.SEND_DLB_3P: ({}, (), _sum_dlb_3p_phases),
+    SERVER_MESSAGE.SEND_DLB_CONFIG: ({}, None, None),
+    SERVER_MESSAGE.SEND_MODEL: (
+        {"request_type": _store_enum_name(REQUEST_TYPE, strict=True)}, ("request_type",), _model_from_frame
+    ),
+    SERVER_MESSAGE.SEND_STATUS: ({}, None, None),
+    SERVER_MESSAGE.HANDSHAKE: ({"ip": _store_ip}, None, None),
+    SERVER_MESSAGE.SEND_SETTINGS: ({"weekdays": _store_weekdays}, None, None),
+    CLIENT_MESSAGE.SEND_CHARGER_COMMAND: ({"charger_command": _store_enum_name(CHARGER_COMMAND)}, None, None),
+    CLIENT_MESSAGE.REQUEST_DATA: ({"request_type": _store_enum_name(REQUEST_TYPE)}, None, None),
+    CLIENT_MESSAGE.SET_TIMER: ({}, None, None),
+}
+
+
+def _compile_field(param: str, pos: slice, converter) -> tuple:
+    """Translate a hex-string slice into a byte range, nibble shift and mask.
+
+    Slices in const.py index the ascii hex string, so a field may start or end
+    in the middle of a byte (e.g. 3-phase currents and the 5-digit pin).
+    Stepped slices (handshake ip) are read as one contiguous field.
+    """
+    byte_start = pos.start // 2
+    byte_end = (pos.stop + 1) // 2
+    shift = 4 * (byte_end * 2 - pos.stop)
+    mask = (1 << (4 * (pos.stop - pos.start))) - 1
+    return (param, byte_start, byte_end, shift, mask, converter)
+
+
+def _compile_decoder(message: SERVER_MESSAGE | CLIENT_MESSAGE, converters: dict, params, post) -> tuple:
+    structure = message.value["structure"]
+    fields = tuple(
+        _compile_field(param, structure[param], converters.get(param, _store_int))
+        for param in (structure if params is None else params)
+    )
+    return fields, post
+
+
+# Compiled once at import: message -> (fields, post-processing hook)
+_DECODERS = {
+    message: _compile_decoder(message, converters, params, post)
+    for message, (converters, params, post) in _DECODER_SPECS.items()
+}
+
+
+def read_message(data, msg_type:str | None = None) -> dict:
     """Convert ascii hex string to dict.
 
+    The frame is converted to bytes once and every field is read from a
+    precompiled byte offset (see _DECODERS) instead of slicing the hex string.
+    Frames can be passed as received from the socket (bytes or memoryview),
+    no str is built from them.
+
     Args:
-        data (str): beny client or server message as ascii hex string
+        data (str | bytes | memoryview): beny client or server message as ascii hex
         msg_type (str): if message type is not autodetected
 
     Returns:
@@ -44,181 +204,143 @@ def read_message(data, msg_type:str | None = None) -> dict:  # noqa: C901
 
     """
 
+    try:
+        raw = unhexlify(data)
+    except ValueError:  # binascii.Error is a ValueError
+        _LOGGER.debug(f"Not a valid hex frame: {data}")  # noqa: G004
+        return None
+
     # check if checksum matches before trying to translate
-    if not validate_checksum(data):
+    if len(raw) < 6 or sum(raw[:-1]) % 256 != raw[-1]:
+        _LOGGER.debug(f"Checksum does not match or frame too short: data={data}")  # noqa: G004
         return None
 
     if not msg_type:
         # try to find out message type automatically
-        msg_type = get_message_type(data)
-
-    msg = {"message_type": str(msg_type)}
-
-    # common message header parameters first
-    for param, pos in COMMON.FIXED_PART.value["structure"].items():
-        msg[param] = int(data[pos], 16)
-
-    # server sends 1-phase or 3-phase values like voltages, currents etc.
-    if msg_type in (SERVER_MESSAGE.SEND_VALUES_1P, SERVER_MESSAGE.SEND_VALUES_3P):
-        for param, pos in msg_type.value["structure"].items():
-            value = int(data[pos], 16)
-            try:
-                if param == "state":
-                    msg[param] = CHARGER_STATE(value).name
-                elif param == "timer_state":
-                    msg[param] = TIMER_STATE(value).name
-                elif param == "total_kwh":
-                    msg[param] = float(value) / 10
-                elif param == "fault_code":
-                    msg["fault_code_numeric"] = value
-                elif param == "request_type":
-                    msg[param] = REQUEST_TYPE(value).name
-                else:
-                    msg[param] = value
-            except ValueError:
-                _LOGGER.error(f"Invalid value for {param}: value")  # noqa: G004
-                msg[param] = None
-
-    if msg_type == SERVER_MESSAGE.SEND_DLB:
-        for param, pos in msg_type.value["structure"].items():
-            value = int(data[pos], 16)
-            try:
-                if param == "grid_power":
-                    # Grid power can be negative (exporting) - handle as signed 16-bit integer
-                    # Check if the high bit is set (value >= 0x8000 for 16-bit)
-                    if value >= 0x8000:
-                        # Convert from two's complement
-                        value = value - 0x10000
-                    msg[param] = float(value) / _DLB_POWER_DIVISOR
-                elif param in ["ev_power", "house_power", "solar_power"]:
-                    # All DLB power fields are signed 16-bit two's complement.
-                    # Negative values (e.g. 0xFF9A = -1.02 kW) are valid for CT setups
-                    # measuring net flow (e.g. solar line including battery charge/discharge).
-                    # The original sentinel threshold (0xFF00) was incorrectly blocking these.
-                    if value >= 0x8000:
-                        value = value - 0x10000
-                    msg[param] = float(value) / _DLB_POWER_DIVISOR
-                else:
-                    msg[param] = value
-            except ValueError:
-                _LOGGER.error(f"Invalid value for {param}: value")  # noqa: G004
-                msg[param] = None
-
-    if msg_type == SERVER_MESSAGE.SEND_DLB_3P:
-        # 3-phase DLB packet (msg_len=0x21, 33 bytes, msg_int=33).
-        # Each power field has three 16-bit per-phase values; totals are the sum of all phases.
-        # Grid phases are signed 16-bit two's complement (negative = exporting to grid).
-        # If any phase of solar/ev/house hits the 0xFF00+ sentinel, the whole field becomes None
-        # so the coordinator retains the last valid reading rather than producing a bogus total.
-        # Reverse-engineered from BCP-AT1N-L capture vs Z-Box ground truth (÷100 gives kW totals).
-        _FIELD_MAP_3P = {
-            "solar_phase1": "solar_power", "solar_phase2": "solar_power", "solar_phase3": "solar_power",
-            "ev_phase1":    "ev_power",    "ev_phase2":    "ev_power",    "ev_phase3":    "ev_power",
-            "house_phase1": "house_power", "house_phase2": "house_power", "house_phase3": "house_power",
-            "grid_phase1":  "grid_power",  "grid_phase2":  "grid_power",  "grid_phase3":  "grid_power",
-        }
-        phase_sums: dict = {"solar_power": 0.0, "ev_power": 0.0, "house_power": 0.0, "grid_power": 0.0}
-        sentinel_fields: set = set()
-
-        for param, pos in msg_type.value["structure"].items():
-            value = int(data[pos], 16)
-            target = _FIELD_MAP_3P[param]
-            if target == "grid_power":
-                # All three grid phases are signed 16-bit two's complement
-                if value >= 0x8000:
-                    value = value - 0x10000
-                phase_sums[target] += float(value) / _DLB_POWER_DIVISOR
-            else:
-                # Solar, EV, house: signed 16-bit two's complement (same as grid).
-                # Negative values are valid for net-flow CT setups.
-                if target not in sentinel_fields:
-                    if value >= 0x8000:
-                        value = value - 0x10000
-                    phase_sums[target] += float(value) / _DLB_POWER_DIVISOR
-
-        for field, total in phase_sums.items():
-            msg[field] = None if field in sentinel_fields else round(total, 2)
-
-    # charger ACKs SET_DLB_CONFIG or responds to GET_DLB_CONFIG with current config state
-    if msg_type == SERVER_MESSAGE.SEND_DLB_CONFIG:
-        for param, pos in msg_type.value["structure"].items():
-            msg[param] = int(data[pos], 16)
-
-    # server sends charger model
-    if msg_type == SERVER_MESSAGE.SEND_MODEL:
-        for param, pos in msg_type.value["structure"].items():
-            if param == "model":
-                msg["model"] = get_model(data)
-            elif param == "request_type":
-                msg[param] = REQUEST_TYPE(int(data[pos], 16)).name
-
-    # charger sends detailed fault status
-    if msg_type == SERVER_MESSAGE.SEND_STATUS:
-        for param, pos in msg_type.value["structure"].items():
-            if pos.stop <= len(data):
-                msg[param] = int(data[pos], 16)
-
-    # handshake - server sends serial, ip and port
-    elif msg_type == SERVER_MESSAGE.HANDSHAKE:
-        msg["serial"] = int(data[SERVER_MESSAGE.HANDSHAKE.value["structure"]["serial"]], 16)
-        msg["ip"] = get_ip(data)
-        msg["port"] = int(data[SERVER_MESSAGE.HANDSHAKE.value["structure"]["port"]], 16)
-
-    # server sends settings
-    if msg_type == SERVER_MESSAGE.SEND_SETTINGS:
-        for param, pos in msg_type.value["structure"].items():
-            value = int(data[pos], 16)
-            if param == "weekdays":
-                if value == 0:
-                    msg["schedule"] = "disabled"
-                else:
-                    msg["schedule"] = "enabled"
-
-                msg[param] = convert_weekdays_to_dict(value)
-            else:
-                msg[param] = value
-
-    # client sends command to start or stop the charging
-    elif msg_type == CLIENT_MESSAGE.SEND_CHARGER_COMMAND:
-        for param, pos in msg_type.value["structure"].items():
-            msg[param] =  CHARGER_COMMAND(int(data[pos], 16)).name
-
-    # client sends data request
-    # ("values" or "model" are known at the moment)
-    elif msg_type == CLIENT_MESSAGE.REQUEST_DATA:
-        for param, pos in msg_type.value["structure"].items():
-            msg[param] = REQUEST_TYPE(int(data[pos], 16)).name
-
-    elif msg_type == CLIENT_MESSAGE.SET_TIMER:
-        for param, pos in msg_type.value["structure"].items():
-            msg[param] = int(data[pos], 16)
-
-    _LOGGER.debug(f"Message received: {data}={msg}")  # noqa: G004
+        msg_type = lookup_message_type(raw[2], (raw[3] << 8) | raw[4])
+
+    # common message header parameters first (message_type is the raw header byte)
+    msg = {
+        "message_type": raw[2],
+        "header": (raw[0] << 8) | raw[1],
+        "message_id": (raw[3] << 8) | raw[4],
+    }
+
+    decoder = _DECODERS.get(msg_type)
+    if decoder is not None:
+        fields, post = decoder
+        length = len(raw)
+        for param, start, end, shift, mask, store in fields:
+            if end > length:
+                # fields past the end are only optional in the detailed status frame
+                if msg_type == SERVER_MESSAGE.SEND_STATUS:
+                    continue
+                raise ValueError(f"Frame too short for {param}: {data}")
+            store(msg, param, (int.from_bytes(raw[start:end], "big") >> shift) & mask)
+        if post is not None:
+            post(msg, raw, data)
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(f"Message received: {data}={msg}")  # noqa: G004
 
     return msg
 
+_CHECKSUM_PLACEHOLDER = "[checksum]"
+_PLACEHOLDER = re.compile(r"\[(\w+)\]")
+
+
+def _hex_sum(value: str, odd: int) -> int:
+    """Return the byte sum contribution of hex digits starting at an even or odd position.
+
+    A digit in the high nibble of a byte counts 16 times its value, a digit in
+    the low nibble counts once.
+    """
+    if not odd and not len(value) & 1:
+        return sum(bytes.fromhex(value))
+    total = 0
+    weight = 1 if odd else 16
+    for digit in value:
+        total += int(digit, 16) * weight
+        weight ^= 17  # alternate between 16 and 1
+    return total
+
+
+@lru_cache(maxsize=None)
+def _compile_template(template: str) -> tuple[tuple, bool]:
+    """Split a message template into literal segments and placeholders.
+
+    Args:
+        template (str): message template, e.g. "55aa10000b000[pin][request_type][checksum]"
+
+    Returns:
+        tuple: (parts, has_checksum). Each part is (literal, sum_at_even, sum_at_odd, param):
+            literals carry their byte sum contribution for both alignments, placeholders
+            carry the parameter name
+
+    """
+    has_checksum = template.endswith(_CHECKSUM_PLACEHOLDER)
+    if has_checksum:
+        template = template[:-len(_CHECKSUM_PLACEHOLDER)]
+
+    parts = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(template):
+        literal = template[position:match.start()]
+        if literal:
+            parts.append((literal, _hex_sum(literal, 0), _hex_sum(literal, 1), None))
+        parts.append((None, 0, 0, match.group(1)))
+        position = match.end()
+    literal = template[position:]
+    if literal:
+        parts.append((literal, _hex_sum(literal, 0), _hex_sum(literal, 1), None))
+    return tuple(parts), has_checksum
+
+
 def build_message(message: SERVER_MESSAGE | CLIENT_MESSAGE, params: dict = {}, header_prefix=None) -> str:
     """Build command message that can be sent to charger.
 
+    The template is compiled once (see _compile_template) and the checksum is
+    summed from the precomputed literal contributions and the parameter values.
+
     Args:
         message (SERVER_MESSAGE | CLIENT_MESSAGE): message type to be built
         params (dict, optional): parameters as dict to be appended to message {"parameter": "value"}
+        header_prefix (str, optional): replaces the first 6 characters of the template
 
     Returns:
         str: ascii hex string
 
     """
 
-    msg = message.value["hex"]
+    template = message.value["hex"]
     if header_prefix:
-        msg = header_prefix + msg[6:]
-    for param, val in params.items():
-        if param in msg:
-            msg = msg.replace("[" + param + "]", val)
+        template = header_prefix + template[6:]
+    parts, has_checksum = _compile_template(template)
+
+    segments = []
+    length = 0
+    checksum = 0
+    for literal, sum_at_even, sum_at_odd, param in parts:
+        if param is None:
+            segments.append(literal)
+            checksum += sum_at_odd if length & 1 else sum_at_even
+            length += len(literal)
+        else:
+            value = params.get(param)
+            if value is None:
+                raise ValueError(f"Missing value for [{param}] in {message.name}")
+            segments.append(value)
+            checksum += _hex_sum(value, length & 1)
+            length += len(value)
+
+    msg = "".join(segments)
+    if has_checksum:
+        if length & 1:
+            # a trailing single digit is summed as a low nibble
+            checksum -= 15 * int(msg[-1], 16)
+        msg += f"{checksum % 256:02x}"
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(f"Message sent. Type: {message.name}. Content: {msg!s}={params}")  # noqa: G004
 
-    checksum = calculate_checksum(msg)
-
-    msg = msg.replace("[checksum]", f"{checksum:02x}")
-    _LOGGER.debug(f"Message sent. Type: {message.name}. Content: {msg!s}={params}")  # noqa: G004
-
-    return msg
\ No newline at end of file
+    return msg
@@ -1,7 +1,7 @@
 """Home Assistant config flow ."""
-import asyncio
+from contextlib import aclosing
+from ipaddress import ip_network
 import logging
-import socket
 
 import voluptuous as vol
 from homeassistant.data_entry_flow import section
@@ -9,10 +9,9 @@ from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.helpers.device_registry import async_get as async_get_device_registry
 
-from .communication import build_message, read_message
+from .discovery import async_discover_chargers, async_identify_charger, async_sweep_subnet
 from .const import (
     CHARGER_TYPE,
-    CLIENT_MESSAGE,
     CONF_ANTI_OVERLOAD,
     CONF_ANTI_OVERLOAD_VALUE,
     CONF_MAX_CURRENT_MAX,
@@ -23,27 +22,51 @@ from .const import (
     DEFAULT_ANTI_OVERLOAD_VALUE,
     DEFAULT_MAX_CURRENT_MAX,
     DEFAULT_MAX_CURRENT_MIN,
+    DEFAULT_DLB_INTERVAL,
+    DEFAULT_HOLD_DOWN,
+    DEFAULT_INTERVAL_CHARGING,
+    DEFAULT_INTERVAL_STANDBY,
+    DEFAULT_INTERVAL_STARTING,
+    DEFAULT_INTERVAL_UNPLUGGED,
+    DEFAULT_INTERVAL_WAITING,
     DEFAULT_PORT,
+    DEFAULT_RTO_MAX,
+    DEFAULT_RTO_MIN,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_WRITE_DELAY,
+    DEFAULT_STATUS_INTERVAL,
     DLB,
     DLB_CHARGERS,
     DOMAIN,
     IP_ADDRESS,
     MODEL,
     PORT,
-    REQUEST_TYPE,
     SCAN_INTERVAL,
     SERIAL,
     SINGLE_PHASE_CHARGERS,
     THREE_PHASE_CHARGERS,
     SECTION_DEVICE,
     SECTION_CONNECTION,
+    CONF_SUBNET,
+    SWEEP_MIN_PREFIX,
     SECTION_CURRENT_LIMITS,
     SECTION_DLB,
+    SECTION_POLLING,
+    CONF_DLB_INTERVAL,
+    CONF_HOLD_DOWN,
+    CONF_INTERVAL_CHARGING,
+    CONF_INTERVAL_STANDBY,
+    CONF_INTERVAL_STARTING,
+    CONF_INTERVAL_UNPLUGGED,
+    CONF_INTERVAL_WAITING,
     CONF_NUMERIC_PIN,
+    CONF_RTO_MAX,
+    CONF_RTO_MIN,
+    CONF_STATUS_INTERVAL,
+    CONF_WRITE_DELAY,
     get_config_parameter
 )
-from .conversions import convert_pin_to_hex, convert_serial_to_hex, get_hex
+from .conversions import convert_pin_to_hex
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -78,11 +101,20 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if IP_ADDRESS not in user_input[SECTION_CONNECTION]:
                 user_input[SECTION_CONNECTION][IP_ADDRESS] = None
 
+            subnet = user_input[SECTION_CONNECTION].get(CONF_SUBNET) or None
+            if subnet is not None:
+                try:
+                    network = ip_network(subnet, strict=False)
+                except ValueError:
+                    network = None
+                if network is None or network.version != 4 or network.prefixlen < SWEEP_MIN_PREFIX:
+                    self._errors["base"] = "subnet_invalid"
+
             user_input[SECTION_DEVICE][CONF_NUMERIC_PIN] = user_input[SECTION_DEVICE][CONF_PIN]
             user_input[SECTION_DEVICE][CONF_PIN] = convert_pin_to_hex(user_input[SECTION_DEVICE][CONF_PIN])
             
             if "base" not in self._errors or self._errors["base"] is None:
-                dev_data = await self._poll_devices(user_input[SECTION_DEVICE][CONF_SERIAL], user_input[SECTION_DEVICE][CONF_PIN], user_input[SECTION_CONNECTION][IP_ADDRESS], user_input[SECTION_CONNECTION][PORT])
+                dev_data = await self._poll_devices(user_input[SECTION_DEVICE][CONF_SERIAL], user_input[SECTION_DEVICE][CONF_PIN], user_input[SECTION_CONNECTION][IP_ADDRESS], user_input[SECTION_CONNECTION][PORT], subnet)
                 if dev_data is not None:
                     
                     # changed to native way to handle unique instance and abort
@@ -110,10 +142,11 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     else:
                         user_input[SECTION_DLB][DLB] = False
 
-                    pin_is_valid = await self.hass.async_add_executor_job(self._pin_is_valid, user_input[SECTION_CONNECTION][IP_ADDRESS], user_input[SECTION_CONNECTION][PORT], user_input[SECTION_DEVICE][CONF_PIN])
-                    if not pin_is_valid:
+                    if not dev_data["pin_valid"]:
                         self._errors["base"] = "wrong_pin"
                     else:
+                        # The subnet only helps to find the charger, the entry keeps its address
+                        user_input[SECTION_CONNECTION].pop(CONF_SUBNET, None)
                         return self.async_create_entry(title=user_input[SECTION_DEVICE][MODEL], data=user_input)
 
         return self.async_show_form(
@@ -124,7 +157,13 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         vol.Schema({
                             vol.Required(PORT, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, PORT, DEFAULT_PORT)): int,
                             vol.Optional(IP_ADDRESS, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, IP_ADDRESS, "")): str,
+                            vol.Optional(CONF_SUBNET, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_SUBNET, "")): str,
                             vol.Optional(SCAN_INTERVAL, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)): int,
+                            vol.Optional(CONF_DLB_INTERVAL, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_DLB_INTERVAL, DEFAULT_DLB_INTERVAL)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_STATUS_INTERVAL, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_STATUS_INTERVAL, DEFAULT_STATUS_INTERVAL)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_RTO_MIN, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_RTO_MIN, DEFAULT_RTO_MIN)): vol.All(vol.Coerce(float), vol.Range(min=0.05, max=10)),
+                            vol.Optional(CONF_RTO_MAX, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_RTO_MAX, DEFAULT_RTO_MAX)): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=30)),
+                            vol.Optional(CONF_WRITE_DELAY, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_WRITE_DELAY, DEFAULT_WRITE_DELAY)): vol.All(vol.Coerce(float), vol.Range(min=0, max=30)),
                         }), 
                         {"collapsed": False}
                     ),
@@ -150,6 +189,17 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         }),
                         {"collapsed": True}
                     ),
+                    vol.Required(SECTION_POLLING): section(
+                        vol.Schema({
+                            vol.Optional(CONF_INTERVAL_UNPLUGGED, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_UNPLUGGED, DEFAULT_INTERVAL_UNPLUGGED)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_STANDBY, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_STANDBY, DEFAULT_INTERVAL_STANDBY)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_STARTING, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_STARTING, DEFAULT_INTERVAL_STARTING)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_WAITING, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_WAITING, DEFAULT_INTERVAL_WAITING)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_CHARGING, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_CHARGING, DEFAULT_INTERVAL_CHARGING)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_HOLD_DOWN, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_HOLD_DOWN, DEFAULT_HOLD_DOWN)): vol.All(int, vol.Range(min=0, max=3600)),
+                        }),
+                        {"collapsed": True}
+                    ),
                 }
             ),
             errors=self._errors
@@ -191,8 +241,10 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 if model not in DLB_CHARGERS:
                     user_input[SECTION_DLB][DLB] = False
                     
-                pin_is_valid = await self.hass.async_add_executor_job(self._pin_is_valid, user_input[SECTION_CONNECTION][IP_ADDRESS], user_input[SECTION_CONNECTION][PORT], user_input[SECTION_DEVICE][CONF_PIN])
-                if not pin_is_valid:
+                identity = await async_identify_charger(user_input[SECTION_CONNECTION][IP_ADDRESS], user_input[SECTION_CONNECTION][PORT], user_input[SECTION_DEVICE][CONF_PIN])
+                if identity["pin_valid"] is None:
+                    self._errors["base"] = "cannot_communicate"
+                elif not identity["pin_valid"]:
                     self._errors["base"] = "wrong_pin"
                 else:
                     return self.async_update_reload_and_abort(self._get_reconfigure_entry(), data_updates=user_input)
@@ -206,6 +258,11 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             vol.Required(PORT, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, PORT, DEFAULT_PORT, existing_entry)): int,
                             vol.Optional(IP_ADDRESS, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, IP_ADDRESS, "", existing_entry)): str,
                             vol.Optional(SCAN_INTERVAL, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, existing_entry)): int,
+                            vol.Optional(CONF_DLB_INTERVAL, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_DLB_INTERVAL, DEFAULT_DLB_INTERVAL, existing_entry)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_STATUS_INTERVAL, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_STATUS_INTERVAL, DEFAULT_STATUS_INTERVAL, existing_entry)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_RTO_MIN, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_RTO_MIN, DEFAULT_RTO_MIN, existing_entry)): vol.All(vol.Coerce(float), vol.Range(min=0.05, max=10)),
+                            vol.Optional(CONF_RTO_MAX, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_RTO_MAX, DEFAULT_RTO_MAX, existing_entry)): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=30)),
+                            vol.Optional(CONF_WRITE_DELAY, default=self._get_previous_user_input(user_input, SECTION_CONNECTION, CONF_WRITE_DELAY, DEFAULT_WRITE_DELAY, existing_entry)): vol.All(vol.Coerce(float), vol.Range(min=0, max=30)),
                         }), 
                         {"collapsed": False}
                     ),
@@ -230,6 +287,17 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         }),
                         {"collapsed": True}
                     ),
+                    vol.Required(SECTION_POLLING): section(
+                        vol.Schema({
+                            vol.Optional(CONF_INTERVAL_UNPLUGGED, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_UNPLUGGED, DEFAULT_INTERVAL_UNPLUGGED, existing_entry)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_STANDBY, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_STANDBY, DEFAULT_INTERVAL_STANDBY, existing_entry)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_STARTING, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_STARTING, DEFAULT_INTERVAL_STARTING, existing_entry)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_WAITING, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_WAITING, DEFAULT_INTERVAL_WAITING, existing_entry)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_INTERVAL_CHARGING, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_INTERVAL_CHARGING, DEFAULT_INTERVAL_CHARGING, existing_entry)): vol.All(int, vol.Range(min=1, max=3600)),
+                            vol.Optional(CONF_HOLD_DOWN, default=self._get_previous_user_input(user_input, SECTION_POLLING, CONF_HOLD_DOWN, DEFAULT_HOLD_DOWN, existing_entry)): vol.All(int, vol.Range(min=0, max=3600)),
+                        }),
+                        {"collapsed": True}
+                    ),
                 }
             ),
             errors=self._errors
@@ -240,218 +308,52 @@ class BenyWifiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         device_registry = async_get_device_registry(self.hass)
         return any(device.serial_number == serial_number for device in device_registry.devices.values())
 
-    async def _poll_devices(self, serial, pin, ip, port) -> dict | None:
-        """Check is device andswers to broadcast."""
-        def sync_socket_communication():
-            dev_data = {
-                "ip_address": ip,
-                "port": port,
-                "pin": pin,
-                "serial_number": serial
-            }
-
-            request = build_message(
-                CLIENT_MESSAGE.POLL_DEVICES,
-                {"pin": dev_data["pin"], "serial": convert_serial_to_hex(dev_data["serial_number"])}
-            ).encode('ascii')
-
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-                sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                sock.settimeout(5)
-
-                sock.bind(('0.0.0.0', 0))
-                sock.sendto(request, ('255.255.255.255', port))
-                _LOGGER.debug(f"Broadcast request to {'255.255.255.255'}:{port}")  # noqa: G004
-
-                while True:
-                    try:
-                        response, addr = sock.recvfrom(1024)
-                        sock.close()
-
-                        response = response.decode('ascii')
-                        data = read_message(response)
-
-                        # Guard: read_message returns None on invalid checksum
-                        if data is None:
-                            _LOGGER.warning(
-                                f"Received broadcast response from {addr} but checksum was invalid — ignoring"  # noqa: G004
-                            )
-                            continue
-
-                        if data['message_type'] == "SERVER_MESSAGE.ACCESS_DENIED":
-                            self._errors["base"] = "access_denied"
-                            _LOGGER.exception("Device denied request. Please reconfigure integration if your pin has changed")  # noqa: G004, TRY401
-                            return None
-
-                        dev_data['serial_number'] = data.get('serial', '12345678')
-                        dev_data['ip_address'] = data.get('ip', None)
-                        if not port:
-                            dev_data['port'] = data.get('port', None)
-                        else:
-                            dev_data['port'] = port
-                        break
-
-                    except TimeoutError:
-                        break
-
-            except Exception as ex:  # noqa: BLE001
-                self._errors["base"] = "cannot_communicate"
-                _LOGGER.exception(f"Exception receiving device handshake data by broadcast 255.255.255.255:{dev_data['port']}. Cause: {ex}")  # noqa: G004, TRY401
-                return None
-
-            if dev_data['ip_address'] is None:
-                # If user supplied an IP manually, attempt a direct unicast handshake
-                # before giving up. OCPP variants and some firewalled devices do not
-                # respond to UDP broadcasts but may respond to a direct packet.
-                if ip:
-                    _LOGGER.info(
-                        f"Broadcast returned no IP; attempting direct unicast handshake to {ip}:{port}"  # noqa: G004
-                    )
-                    direct_data = _try_direct_handshake(ip, port, pin, serial)
-                    if direct_data is not None:
-                        dev_data.update(direct_data)
-                    else:
-                        self._errors["base"] = "cannot_communicate"
-                        _LOGGER.warning(
-                            f"Direct unicast handshake to {ip}:{port} also failed. "  # noqa: G004
-                            "The device did not respond to local UDP. If this is an OCPP model "
-                            "(model name ends in -P) it may not support local UDP polling."
-                        )
-                        return None
-                else:
-                    self._errors["base"] = "cannot_resolve_ip"
-                    _LOGGER.exception("Cannot resolve device IP, you can try to set it manually")  # noqa: G004, TRY401
-                    return None
-
-            # Brief pause to allow the charger to finish processing the handshake
-            # before we send the model request — some firmware versions need this.
-            import time
-            time.sleep(0.5)
-
-            data = self._send_model_request(dev_data['ip_address'], dev_data['port'], dev_data['pin'], "55aa10")
-            if not data:
-                data = self._send_model_request(dev_data['ip_address'], dev_data['port'], dev_data['pin'], "55aa04")
-
-            if not data:
-                self._errors["base"] = "cannot_communicate"
-                return None
+    async def _poll_devices(self, serial, pin, ip, port, subnet=None) -> dict | None:
+        """Find the charger by broadcast handshake, read its model and check the pin.
 
-            dev_data["model"] = data.get("model", "Charger")
+        If nothing answers the broadcast and a subnet is given, every host of
+        the subnet is sent the handshake until the charger answers.
 
-            return dev_data
-
-        def _try_direct_handshake(ip, port, pin, serial):
-            """Attempt a unicast POLL_DEVICES packet to a known IP.
-
-            Some devices (notably OCPP variants that are also reachable via LAN)
-            do not respond to broadcasts but will reply to a direct unicast packet.
-            Returns a partial dev_data dict on success, or None on failure.
-            """
-            request = build_message(
-                CLIENT_MESSAGE.POLL_DEVICES,
-                {"pin": pin, "serial": convert_serial_to_hex(serial)}
-            ).encode('ascii')
-
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.settimeout(5)
-                sock.sendto(request, (ip, port))
-                _LOGGER.debug(f"Direct unicast handshake to {ip}:{port}")  # noqa: G004
-
-                response, _ = sock.recvfrom(1024)
-                sock.close()
-
-                data = read_message(response.decode('ascii'))
-                if data is None:
-                    _LOGGER.warning(f"Direct unicast response from {ip} had invalid checksum")  # noqa: G004
-                    return None
-
-                if data.get('message_type') == "SERVER_MESSAGE.ACCESS_DENIED":
-                    return None
-
-                return {
-                    "serial_number": data.get('serial', serial),
-                    "ip_address": ip,
-                    "port": port,
-                }
-            except Exception as ex:  # noqa: BLE001
-                _LOGGER.debug(f"Direct unicast handshake to {ip}:{port} failed: {ex}")  # noqa: G004
-                return None
-
-        return await asyncio.to_thread(sync_socket_communication)
-
-    def _send_model_request(self, ip, port, pin, header_prefix, retries=3, timeout=5):
-        """Send a model request to the charger and return parsed response, or None on failure.
-
-        Retries up to `retries` times with a short delay between attempts to handle
-        chargers that are slow to respond after the initial handshake broadcast.
-        The socket sendto is inside the try block so any send-side errors are also caught.
+        Sets self._errors and returns None if the charger cannot be used.
         """
-        request = b""  # Initialize so it's always available in exception logging
-        for attempt in range(1, retries + 1):
-            response = b""
-            data = None
-            try:
-                request = build_message(
-                    CLIENT_MESSAGE.REQUEST_DATA,
-                    {"pin": pin, "request_type": get_hex(REQUEST_TYPE.MODEL.value)},
-                    header_prefix=header_prefix
-                ).encode("ascii")
-
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.settimeout(timeout)
-                try:
-                    sock.sendto(request, (ip, port))
-                    response, _ = sock.recvfrom(1024)
-                    data = read_message(response.decode("ascii"))
-                    return data
-                finally:
-                    sock.close()
-
-            except Exception as ex:
-                _LOGGER.warning(  # noqa: G004
-                    f"Model request attempt {attempt}/{retries} failed for {ip}:{port} "
-                    f"(prefix={header_prefix}). Cause: {ex}. "
-                    f"Request hex: {request}. Response hex: {response}. Translated: {data}"
+        chargers = await async_discover_chargers(self.hass, serial, pin, port, ip)
+        if not chargers and subnet:
+            _LOGGER.debug(f"No answer to broadcast handshake, sweeping {subnet}")  # noqa: G004
+            async with aclosing(async_sweep_subnet(serial, pin, port, subnet)) as sweep:
+                async for charger in sweep:
+                    chargers.append(charger)
+                    if str(charger.get("serial_number")) == str(serial):
+                        break
+        if not chargers:
+            if ip:
+                self._errors["base"] = "cannot_communicate"
+                _LOGGER.warning(
+                    f"{ip}:{port} did not answer the handshake. If this is an OCPP model "  # noqa: G004
+                    "(model name ends in -P) it may not support local UDP polling."
                 )
-                if attempt < retries:
-                    import time
-                    time.sleep(0.5)
+            else:
+                self._errors["base"] = "cannot_resolve_ip"
+                _LOGGER.error("Cannot resolve device IP, you can try to set it manually")
+            return None
 
-        self._errors["base"] = "cannot_communicate"
-        _LOGGER.error(  # noqa: G004
-            f"All {retries} model request attempts failed for {ip}:{port} (prefix={header_prefix})"
+        # Prefer the charger with the given serial if several answered
+        charger = next(
+            (charger for charger in chargers if str(charger.get("serial_number")) == str(serial)),
+            chargers[0],
         )
-        return None
-        
-    def _pin_is_valid(self, ip, port, pin):
-        request = b"" # Initialize
-        response = b"" # Initialize
-        data = None    # Initialize
-        try:
-            request = build_message(
-                CLIENT_MESSAGE.REQUEST_DATA,
-                {"pin": pin, "request_type": get_hex(REQUEST_TYPE.VALUES.value)}
-            ).encode('ascii')
-        except Exception as ex:
-            self._errors["base"] = "cannot_connect"
-            _LOGGER.exception(f"Exception sending model request to {ip}:{port}. Cause: {ex}. Request: {request}")  # noqa: G004, TRY401
-
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(2)
-        sock.sendto(request, (ip, port))
-
-        try:
-            response, _ = sock.recvfrom(1024)
-            response = response.decode("ascii")
-            if "55aa100008" in response:
-                return False
-            else:
-                return True
-        except Exception as ex:
+        if charger.get("access_denied"):
+            self._errors["base"] = "wrong_pin"
+            _LOGGER.error("Device denied request. Please reconfigure integration if your pin has changed")
+            return None
+
+        identity = await async_identify_charger(charger["ip_address"], charger["port"], pin)
+        if identity["pin_valid"] is None or (identity["pin_valid"] and identity["model"] is None):
             self._errors["base"] = "cannot_communicate"
-            _LOGGER.exception(f"Exception receiving model data from {ip}:{port}. Cause: {ex}. Request hex: {request}. Response hex: {response}. Translated response: {data}")  # noqa: G004, TRY401
             return None
-        finally:
-            sock.close()
\ No newline at end of file
+
+        return {
+            **charger,
+            "pin": pin,
+            "model": identity["model"] or "Charger",
+            "pin_valid": identity["pin_valid"],
+        }
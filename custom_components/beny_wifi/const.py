@@ -23,11 +23,120 @@ SERIAL = "serial"
 CHARGER_TYPE = "charger_type"
 DLB = "dlb"
 
+# Request types and header prefix the charger firmware answers, probed at
+# setup and whenever the charger comes back after being offline. Stored in
+# the config entry data under CAPABILITIES.
+CAPABILITIES: Final = "capabilities"
+HEADER_PREFIXES: Final = ("55aa10", "55aa04")
+# Seconds before request types that timed out during the probe are probed again
+CAPABILITY_REPROBE_INTERVAL: Final = 600
+
+# Config flow discovery: seconds to collect handshake replies, and timeout
+# and attempts of the requests identifying the charger that answered.
+DISCOVERY_WINDOW: Final = 1.0
+DISCOVERY_TIMEOUT: Final = 0.5
+DISCOVERY_RETRIES: Final = 2
+# Unicast sweep of a subnet when broadcasts are filtered: hosts waited for at
+# once, seconds to wait for each host and the largest subnet swept (/22, 1022 hosts).
+SWEEP_CONCURRENCY: Final = 64
+SWEEP_TIMEOUT: Final = 0.5
+SWEEP_MIN_PREFIX: Final = 22
+# Rediscovery of chargers that stopped answering at their address. Handshake
+# replies are cached per port in hass.data under REDISCOVERY_CACHE for
+# REDISCOVERY_TTL seconds so several entries share one broadcast.
+REDISCOVERY_CACHE: Final = "beny_wifi_rediscovery"
+REDISCOVERY_TTL: Final = 60
+
+# The UDP endpoint shared by all chargers is kept in hass.data under this key
+TRANSPORT_HUB: Final = "beny_wifi_transport_hub"
+# Poll scheduler spreading the polls of all chargers, kept in hass.data under
+# this key, and the number of chargers polled at the same time at most
+POLL_SCHEDULER: Final = "beny_wifi_poll_scheduler"
+POLL_MAX_IN_FLIGHT: Final = 4
+
+# Last good coordinator data is kept in .storage so entities can be set up
+# from it right away while the charger is polled in the background.
+SNAPSHOT_STORAGE_VERSION: Final = 1
+SNAPSHOT_SAVE_DELAY: Final = 60  # seconds, coalesces writes of frequent polls
+
+# The DLB config set from Home Assistant is kept in its own .storage file, not
+# in the config entry options, so toggling controls does not rewrite
+# core.config_entries. Changes are written once none has come for the delay.
+DLB_CONFIG_STORAGE_VERSION: Final = 1
+DLB_CONFIG_SAVE_DELAY: Final = 10  # seconds
+
 SCAN_INTERVAL: Final = "update_interval"
 
 DEFAULT_SCAN_INTERVAL: Final = 10  # lowered from 30s — UDP round-trip is fast on a local network
+
+# Polling intervals (seconds) of the other request types. Charger values are
+# polled every SCAN_INTERVAL, DLB power and detailed fault status on their own
+# schedule since they change at a different pace.
+CONF_DLB_INTERVAL: Final = "dlb_interval"
+CONF_STATUS_INTERVAL: Final = "status_interval"
+DEFAULT_DLB_INTERVAL: Final = 10
+DEFAULT_STATUS_INTERVAL: Final = 60
+
+# Charger values are polled at a rate depending on the charger state (seconds).
+# States not listed (ABNORMAL, UNKNOWN) use SCAN_INTERVAL. The rate speeds up
+# immediately and only slows down after the hold-down period has passed.
+CONF_INTERVAL_UNPLUGGED: Final = "interval_unplugged"
+CONF_INTERVAL_STANDBY: Final = "interval_standby"
+CONF_INTERVAL_STARTING: Final = "interval_starting"
+CONF_INTERVAL_WAITING: Final = "interval_waiting"
+CONF_INTERVAL_CHARGING: Final = "interval_charging"
+CONF_HOLD_DOWN: Final = "hold_down"
+DEFAULT_INTERVAL_UNPLUGGED: Final = 60
+DEFAULT_INTERVAL_STANDBY: Final = 30
+DEFAULT_INTERVAL_STARTING: Final = 5
+DEFAULT_INTERVAL_WAITING: Final = 5
+DEFAULT_INTERVAL_CHARGING: Final = 5
+DEFAULT_HOLD_DOWN: Final = 120
+# charger state name -> (config key, default interval)
+STATE_INTERVALS: Final = {
+    "UNPLUGGED": (CONF_INTERVAL_UNPLUGGED, DEFAULT_INTERVAL_UNPLUGGED),
+    "STANDBY": (CONF_INTERVAL_STANDBY, DEFAULT_INTERVAL_STANDBY),
+    "STARTING": (CONF_INTERVAL_STARTING, DEFAULT_INTERVAL_STARTING),
+    "WAITING": (CONF_INTERVAL_WAITING, DEFAULT_INTERVAL_WAITING),
+    "CHARGING": (CONF_INTERVAL_CHARGING, DEFAULT_INTERVAL_CHARGING),
+}
 DEFAULT_PORT = 3333 # default listening port (at least for "BCP-AT1N-L)
 
+# Retransmission timeout bounds (seconds) for requests to the charger.
+# The timeout itself follows the measured round-trip time of each charger.
+CONF_RTO_MIN: Final = "rto_min"
+CONF_RTO_MAX: Final = "rto_max"
+DEFAULT_RTO_MIN: Final = 0.2
+DEFAULT_RTO_MAX: Final = 8.0
+DEFAULT_RTO_INITIAL: Final = 2.0
+DEFAULT_REQUEST_RETRIES: Final = 3
+
+# Number entities write their value to the charger once it has not changed
+# for this many seconds, so dragging a slider sends a single frame.
+CONF_WRITE_DELAY: Final = "write_delay"
+DEFAULT_WRITE_DELAY: Final = 1.5
+# After a command only the request types it changed are polled again, this many
+# seconds after its ACK so the charger has applied it. Commands acknowledged
+# within the delay share the refresh.
+COMMAND_REFRESH_DELAY: Final = 0.3
+
+# The DLB config is sent until the ACK echoes it back: up to this many attempts
+# per change, backing off exponentially between them (seconds). A config still
+# unconfirmed after that is sent again after the next successful poll, until
+# DLB_SYNC_RETRIES syncs of it have failed. It then stays pending until changed.
+DLB_SYNC_ATTEMPTS: Final = 4
+DLB_SYNC_RETRIES: Final = 3
+DLB_SYNC_BACKOFF_MIN: Final = 1.0
+DLB_SYNC_BACKOFF_MAX: Final = 8.0
+
+# Circuit breaker for unreachable chargers: after this many consecutive failed
+# polls the coordinator stops polling and probes the charger with exponential
+# backoff (seconds) instead.
+DEFAULT_BREAKER_FAILURE_THRESHOLD: Final = 3
+DEFAULT_BREAKER_BACKOFF_MIN: Final = 10
+DEFAULT_BREAKER_BACKOFF_MAX: Final = 300
+DEFAULT_BREAKER_JITTER: Final = 0.2  # +-20 % of the backoff window
+
 # Configurable max-current slider bounds
 CONF_MAX_CURRENT_MIN: Final = "max_current_min"
 CONF_MAX_CURRENT_MAX: Final = "max_current_max"
@@ -42,6 +151,7 @@ DEFAULT_ANTI_OVERLOAD_VALUE: Final = 63  # 0x3f — matches charger default
 
 IP_ADDRESS = "ip_address"
 PORT = "port"
+CONF_SUBNET = "subnet"
 CONF_SERIAL = "serial"
 CONF_PIN = "pin"
 CONF_NUMERIC_PIN = "numeric_pin"
@@ -51,6 +161,7 @@ SECTION_CONNECTION: Final = "section_connection"
 SECTION_DEVICE: Final = "section_device"
 SECTION_CURRENT_LIMITS: Final = "section_current_limits"
 SECTION_DLB: Final = "section_dlb"
+SECTION_POLLING: Final = "section_polling"
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -251,6 +362,13 @@ class CHARGER_COMMAND(Enum):
     STOP = 0
     START = 1
 
+class CIRCUIT_STATE(Enum):
+    """Circuit breaker states of a charger connection."""
+
+    CLOSED = "closed"        # polling normally
+    OPEN = "open"            # charger unreachable, waiting for the next probe
+    HALF_OPEN = "half_open"  # probe in flight
+
 class REQUEST_TYPE(Enum):
     """Request type to retrieve data from charger."""
 
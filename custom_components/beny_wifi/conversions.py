@@ -1,4 +1,9 @@
-from .const import CLIENT_MESSAGE, COMMON, SERVER_MESSAGE  # noqa: D100
+from collections import Counter  # noqa: D100
+import logging
+
+from .const import CLIENT_MESSAGE, SERVER_MESSAGE
+
+_LOGGER = logging.getLogger(__name__)
 
 
 def get_hex(data: int, length: int = 2) -> str:
@@ -126,61 +131,99 @@ def convert_pin_to_hex(pin: int) -> str:
 
     return f"{int(pin):05X}".lower()
 
-def get_message_type(data: str) -> CLIENT_MESSAGE | SERVER_MESSAGE:
+# Frame type registry. Messages are identified by the message_type byte and the
+# message_id word of the header. Registrations without a message_type match any
+# message_type byte, registrations with one take precedence for that byte.
+_MESSAGE_TYPES_BY_ID: dict[int, CLIENT_MESSAGE | SERVER_MESSAGE] = {}
+_MESSAGE_TYPES_BY_TYPE_AND_ID: dict[tuple[int, int], CLIENT_MESSAGE | SERVER_MESSAGE] = {}
+
+# Flattened lookup table keyed by the 24-bit header value (message_type << 16 | message_id)
+_MESSAGE_TYPE_TABLE: dict[int, CLIENT_MESSAGE | SERVER_MESSAGE] = {}
+
+# Header combinations that did not match any registered message, with occurrence counts
+UNKNOWN_MESSAGE_TYPES: Counter[tuple[int, int]] = Counter()
+
+
+def register_message_type(
+    message: CLIENT_MESSAGE | SERVER_MESSAGE, message_id: int, message_type: int | None = None
+) -> None:
+    """Register the header combination identifying a message.
+
+    Args:
+        message (CLIENT_MESSAGE | SERVER_MESSAGE): message the frame is decoded as
+        message_id (int): message_id word of the header (the frame length for most messages)
+        message_type (int | None): message_type byte of the header, None to match any
+
+    """
+    if message_type is None:
+        _MESSAGE_TYPES_BY_ID[message_id] = message
+        for byte in range(256):
+            if (byte, message_id) not in _MESSAGE_TYPES_BY_TYPE_AND_ID:
+                _MESSAGE_TYPE_TABLE[(byte << 16) | message_id] = message
+    else:
+        _MESSAGE_TYPES_BY_TYPE_AND_ID[(message_type, message_id)] = message
+        _MESSAGE_TYPE_TABLE[(message_type << 16) | message_id] = message
+
+
+def lookup_message_type(message_type: int, message_id: int) -> CLIENT_MESSAGE | SERVER_MESSAGE | None:
+    """Get message structure by already parsed header fields.
+
+    Args:
+        message_type (int): message_type byte of the header
+        message_id (int): message_id word of the header
+
+    Returns:
+        CLIENT_MESSAGE | SERVER_MESSAGE | None: registered message, None if unknown
+
+    """
+    message = _MESSAGE_TYPE_TABLE.get((message_type << 16) | message_id)
+    if message is None:
+        key = (message_type, message_id)
+        if not UNKNOWN_MESSAGE_TYPES[key]:
+            _LOGGER.debug(f"Unknown message: message_type={message_type:#04x} message_id={message_id}")  # noqa: G004
+        UNKNOWN_MESSAGE_TYPES[key] += 1
+    return message
+
+
+def get_message_type(data: str) -> CLIENT_MESSAGE | SERVER_MESSAGE | None:
     """Get message structure by id.
 
     Args:
         data (str): message as ascii hex string
 
     Returns:
-        _type_: _description_
+        CLIENT_MESSAGE | SERVER_MESSAGE | None: registered message, None if unknown
 
     """
-    message_type = data[COMMON.FIXED_PART.value["structure"]["message_type"]]
-    msg_int = int(data[COMMON.FIXED_PART.value["structure"]["message_id"]], 16)
-
-    if msg_int == 11:
-        return CLIENT_MESSAGE.REQUEST_DATA
-    if msg_int == 28:
-        return CLIENT_MESSAGE.SET_TIMER
-    if msg_int == 12:
-        return CLIENT_MESSAGE.SEND_CHARGER_COMMAND
-
-    if msg_int == 8:
-        return SERVER_MESSAGE.ACCESS_DENIED
-    if msg_int == 30:
-        return SERVER_MESSAGE.SEND_VALUES_1P
-    # Status packet (0x6e) has a payload length of 21 bytes (0x15)
-    if msg_int == 21:
-        return SERVER_MESSAGE.SEND_STATUS
-    
-    # BCP-A2N-L v1.28 firmware changed msg_int to 31, adding support
-    if msg_int == 31:
-        return SERVER_MESSAGE.SEND_VALUES_1P
-        
-    # Additional status message type 36 added
-    if msg_int == 35 or msg_int == 36:
-        return SERVER_MESSAGE.SEND_VALUES_3P
-    # SEND_DLB detection: both variants share message_type=7b.
-    # The msg_id field encodes the msg_len byte, so the packet size is directly readable:
-    #   1P SEND_DLB:   msg_int=17  (0x0011 → msg_len=0x11=17 bytes)
-    #   3P SEND_DLB:   msg_int=33  (0x0021 → msg_len=0x21=33 bytes, per-phase fields)
-    # Confirmed from BCP-AT1N-L capture vs Z-Box ground truth.
-    if msg_int == 33 and message_type.upper() == '7B':
-        return SERVER_MESSAGE.SEND_DLB_3P
-    if msg_int == 17:
-        if message_type.upper() == '7B':
-            return SERVER_MESSAGE.SEND_DLB
-
-        return SERVER_MESSAGE.HANDSHAKE
-    if msg_int == 32:
-        return SERVER_MESSAGE.SEND_MODEL
-
-    # DLB config ACK/response: message_type=6b (107), message_id=0x0012 (18)
-    if msg_int == 18 and int(data[4:6], 16) == 0x6b:
-        return SERVER_MESSAGE.SEND_DLB_CONFIG
-
-    return None
+    header = int(data[4:10], 16)
+    return lookup_message_type(header >> 16, header & 0xFFFF)
+
+
+# client messages
+register_message_type(CLIENT_MESSAGE.REQUEST_DATA, 11)
+register_message_type(CLIENT_MESSAGE.SEND_CHARGER_COMMAND, 12)
+register_message_type(CLIENT_MESSAGE.SET_TIMER, 28)
+
+register_message_type(SERVER_MESSAGE.ACCESS_DENIED, 8)
+register_message_type(SERVER_MESSAGE.HANDSHAKE, 17)
+# Status packet (0x6e) has a payload length of 21 bytes (0x15)
+register_message_type(SERVER_MESSAGE.SEND_STATUS, 21)
+register_message_type(SERVER_MESSAGE.SEND_VALUES_1P, 30)
+# BCP-A2N-L v1.28 firmware changed msg_int to 31, adding support
+register_message_type(SERVER_MESSAGE.SEND_VALUES_1P, 31)
+register_message_type(SERVER_MESSAGE.SEND_MODEL, 32)
+# Additional status message type 36 added
+register_message_type(SERVER_MESSAGE.SEND_VALUES_3P, 35)
+register_message_type(SERVER_MESSAGE.SEND_VALUES_3P, 36)
+# SEND_DLB detection: both variants share message_type=7b.
+# The msg_id field encodes the msg_len byte, so the packet size is directly readable:
+#   1P SEND_DLB:   msg_int=17  (0x0011 → msg_len=0x11=17 bytes)
+#   3P SEND_DLB:   msg_int=33  (0x0021 → msg_len=0x21=33 bytes, per-phase fields)
+# Confirmed from BCP-AT1N-L capture vs Z-Box ground truth.
+register_message_type(SERVER_MESSAGE.SEND_DLB, 17, 0x7B)
+register_message_type(SERVER_MESSAGE.SEND_DLB_3P, 33, 0x7B)
+# DLB config ACK/response: message_type=6b (107), message_id=0x0012 (18)
+register_message_type(SERVER_MESSAGE.SEND_DLB_CONFIG, 18, 0x6B)
 
 def get_ip(data: str) -> str:
     """Read ip from message.
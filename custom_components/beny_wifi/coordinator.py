@@ -1,36 +1,82 @@
 """Coordinator."""
 import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
 from datetime import timedelta
+from functools import partial
 import logging
-import socket
+from types import MappingProxyType
 from typing import Any
 import time
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.util.dt import utcnow
+from homeassistant.util.dt import parse_datetime, utcnow
 
 from .communication import SERVER_MESSAGE, build_message, read_message
 from .const import (
+    CAPABILITIES,
+    CAPABILITY_REPROBE_INTERVAL,
     CHARGER_COMMAND,
     CHARGER_STATE,
+    CIRCUIT_STATE,
     CLIENT_MESSAGE,
+    COMMAND_REFRESH_DELAY,
     CONF_ANTI_OVERLOAD,
     CONF_ANTI_OVERLOAD_VALUE,
+    CONF_DLB_INTERVAL,
+    CONF_HOLD_DOWN,
     CONF_PIN,
+    CONF_SERIAL,
+    CONF_RTO_MAX,
+    CONF_RTO_MIN,
+    CONF_STATUS_INTERVAL,
+    CONF_WRITE_DELAY,
     DEFAULT_ANTI_OVERLOAD,
     DEFAULT_ANTI_OVERLOAD_VALUE,
+    DEFAULT_BREAKER_BACKOFF_MAX,
+    DEFAULT_BREAKER_BACKOFF_MIN,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_BREAKER_JITTER,
+    DEFAULT_DLB_INTERVAL,
+    DEFAULT_HOLD_DOWN,
+    DEFAULT_REQUEST_RETRIES,
+    DEFAULT_RTO_INITIAL,
+    DEFAULT_RTO_MAX,
+    DEFAULT_RTO_MIN,
+    DEFAULT_STATUS_INTERVAL,
+    DEFAULT_WRITE_DELAY,
     DLB,
+    DLB_CONFIG_SAVE_DELAY,
+    DLB_CONFIG_STORAGE_VERSION,
+    DLB_SYNC_ATTEMPTS,
+    DLB_SYNC_BACKOFF_MAX,
+    DLB_SYNC_BACKOFF_MIN,
+    DLB_SYNC_RETRIES,
     DLB_MODE,
     DOMAIN,
+    HEADER_PREFIXES,
+    IP_ADDRESS,
     REQUEST_TYPE,
     SERIAL,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+    SECTION_CONNECTION,
     SECTION_DEVICE,
     SECTION_DLB,
+    SECTION_POLLING,
+    STATE_INTERVALS,
     get_config_parameter,
     get_entity_state_by_key
 )
-from .conversions import convert_schedule, convert_timer, get_hex
+from .conversions import convert_schedule, convert_timer, get_hex, lookup_message_type
+from .discovery import async_rediscover_charger
+from .scheduler import BenyWifiPollScheduler
+from .transport import BenyWifiTransport, BenyWifiTransportHub, CircuitBreaker, CommandQueue, RttEstimator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,9 +84,7 @@ _LOGGER = logging.getLogger(__name__)
 DEFAULT_NIGHT_START = 22  # 10pm
 DEFAULT_NIGHT_END = 6     # 6am
 
-# Target window (seconds) before a DLB field is considered stale.
-# The actual poll-count threshold is computed from this and the configured
-# scan interval so behaviour is consistent regardless of polling rate.
+# Time (seconds) without a valid value before a DLB field is considered stale
 _STALE_WINDOW_SECONDS = 180  # ~3 minutes
 
 # Valid hybrid current range.
@@ -53,6 +97,27 @@ _STALE_WINDOW_SECONDS = 180  # ~3 minutes
 HYBRID_CURRENT_MIN = 1
 HYBRID_CURRENT_MAX = 98
 
+# DLB config fields carried by SET_DLB_CONFIG and echoed back in its ACK
+_DLB_FRAME_FIELDS = ("dlb_enabled", "extreme", "dlb_mode", "night", "night_start", "night_end", "anti_overload")
+
+# Faults of the STATUS reply -> fault slug, in the order of the summary fault code of VALUES
+_FAULT_MAPPING = {
+    "over_voltage": "over_voltage",
+    "under_voltage": "under_voltage",
+    "overload": "overload",
+    "high_temperature": "high_temperature",
+    "poor_grounding": "poor_grounding",
+    "leakage": "leakage",
+    "cp_signal": "cp_signal",
+    "emergency_stop": "emergency_stop",
+    "cc_signal": "cc_signal",
+    "dlb_wiring": "dlb_wiring",
+    "dlb_offline": "dlb_offline",
+    "motor_lock": "motor_lock",
+    "sticking": "sticking",
+    "contactor": "contactor",
+}
+
 
 class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Beny Wifi update coordinator."""
@@ -64,30 +129,107 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         ip_address,
         port,
         scan_interval,
+        hub: BenyWifiTransportHub | None = None,
+        scheduler: BenyWifiPollScheduler | None = None,
     ) -> None:
         """Initialize Beny Wifi update coordinator."""
+        # Each request type is polled on its own interval. The coordinator ticks
+        # at the shortest one and sends only the requests that are due.
+        dlb_interval = get_config_parameter(config_entry, SECTION_CONNECTION, CONF_DLB_INTERVAL, DEFAULT_DLB_INTERVAL)
+        self._poll_intervals: dict[REQUEST_TYPE, float] = {
+            REQUEST_TYPE.VALUES: scan_interval,
+            REQUEST_TYPE.STATUS: get_config_parameter(
+                config_entry, SECTION_CONNECTION, CONF_STATUS_INTERVAL, DEFAULT_STATUS_INTERVAL
+            ),
+        }
+        if get_config_parameter(config_entry, SECTION_DLB, DLB, False):
+            self._poll_intervals[REQUEST_TYPE.DLB] = dlb_interval
+        tick = min(self._poll_intervals.values())
+
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
+            update_interval=timedelta(seconds=tick),
         )
 
         self.config_entry = config_entry
         self.ip_address = ip_address
         self.port = port
         self.hass = hass
-        self._dlb_config_loaded = False  # set True after first successful read from charger
 
-        # Derive the stale threshold from the configured scan interval so that
-        # DLB fields always go unavailable after ~3 minutes of missing data,
-        # regardless of how fast or slow polling is set.
-        # Minimum of 3 polls is kept so a single transient failure never triggers it.
-        self.STALE_THRESHOLD = max(3, round(_STALE_WINDOW_SECONDS / scan_interval))
-        _LOGGER.debug(
-            f"STALE_THRESHOLD set to {self.STALE_THRESHOLD} polls "  # noqa: G004
-            f"({scan_interval}s interval → ~{self.STALE_THRESHOLD * scan_interval}s stale window)"
+        # One UDP endpoint is kept open for the lifetime of the coordinator instead
+        # of opening a socket (and blocking an executor thread) for every request.
+        # With a hub the endpoint is shared with the coordinators of other chargers.
+        self._hub = hub
+        self._transport = BenyWifiTransport(ip_address, port, hub)
+        # Commands are sent one at a time ahead of polls, superseded ones are dropped
+        self._commands = CommandQueue()
+        # Held while a command or a request is waiting for its reply. ACKs and denials
+        # carry no request type, only one exchange at a time tells them apart.
+        self._exchange_lock = asyncio.Lock()
+        # Writes of number entities waiting for their value to settle: key -> (cancel, apply),
+        # and the keys being written
+        self._write_delay = get_config_parameter(config_entry, SECTION_CONNECTION, CONF_WRITE_DELAY, DEFAULT_WRITE_DELAY)
+        self._pending_writes: dict[str, tuple[CALLBACK_TYPE, Callable[[], Awaitable[None]]]] = {}
+        self._writing: set[str] = set()
+        # Request types to poll again after commands, and the cancel of the pending refresh
+        self._command_refresh_types: set[REQUEST_TYPE] = set()
+        self._unsub_command_refresh: CALLBACK_TYPE | None = None
+        # Resolved once the pending refresh has been published, see async_wait_command_refresh()
+        self._command_refreshed: asyncio.Future | None = None
+        # Set when the capabilities of the charger have to be probed before the next poll
+        self._probe_capabilities = False
+        self._probe_retry_at = 0.0
+        # Ready-to-send request frames, rebuilt only when the config entry changes
+        self._update_request_frames()
+
+        # Retransmission timeout follows the measured round-trip time of this
+        # charger instead of a fixed 8 second wait per attempt.
+        self._rtt = RttEstimator(
+            min_rto=float(get_config_parameter(config_entry, SECTION_CONNECTION, CONF_RTO_MIN, DEFAULT_RTO_MIN)),
+            max_rto=float(get_config_parameter(config_entry, SECTION_CONNECTION, CONF_RTO_MAX, DEFAULT_RTO_MAX)),
+            initial_rto=DEFAULT_RTO_INITIAL,
         )
+        # Stops polling a charger that has dropped off the network and probes it
+        # with exponential backoff until it answers again.
+        self._breaker = CircuitBreaker(
+            failure_threshold=DEFAULT_BREAKER_FAILURE_THRESHOLD,
+            min_backoff=DEFAULT_BREAKER_BACKOFF_MIN,
+            max_backoff=DEFAULT_BREAKER_BACKOFF_MAX,
+            jitter=DEFAULT_BREAKER_JITTER,
+        )
+        # Polls of all chargers are spread over the interval by the scheduler.
+        # Loop time of the next scheduled poll, and of the poll being run
+        self._scheduler = scheduler
+        self._slot_at: float | None = None
+        self._slot_due: float | None = None
+        # Held while the charger is polled, so a refresh after a command never overlaps a poll
+        self._poll_lock = asyncio.Lock()
+
+        # Looks up the charger by serial when it stops answering, e.g. after a DHCP lease change
+        self._rediscovery: asyncio.Task | None = None
+        self._dlb_config_loaded = False  # set True after first successful read from charger
+
+        # Charger values are polled at a rate depending on the charger state,
+        # states without an own interval use the configured scan interval
+        self._scan_interval = scan_interval
+        self._state_intervals: dict[str, float] = {
+            state: get_config_parameter(config_entry, SECTION_POLLING, key, default)
+            for state, (key, default) in STATE_INTERVALS.items()
+        }
+        self._hold_down = get_config_parameter(config_entry, SECTION_POLLING, CONF_HOLD_DOWN, DEFAULT_HOLD_DOWN)
+        self._hold_until = 0.0  # monotonic time before which the rate is not slowed down
+
+        # Monotonic time each request type was last polled, and wall-clock time
+        # its data was last refreshed successfully
+        self._last_polled: dict[REQUEST_TYPE, float] = {}
+        self.last_refreshed: dict[REQUEST_TYPE, Any] = {}
+
+        # DLB fields go unavailable after ~3 minutes without a valid value, measured
+        # in time so it does not depend on how often they are polled. At least 3 DLB
+        # intervals are allowed so a single transient failure never triggers it.
+        self.stale_window = max(_STALE_WINDOW_SECONDS, 3 * dlb_interval)
 
         # Resolve Anti Overload initial values from config entry data.
         # CONF_ANTI_OVERLOAD is a bool (enabled/disabled); translate to the
@@ -103,7 +245,8 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         # Local cache of DLB config state — populated on first SET and preserved
         # across updates so we never accidentally reset a field we didn't intend to change.
-        # Priority: persisted options (survive HA restart) → config entry data → hardcoded defaults.
+        # Priority: DLB config store (see async_load_dlb_config) → config entry data → hardcoded defaults.
+        # Entries set up before the store keep the config in their options until it is migrated.
         persisted = config_entry.options.get("dlb_config", {})
         self._dlb_config: dict = {
             "dlb_enabled":    persisted.get("dlb_enabled",    0x01),   # default: enabled
@@ -119,45 +262,493 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         }
         if persisted:
             _LOGGER.debug(f"DLB config restored from config_entry.options: {self._dlb_config}")  # noqa: G004
-
-        # Tracks consecutive polls where a field returned None (sentinel/missing).
-        # Once a field hits STALE_THRESHOLD, is_field_stale() returns True so
+        # _dlb_config is the desired config. The config last echoed by the charger
+        # is kept apart, a config restored from the options is taken as what the
+        # charger has. The store keeps both (see async_load_dlb_config).
+        self._dlb_confirmed: dict[str, int] = self._dlb_frame()
+        # Sends the desired config until the charger confirms it, and the failed
+        # syncs of the desired config since it was last changed or confirmed
+        self._dlb_sync: asyncio.Task | None = None
+        self._dlb_failed_syncs = 0
+        # Desired and confirmed config saved across restarts, the contents last
+        # loaded or written, and whether a delayed save has yet to write them
+        self._dlb_store = Store(hass, DLB_CONFIG_STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}.dlb_config")
+        self._dlb_saved: dict | None = None
+        self._dlb_save_pending = False
+
+        # Monotonic time each DLB field last had a valid value, or was first missing
+        # (None, a sentinel) if it never had one. Once stale_window has passed without
+        # a valid value the field is stale and is_field_stale() returns True so
         # sensors can mark themselves unavailable instead of showing stale data.
-        self._stale_counts: dict[str, int] = {}
+        self._valid_at: dict[str, float] = {}
+        self._stale_fields: set[str] = set()
+        # Fields whose stale state flipped since listeners were last notified
+        self._stale_flips: set[str] = set()
+
+        # Listeners are notified only when the data key they show has changed.
+        # Entities register with their data key as listener context.
+        self._listener_index: dict[Any, list[CALLBACK_TYPE]] | None = None
+        self._notified_data: dict[str, Any] | None = None
+        self._notified_success: bool | None = None
+
+        # Last good data, restored on startup before the charger has answered
+        self._snapshot_store = Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}")
+        # Age (seconds) of the restored data until the first live refresh succeeds
+        self.restored_age: int | None = None
+
+    @staticmethod
+    def _build_request_frame(request_type: REQUEST_TYPE, pin: str, header_prefix: str | None = None) -> bytes:
+        """Build the ascii encoded frame requesting data of the given request type."""
+        if request_type is REQUEST_TYPE.SETTINGS:
+            return build_message(CLIENT_MESSAGE.REQUEST_SETTINGS, {"pin": pin}, header_prefix).encode('ascii')
+        message = CLIENT_MESSAGE.REQUEST_DLB if request_type is REQUEST_TYPE.DLB else CLIENT_MESSAGE.REQUEST_DATA
+        return build_message(
+            message, {"pin": pin, "request_type": get_hex(request_type.value)}, header_prefix
+        ).encode('ascii')
+
+    def _update_request_frames(self) -> None:
+        """Build the request frames for the configured pin and the frames sent every poll.
+
+        Both are immutable mappings of REQUEST_TYPE -> ascii encoded request frame.
+        Frames use the header prefix the charger was found to answer, and request
+        types the charger does not answer are left out of the poll.
+        """
+        pin = get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN)
+        capabilities = self.config_entry.data.get(CAPABILITIES) or {}
+        header_prefix = capabilities.get("header_prefix")
+        frames = {
+            request_type: self._build_request_frame(request_type, pin, header_prefix)
+            for request_type in (
+                REQUEST_TYPE.VALUES, REQUEST_TYPE.STATUS, REQUEST_TYPE.MODEL, REQUEST_TYPE.DLB, REQUEST_TYPE.SETTINGS
+            )
+        }
+        self._request_frames = MappingProxyType(frames)
+
+        unsupported = set(capabilities.get("unsupported", ()))
+        # VALUES is always polled, without it there is nothing to show
+        self._poll_frames = MappingProxyType({
+            request_type: frames[request_type]
+            for request_type in self._poll_intervals
+            if request_type is REQUEST_TYPE.VALUES or request_type.name not in unsupported
+        })
+        for request_type in self._poll_intervals.keys() - self._poll_frames.keys():
+            _LOGGER.debug(f"{self.ip_address} does not answer {request_type.name} requests, not polling them")  # noqa: G004
+
+        # Request types that only timed out are polled and probed again later
+        probed = unsupported | set(capabilities.get("supported", ()))
+        self._probe_capabilities = any(request_type.name not in probed for request_type in self._poll_intervals)
+
+    async def async_probe_capabilities(self) -> dict | None:
+        """Find out which header prefix and request types the charger answers.
+
+        The MODEL request is sent with each known header prefix until one is
+        answered, then every request type is sent once with that prefix.
+        Requests are sent one at a time so a reply cannot be mistaken for the
+        reply to another probe. A request type is unsupported only when the
+        charger denies it or answers with a frame that cannot be read, one that
+        timed out is left out of both lists to be probed again later.
+
+        Returns:
+            dict | None: capabilities, None if the charger did not answer at all
+
+        """
+        pin = get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN)
+
+        async def answers(request_type: REQUEST_TYPE, header_prefix: str) -> bytes | None:
+            request = self._build_request_frame(request_type, pin, header_prefix)
+            for attempt in range(2):
+                start_time = time.monotonic()
+                try:
+                    async with self._exchange_lock:
+                        reply = await self._transport.async_request(request, self._rtt.rto * 2, request_type)
+                except TimeoutError:
+                    continue
+                except OSError:
+                    return None
+                if attempt == 0:
+                    # Answered probes tighten the timeout of the ones that follow
+                    self._rtt.update(time.monotonic() - start_time)
+                return reply
+            return None
+
+        def denied(reply: bytes) -> bool:
+            if reply.startswith(b"55aa100008"):
+                return True
+            try:
+                return not read_message(reply)
+            except ValueError:
+                return True
+
+        for header_prefix in HEADER_PREFIXES:
+            model_reply = await answers(REQUEST_TYPE.MODEL, header_prefix)
+            if model_reply is not None and not denied(model_reply):
+                break
+        else:
+            return None
+
+        try:
+            model = (read_message(model_reply) or {}).get("model")
+        except ValueError:
+            model = None
+        supported = [REQUEST_TYPE.MODEL.name]
+        unsupported = []
+        for request_type in (REQUEST_TYPE.VALUES, REQUEST_TYPE.STATUS, REQUEST_TYPE.DLB, REQUEST_TYPE.SETTINGS):
+            if request_type is REQUEST_TYPE.DLB and request_type not in self._poll_intervals:
+                continue  # no DLB module configured
+            reply = await answers(request_type, header_prefix)
+            if reply is None:
+                _LOGGER.debug(f"{self.ip_address} did not answer the {request_type.name} probe, probing it again later")  # noqa: G004
+            elif denied(reply):
+                unsupported.append(request_type.name)
+            else:
+                supported.append(request_type.name)
+
+        return {
+            "header_prefix": header_prefix,
+            "model": model,
+            "supported": supported,
+            "unsupported": unsupported,
+        }
+
+    async def _async_update_capabilities(self) -> None:
+        """Probe the charger and save the capabilities in the config entry if they changed."""
+        capabilities = await self.async_probe_capabilities()
+        if capabilities is None:
+            _LOGGER.debug(f"Capability probe of {self.ip_address} got no reply, retrying on next poll")  # noqa: G004
+            return
+        self._probe_retry_at = time.monotonic() + CAPABILITY_REPROBE_INTERVAL
+
+        if capabilities != self.config_entry.data.get(CAPABILITIES):
+            _LOGGER.info(  # noqa: G004
+                f"Charger at {self.ip_address} ({capabilities['model']}) answers "
+                f"{', '.join(capabilities['supported'])} with header {capabilities['header_prefix']}"
+                + (f", not {', '.join(capabilities['unsupported'])}" if capabilities['unsupported'] else "")
+            )
+            self.hass.config_entries.async_update_entry(
+                self.config_entry, data={**self.config_entry.data, CAPABILITIES: capabilities}
+            )
+        self._update_request_frames()
+
+    async def async_config_entry_updated(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Rebuild the cached request frames after the config entry has been updated."""
+        self._update_request_frames()
+
+    def _adapt_values_interval(self, state: str | None) -> None:
+        """Adjust the VALUES poll interval to the charger state.
+
+        A faster interval is taken into use right away, so a session that is
+        starting is sampled closely from its first moments. A slower one only
+        after the charger has not needed the current rate for the hold-down
+        period, so a short pause in a session does not slow polling down.
+        """
+        interval = self._state_intervals.get(state, self._scan_interval)
+        current = self._poll_intervals[REQUEST_TYPE.VALUES]
+        now = time.monotonic()
+
+        if interval <= current:
+            self._hold_until = now + self._hold_down
+            if interval == current:
+                return
+        elif now < self._hold_until:
+            return
+
+        _LOGGER.debug(  # noqa: G004
+            f"Charger state {state}, polling values every {interval}s instead of {current}s"
+        )
+        self._poll_intervals[REQUEST_TYPE.VALUES] = interval
+        # Takes effect when the next refresh is scheduled after this update
+        self.update_interval = timedelta(seconds=min(self._poll_intervals.values()))
+
+    async def async_restore_snapshot(self) -> bool:
+        """Restore the data saved by a previous run.
+
+        Returns:
+            bool: True if a snapshot was found and taken into use
+
+        """
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot or not snapshot.get("data"):
+            return False
+
+        data = snapshot["data"]
+        for key in ("timer_start", "timer_end"):
+            if isinstance(data.get(key), str) and data[key] != "not_set":
+                data[key] = parse_datetime(data[key])
+        # The DLB config comes from its own store, which is more recent
+        data["dlb_config"] = self._dlb_config_state()
+
+        saved_at = parse_datetime(snapshot.get("saved_at", ""))
+        self.restored_age = round((utcnow() - saved_at).total_seconds()) if saved_at else None
+        self.data = data
+        _LOGGER.debug(f"Restored data of {self.ip_address} saved {self.restored_age}s ago")  # noqa: G004
+        return True
+
+    @callback
+    def _snapshot(self) -> dict:
+        """Return the data to save for the next startup."""
+        return {
+            "saved_at": utcnow().isoformat(),
+            # The DLB config has its own store
+            "data": {key: value for key, value in self.data.items() if key != "dlb_config"},
+        }
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context: Any = None) -> CALLBACK_TYPE:
+        """Listen for data updates of the data key given as context."""
+        remove = super().async_add_listener(update_callback, context)
+        self._listener_index = None
+
+        @callback
+        def remove_listener() -> None:
+            remove()
+            self._listener_index = None
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners whose data key changed since the previous notification.
+
+        All listeners are notified when the update state flips between success
+        and failure, since that changes the availability of every entity.
+        Listeners without context are always notified.
+        """
+        data = self.data or {}
+        previous = self._notified_data
+        changed_success = self.last_update_success != self._notified_success
+        self._notified_data = data
+        self._notified_success = self.last_update_success
+
+        if previous is None or changed_success:
+            self._stale_flips.clear()
+            super().async_update_listeners()
+            return
+
+        changed = {key for key in data.keys() | previous.keys() if data.get(key) != previous.get(key)}
+        changed |= self._stale_flips
+        self._stale_flips.clear()
+
+        if self._listener_index is None:
+            self._listener_index = {}
+            for update_callback, context in self._listeners.values():
+                self._listener_index.setdefault(context, []).append(update_callback)
+
+        for key in (None, *changed):
+            for update_callback in self._listener_index.get(key, ()):
+                update_callback()
+
+    @property
+    def rtt_estimates(self) -> dict:
+        """Return the current round-trip time estimates of the charger in milliseconds."""
+        return self._rtt.as_dict()
+
+    @property
+    def command_stats(self) -> dict:
+        """Return the depth of the command queue and the number of commands sent and replaced."""
+        return self._commands.as_dict()
+
+    @property
+    def transport_stats(self) -> dict | None:
+        """Return the counters of the shared UDP endpoint, None if the coordinator has its own."""
+        return self._hub.as_dict() if self._hub is not None else None
 
     def is_field_stale(self, field: str) -> bool:
-        """Return True if the field has been missing for STALE_THRESHOLD consecutive polls."""
-        return self._stale_counts.get(field, 0) >= self.STALE_THRESHOLD
+        """Return True if the field has had no valid value for stale_window seconds."""
+        return field in self._stale_fields
 
-    def _update_stale_count(self, field: str, value) -> None:
-        """Increment stale counter when value is None, reset it when a valid value arrives."""
+    def _update_stale(self, field: str, value) -> None:
+        """Mark the field stale once stale_window has passed without a valid value, fresh on a valid one."""
+        now = time.monotonic()
         if value is None:
-            self._stale_counts[field] = self._stale_counts.get(field, 0) + 1
-            if self._stale_counts[field] == self.STALE_THRESHOLD:
+            valid_at = self._valid_at.setdefault(field, now)
+            if field not in self._stale_fields and now - valid_at >= self.stale_window:
+                self._stale_fields.add(field)
+                self._stale_flips.add(field)
                 _LOGGER.warning(  # noqa: G004
-                    f"Field '{field}' has been unavailable for {self.STALE_THRESHOLD} "
-                    f"consecutive polls — marking as stale"
+                    f"Field '{field}' has been unavailable for {now - valid_at:.0f}s — marking as stale"
                 )
         else:
-            if self._stale_counts.get(field, 0) >= self.STALE_THRESHOLD:
+            if field in self._stale_fields:
                 _LOGGER.info(f"Field '{field}' has recovered and is available again")  # noqa: G004
-            self._stale_counts[field] = 0
+                self._stale_fields.discard(field)
+                self._stale_flips.add(field)
+            self._valid_at[field] = now
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh in the charger's slot of the poll schedule."""
+        if self._scheduler is None or self not in self._scheduler:
+            super()._schedule_refresh()
+            return
+        if self.update_interval is None or self.config_entry.pref_disable_polling:
+            return
+
+        self._async_unsub_refresh()
+        loop = self.hass.loop
+        self._slot_at = self._scheduler.next_slot(self, loop.time(), self.update_interval.total_seconds())
+        self._unsub_refresh = loop.call_at(self._slot_at, self._handle_slot).cancel
+
+    @callback
+    def _handle_slot(self) -> None:
+        self._slot_due = self._slot_at
+        self.config_entry.async_create_background_task(
+            self.hass, self._handle_refresh_interval(), f"{DOMAIN} poll {self.config_entry.entry_id}"
+        )
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Move a scheduled refresh to the charger's current slot, e.g. after chargers were added."""
+        if self._unsub_refresh is not None:
+            self._schedule_refresh()
+
+    @property
+    def schedule_phase(self) -> float | None:
+        """Return the offset of the charger's polls as a fraction of the interval, None if not scheduled."""
+        if self._scheduler is None or self not in self._scheduler:
+            return None
+        return self._scheduler.phase(self)
 
     async def _async_update_data(self) -> dict[str, Any]:
+        """Poll the charger, at most the scheduler's in-flight limit of chargers at a time.
+
+        The time from the scheduled slot to the start of the poll is reported
+        as schedule_lag (ms).
+        """
+        if self._scheduler is None:
+            async with self._poll_lock:
+                return await self._async_poll_charger()
+
+        async with self._scheduler.in_flight:
+            due, self._slot_due = self._slot_due, None
+            lag = self.hass.loop.time() - due if due is not None else None
+            async with self._poll_lock:
+                data = await self._async_poll_charger()
+        if lag is not None:
+            data["schedule_lag"] = round(lag * 1000)
+        return data
+
+    async def _async_poll_charger(self) -> dict[str, Any]:
         """Fetch data asynchronously.
 
-        If the entire fetch fails (device unreachable, UDP timeout, etc.) we still
-        increment stale counts for all DLB fields so they tip to unavailable after
-        STALE_THRESHOLD missed polls, just as they would for per-field sentinel failures.
+        If the entire fetch fails (device unreachable, UDP timeout, etc.) the DLB
+        fields are still updated as missing, so they tip to unavailable once
+        stale_window has passed, just as they would for per-field sentinel failures.
+
+        Polls go through a circuit breaker: once the charger has failed several
+        polls in a row it is no longer polled, but probed with a single request
+        per backoff window. A successful probe closes the breaker and the full
+        refresh follows right away.
         """
         try:
-            return await self._fetch_data()
+            if self._breaker.state is not CIRCUIT_STATE.CLOSED:
+                now = time.monotonic()
+                if not self._breaker.allow_probe(now):
+                    raise UpdateFailed(
+                        f"Charger at {self.ip_address} is not responding, "
+                        f"next probe in {self._breaker.retry_at - now:.0f}s"
+                    )
+                if not await self._async_probe():
+                    self._breaker.record_failure(time.monotonic())
+                    self._start_rediscovery()
+                    _LOGGER.debug(  # noqa: G004
+                        f"Probe of {self.ip_address} failed, backing off for ~{self._breaker.backoff:.0f}s"
+                    )
+                    raise UpdateFailed(f"Charger at {self.ip_address} is not responding")
+                self._breaker.record_success()
+                _LOGGER.info(f"Charger at {self.ip_address} is responding again")  # noqa: G004
+                # The charger may have been restarted with new firmware
+                self._probe_capabilities = True
+                self._probe_retry_at = 0.0
+
+            if self._probe_capabilities and time.monotonic() >= self._probe_retry_at:
+                await self._async_update_capabilities()
+
+            try:
+                data = await self._fetch_data()
+            except UpdateFailed:
+                if self._breaker.record_failure(time.monotonic()):
+                    _LOGGER.warning(  # noqa: G004
+                        f"Charger at {self.ip_address} failed {self._breaker.failures} polls in a row, "
+                        f"polling paused and probing every ~{self._breaker.backoff:.0f}s until it responds"
+                    )
+                    self._start_rediscovery()
+                raise
+            self._breaker.record_success()
+            self._snapshot_store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+            if (
+                self.dlb_config_pending
+                and self._dlb_failed_syncs < DLB_SYNC_RETRIES
+                and (self._dlb_sync is None or self._dlb_sync.done())
+            ):
+                # The charger answers again, retry the config it has not confirmed
+                self._async_start_dlb_sync()
+            if self.restored_age is not None:
+                # Live data replaces the restored data, update every entity
+                self.restored_age = None
+                self._notified_data = None
+            return data
         except UpdateFailed:
             if get_config_parameter(self.config_entry, SECTION_DLB, DLB, False):
                 for key in ("grid_power", "house_power", "ev_power", "solar_power"):
-                    self._update_stale_count(key, None)
+                    self._update_stale(key, None)
             raise
 
+    async def _async_probe(self) -> bool:
+        """Send a single VALUES request to find out whether the charger is reachable again."""
+        request = self._request_frames[REQUEST_TYPE.VALUES]
+        try:
+            async with self._exchange_lock:
+                await self._transport.async_request(request, self._rtt.rto, REQUEST_TYPE.VALUES)
+        except (TimeoutError, OSError) as err:
+            _LOGGER.debug(f"Probe of {self.ip_address} got no reply: {err!r}")  # noqa: G004
+            return False
+        return True
+
+    def _start_rediscovery(self) -> None:
+        """Look for the charger at a new address in the background unless already looking."""
+        if self._rediscovery is None or self._rediscovery.done():
+            self._rediscovery = self.config_entry.async_create_background_task(
+                self.hass, self._async_rediscover(), f"{DOMAIN} rediscovery {self.config_entry.entry_id}"
+            )
+
+    async def _async_rediscover(self) -> None:
+        """Broadcast for the charger by serial and follow it to its new address.
+
+        The new address is set on the open UDP endpoint and saved in the config
+        entry without reloading it, then the charger is probed right away.
+        """
+        serial = get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_SERIAL)
+        if not serial:
+            return
+        pin = get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN)
+        try:
+            charger = await async_rediscover_charger(self.hass, serial, pin, self.port)
+        except OSError as err:
+            _LOGGER.debug(f"Rediscovery of charger {serial} failed: {err}")  # noqa: G004
+            return
+
+        if charger is None:
+            _LOGGER.debug(f"Charger {serial} did not answer the broadcast handshake")  # noqa: G004
+            return
+        if charger["ip_address"] == self.ip_address:
+            return
+
+        _LOGGER.info(f"Charger {serial} moved from {self.ip_address} to {charger['ip_address']}")  # noqa: G004
+        self.ip_address = charger["ip_address"]
+        self._transport.ip_address = charger["ip_address"]
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            data={
+                **self.config_entry.data,
+                SECTION_CONNECTION: {
+                    **self.config_entry.data.get(SECTION_CONNECTION, {}),
+                    IP_ADDRESS: charger["ip_address"],
+                },
+            },
+        )
+        self._breaker.retry_now(time.monotonic())
+        await self.async_request_refresh()
+
     async def async_read_dlb_config(self) -> bool:
         """Attempt to read current DLB config from charger to populate _dlb_config cache.
 
@@ -166,16 +757,15 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         returns True (marking the attempt as done) so the coordinator stops retrying.
 
         Config is populated via two other mechanisms instead:
-          - Persisted values from config_entry.options (restored in __init__)
+          - Persisted values from the DLB config store (see async_load_dlb_config)
           - ACK parsing after every async_set_dlb_config call
 
         Returns:
             bool: Always True — signals caller not to retry.
         """
-        persisted = self.config_entry.options.get("dlb_config", {})
-        if persisted:
+        if self._dlb_saved is not None:
             _LOGGER.info(  # noqa: G004
-                f"DLB config loaded from persisted options: "
+                f"DLB config loaded from storage: "
                 f"extreme={self._dlb_config['extreme']:#04x} "
                 f"dlb_mode={self._dlb_config['dlb_mode']:#04x} "
                 f"night={self._dlb_config['night']:#04x} "
@@ -189,225 +779,476 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             )
         return True
 
-    async def _async_persist_dlb_config(self) -> None:
-        """Persist _dlb_config to config_entry.options so it survives HA restarts."""
-        options = dict(self.config_entry.options)
-        options["dlb_config"] = dict(self._dlb_config)
-        self.hass.config_entries.async_update_entry(self.config_entry, options=options)
-        _LOGGER.debug(f"DLB config persisted to config_entry.options: {self._dlb_config}")  # noqa: G004
+    async def async_load_dlb_config(self) -> None:
+        """Load the desired and the confirmed DLB config saved by a previous run.
+
+        A desired config the charger had not confirmed is sent again after
+        the first successful poll. A config still kept in the options of the
+        config entry is moved to the store and removed from the options.
+        """
+        stored = await self._dlb_store.async_load()
+        if stored is not None:
+            self._dlb_config.update(stored["desired"])
+            self._dlb_confirmed = dict(stored["confirmed"])
+            self._dlb_saved = stored
+            return
+
+        if "dlb_config" in self.config_entry.options:
+            # The config was already restored from the options in __init__
+            await self._dlb_store.async_save(self._dlb_store_data())
+            options = {key: value for key, value in self.config_entry.options.items() if key != "dlb_config"}
+            self.hass.config_entries.async_update_entry(self.config_entry, options=options)
+            _LOGGER.info("DLB config moved from the config entry options to its own storage")
+
+    @callback
+    def _async_persist_dlb_config(self) -> None:
+        """Save the DLB config so it survives HA restarts, once it has not changed for DLB_CONFIG_SAVE_DELAY."""
+        if {"desired": self._dlb_config, "confirmed": self._dlb_confirmed} != self._dlb_saved:
+            self._dlb_save_pending = True
+            self._dlb_store.async_delay_save(self._dlb_store_data, DLB_CONFIG_SAVE_DELAY)
+
+    @callback
+    def _dlb_store_data(self) -> dict:
+        """Return the desired and the confirmed DLB config to write to the store."""
+        self._dlb_saved = {"desired": dict(self._dlb_config), "confirmed": dict(self._dlb_confirmed)}
+        self._dlb_save_pending = False
+        _LOGGER.debug(f"DLB config saved: {self._dlb_saved}")  # noqa: G004
+        return self._dlb_saved
+
+    async def _fetch_data(self, request_types: set[REQUEST_TYPE] | None = None):
+        """Send UDP request and fetch data asynchronously.
+
+        Args:
+            request_types (set[REQUEST_TYPE] | None): poll only these request types, due or not,
+                None to poll the types that are due
 
-    async def _fetch_data(self):
-        """Send UDP request and fetch data asynchronously."""
+        """
 
         # On the first successful fetch, attempt to read DLB config directly from
         # the charger so entities reflect actual state rather than defaults/persisted cache.
         if get_config_parameter(self.config_entry, SECTION_DLB, DLB, False) and not self._dlb_config_loaded:
             self._dlb_config_loaded = await self.async_read_dlb_config()
 
+        # Queued commands go ahead of the poll
+        await self._commands.async_wait_idle()
+
+        now = time.monotonic()
+        # Half a tick of tolerance so a type is not pushed back a whole tick by scheduling jitter
+        tolerance = self.update_interval.total_seconds() / 2
+        requests = {
+            request_type: frame
+            for request_type, frame in self._poll_frames.items()
+            if (
+                request_type in request_types if request_types is not None
+                else now - self._last_polled.get(request_type, -float("inf")) + tolerance >= self._poll_intervals[request_type]
+            )
+        }
+
         try:
-            # Build the request message
-            request = build_message(
-                CLIENT_MESSAGE.REQUEST_DATA,
-                {"pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN), "request_type": get_hex(REQUEST_TYPE.VALUES.value)}
-            ).encode('ascii')
+            # Send all due requests at once and collect the replies.
+            # Request frames are prebuilt, see _update_request_frames()
+            replies = await self._async_request_cycle(requests)
+
+            # Types not polled this cycle keep their values from the previous snapshot
+            data = dict(self.data) if self.data else {}
+
+            if REQUEST_TYPE.VALUES in replies:
+                previous_fault = data.get("fault_code_numeric")
+                data.update(self._parse_values(*replies[REQUEST_TYPE.VALUES]))
+                self.last_refreshed[REQUEST_TYPE.VALUES] = utcnow()
+                self._adapt_values_interval(data.get("state"))
+                data["poll_interval"] = self._poll_intervals[REQUEST_TYPE.VALUES]
+                if (
+                    previous_fault is not None
+                    and data["fault_code_numeric"] != previous_fault
+                    and REQUEST_TYPE.STATUS not in replies
+                ):
+                    # Summary fault changed, fetch the detailed status on the next tick
+                    self._last_polled.pop(REQUEST_TYPE.STATUS, None)
+
+            # DLB data — isolated so a DLB failure doesn't discard valid charger data
+            if REQUEST_TYPE.DLB in replies:
+                self._merge_dlb(data, replies[REQUEST_TYPE.DLB][0])
+
+            # Detailed fault status
+            if REQUEST_TYPE.STATUS in replies:
+                self._merge_status(data, replies[REQUEST_TYPE.STATUS][0])
+            elif REQUEST_TYPE.STATUS not in self._poll_frames and REQUEST_TYPE.VALUES in replies:
+                # The charger does not answer STATUS, the summary fault code is all there is
+                self._merge_summary_fault(data)
 
-            # Send UDP request asynchronously
-            loop = asyncio.get_running_loop()
-            start_time = time.monotonic()
-            response_raw = await loop.run_in_executor(None, self._send_udp_request, request)
-            latency = time.monotonic() - start_time
-            
-            # Decode and parse the response
-            response_str = response_raw.decode('ascii')
-            
-            # Authentication failed
-            if "55aa100008" in response_str:
-                raise Exception("Authentication failed, check PIN")
-        
-            data = read_message(response_str)
-
-            if data is None:
-                raise UpdateFailed("Error fetching data: checksum not valid")
-
-            data["udp_latency"] = round(latency * 1000, 2)
-
-            if data['message_type'] == "SERVER_MESSAGE.ACCESS_DENIED":
-                raise UpdateFailed("Device denied request. Please reconfigure integration if your pin has changed")
-
-            # Set unset state to both start and end time if timer is not set at all
-            if data['timer_state'] == 'UNSET':
-                start = "not_set"
-                end = "not_set"
-            # if timer has START_TIME or START_END_TIME value
-            elif data['timer_state'] != 'END_TIME':
-                # Convert timer values to timestamps
-                now = utcnow()
-                start = now.replace(
-                    hour=data['timer_start_h'], minute=data['timer_start_min'], second=0, microsecond=0
-                )
+            # Expose current DLB config state so entities can read it
+            data['dlb_config'] = self._dlb_config_state()
 
-                # If start is before current time, move it to the next day
-                if start < now:
-                    start += timedelta(days=1)
+            for request_type in requests:
+                self._last_polled[request_type] = now
 
-                if data['timer_state'] == 'START_END_TIME':
-                    end = now.replace(
-                        hour=data['timer_end_h'], minute=data['timer_end_min'], second=0, microsecond=0
-                    )
+            return data
+
+        except Exception as err:
+            _LOGGER.error(f"Failed to fetch data: {err}")
+            raise UpdateFailed(f"Error fetching data: {err}")
 
-                    # If end is before current time, move it to the next day
-                    if end < now:
-                        end += timedelta(days=1)
+    def _parse_values(self, response_raw, latency) -> dict:
+        """Parse the VALUES reply, raising if it is missing or invalid."""
+        if isinstance(response_raw, Exception):
+            raise response_raw
 
-                    # If end is also before start, move end to the next day of start
-                    if end <= start:
-                        end += timedelta(days=1)
-                else:
-                    # timer end is not set
-                    end = "not_set"
-            else:
-                start = "not_set"
+        # Authentication failed
+        if response_raw.startswith(b"55aa100008"):
+            raise Exception("Authentication failed, check PIN")
+
+        # Parse the response straight from the received frame
+        data = read_message(response_raw)
+
+        if data is None:
+            raise UpdateFailed("Error fetching data: checksum not valid")
+
+        data["udp_latency"] = round(latency * 1000, 2)
+
+        if data['message_type'] == "SERVER_MESSAGE.ACCESS_DENIED":
+            raise UpdateFailed("Device denied request. Please reconfigure integration if your pin has changed")
+
+        # Set unset state to both start and end time if timer is not set at all
+        if data['timer_state'] == 'UNSET':
+            start = "not_set"
+            end = "not_set"
+        # if timer has START_TIME or START_END_TIME value
+        elif data['timer_state'] != 'END_TIME':
+            # Convert timer values to timestamps
+            now = utcnow()
+            start = now.replace(
+                hour=data['timer_start_h'], minute=data['timer_start_min'], second=0, microsecond=0
+            )
+
+            # If start is before current time, move it to the next day
+            if start < now:
+                start += timedelta(days=1)
 
-                # Convert timer value to timestamp
-                now = utcnow()
+            if data['timer_state'] == 'START_END_TIME':
                 end = now.replace(
                     hour=data['timer_end_h'], minute=data['timer_end_min'], second=0, microsecond=0
                 )
 
-            data['timer_start'] = start
-            data['timer_end'] = end
+                # If end is before current time, move it to the next day
+                if end < now:
+                    end += timedelta(days=1)
 
-            data['charger_state'] = data['state'].lower()
+                # If end is also before start, move end to the next day of start
+                if end <= start:
+                    end += timedelta(days=1)
+            else:
+                # timer end is not set
+                end = "not_set"
+        else:
+            start = "not_set"
 
-            data['power'] = float(data['power']) / 10
-            data['total_kwh'] = float(data['total_kwh'])
-            data['temperature'] = int(data['temperature'] - 100)
+            # Convert timer value to timestamp
+            now = utcnow()
+            end = now.replace(
+                hour=data['timer_end_h'], minute=data['timer_end_min'], second=0, microsecond=0
+            )
 
-            # DLB data fetch — isolated so a DLB failure doesn't discard valid charger data
-            if get_config_parameter(self.config_entry, SECTION_DLB, DLB):
-                try:
-                    request = build_message(
-                        CLIENT_MESSAGE.REQUEST_DLB,
-                        {"pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN), "request_type": get_hex(REQUEST_TYPE.DLB.value)}
-                    ).encode('ascii')
-
-                    loop = asyncio.get_running_loop()
-                    response_dlb = await loop.run_in_executor(None, self._send_udp_request, request)
-                    response_dlb = response_dlb.decode('ascii')
-                    data_dlb = read_message(response_dlb)
-
-                    if data_dlb is None:
-                        _LOGGER.warning("DLB response had invalid checksum — skipping DLB data this cycle")
-                        for key in ("grid_power", "house_power", "ev_power", "solar_power"):
-                            self._update_stale_count(key, None)
-                    else:
-                        # Track staleness per field. None means the charger sent a sentinel
-                        # (0xFF00+) indicating DLB data is temporarily unavailable.
-                        # Only assign valid values so sensors can retain last known state
-                        # until is_field_stale() tips them to unavailable after STALE_THRESHOLD.
-                        for key in ("grid_power", "house_power", "ev_power", "solar_power"):
-                            val = data_dlb.get(key)
-                            self._update_stale_count(key, val)
-                            if val is not None:
-                                data[key] = val
-
-                except Exception as dlb_err:
-                    _LOGGER.warning(
-                        f"DLB fetch failed (non-fatal): {dlb_err} — DLB sensors will retain last valid value"
-                    )
-                    for key in ("grid_power", "house_power", "ev_power", "solar_power"):
-                        self._update_stale_count(key, None)
-                    # Do not re-raise: the primary charger data is still valid
+        data['timer_start'] = start
+        data['timer_end'] = end
 
-            # Fetch detailed fault status
-            try:
-                request_status = build_message(
-                    CLIENT_MESSAGE.REQUEST_DATA,
-                    {"pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN), "request_type": get_hex(REQUEST_TYPE.STATUS.value)}
-                ).encode('ascii')
-                response_status_raw = await loop.run_in_executor(None, self._send_udp_request, request_status)
-                data_status = read_message(response_status_raw.decode('ascii'))
-                
-                fault_mapping = {
-                    "over_voltage": "over_voltage",
-                    "under_voltage": "under_voltage",
-                    "overload": "overload",
-                    "high_temperature": "high_temperature",
-                    "poor_grounding": "poor_grounding",
-                    "leakage": "leakage",
-                    "cp_signal": "cp_signal",
-                    "emergency_stop": "emergency_stop",
-                    "cc_signal": "cc_signal",
-                    "dlb_wiring": "dlb_wiring",
-                    "dlb_offline": "dlb_offline",
-                    "motor_lock": "motor_lock",
-                    "sticking": "sticking",
-                    "contactor": "contactor",
-                }
+        data['charger_state'] = data['state'].lower()
+
+        data['power'] = float(data['power']) / 10
+        data['total_kwh'] = float(data['total_kwh'])
+        data['temperature'] = int(data['temperature'] - 100)
+
+        return data
+
+    def _merge_dlb(self, data: dict, response_dlb) -> None:
+        """Merge the DLB reply into data. Failures are not fatal, fields only go stale."""
+        try:
+            if isinstance(response_dlb, Exception):
+                raise response_dlb
+            data_dlb = read_message(response_dlb)
+
+            if data_dlb is None:
+                _LOGGER.warning("DLB response had invalid checksum — skipping DLB data this cycle")
+                for key in ("grid_power", "house_power", "ev_power", "solar_power"):
+                    self._update_stale(key, None)
+            else:
+                # Track staleness per field. None means the charger sent a sentinel
+                # (0xFF00+) indicating DLB data is temporarily unavailable.
+                # Only assign valid values so sensors can retain last known state
+                # until is_field_stale() tips them to unavailable after stale_window.
+                for key in ("grid_power", "house_power", "ev_power", "solar_power"):
+                    val = data_dlb.get(key)
+                    self._update_stale(key, val)
+                    if val is not None:
+                        data[key] = val
+                self.last_refreshed[REQUEST_TYPE.DLB] = utcnow()
+
+        except Exception as dlb_err:
+            _LOGGER.warning(
+                f"DLB fetch failed (non-fatal): {dlb_err} — DLB sensors will retain last valid value"
+            )
+            for key in ("grid_power", "house_power", "ev_power", "solar_power"):
+                self._update_stale(key, None)
+            # Do not re-raise: the primary charger data is still valid
+
+    def _merge_status(self, data: dict, response_status_raw) -> None:
+        """Merge the detailed fault status reply into data."""
+        try:
+            if isinstance(response_status_raw, Exception):
+                raise response_status_raw
+            data_status = read_message(response_status_raw)
 
+            if data_status:
                 # Initialize all faults to False
-                for slug in fault_mapping.values():
+                for slug in _FAULT_MAPPING.values():
                     data[f"{slug}_fault"] = False
 
-                if data_status:
-                    active_faults = []
-                    for fault_key, label in fault_mapping.items():
-                        is_active = data_status.get(fault_key) == 1
-                        data[f"{label}_fault"] = is_active
-                        if is_active:
-                            active_faults.append(label)
-                    
-                    data["fault_code"] = active_faults[0] if active_faults else "none"
-                else:
-                    # Fallback: use the summary fault code from the main values packet
-                    summary_code = data.get("fault_code_numeric", 0)
-                    labels = list(fault_mapping.keys())
-                    if 0 < summary_code <= len(labels):
-                        slug = labels[summary_code - 1]
-                        data["fault_code"] = slug
-                        data[f"{slug}_fault"] = True
-                    else:
-                        data["fault_code"] = "none"
-            except Exception as status_err:
-                _LOGGER.debug(f"Failed to fetch detailed fault status: {status_err}")
-                data["fault_code"] = "Unknown"
+                active_faults = []
+                for fault_key, label in _FAULT_MAPPING.items():
+                    is_active = data_status.get(fault_key) == 1
+                    data[f"{label}_fault"] = is_active
+                    if is_active:
+                        active_faults.append(label)
 
+                data["fault_code"] = active_faults[0] if active_faults else "none"
+                self.last_refreshed[REQUEST_TYPE.STATUS] = utcnow()
+            else:
+                self._merge_summary_fault(data)
+        except Exception as status_err:
+            _LOGGER.debug(f"Failed to fetch detailed fault status: {status_err}")
+            data["fault_code"] = "Unknown"
+
+    @staticmethod
+    def _merge_summary_fault(data: dict) -> None:
+        """Set the fault keys from the summary fault code of the main values packet."""
+        for slug in _FAULT_MAPPING.values():
+            data[f"{slug}_fault"] = False
+
+        summary_code = data.get("fault_code_numeric", 0)
+        labels = list(_FAULT_MAPPING.keys())
+        if 0 < summary_code <= len(labels):
+            slug = _FAULT_MAPPING[labels[summary_code - 1]]
+            data["fault_code"] = slug
+            data[f"{slug}_fault"] = True
+        else:
+            data["fault_code"] = "none"
 
-            # Expose current DLB config state so entities can read it
-            data['dlb_config'] = dict(self._dlb_config)
+    async def _async_request_cycle(self, requests: dict) -> dict:
+        """Send all requests of a poll cycle at once and collect the replies.
 
-            return data
+        Replies are correlated to their request by request type on the shared
+        endpoint. The cycle completes when the last reply arrives or when the
+        full retransmission budget of a single request has passed, whichever
+        comes first.
 
-        except Exception as err:
-            _LOGGER.error(f"Failed to fetch data: {err}")
-            raise UpdateFailed(f"Error fetching data: {err}")
+        Args:
+            requests (dict): REQUEST_TYPE -> request frame (bytes)
+
+        Returns:
+            dict: REQUEST_TYPE -> (reply bytes or the exception raised, latency in seconds)
+
+        """
+        async def timed_request(request_type, request):
+            start_time = time.monotonic()
+            response = await self._send_udp_request(request, reply_key=request_type)
+            return response, time.monotonic() - start_time
+
+        if not requests:
+            # Refresh requested before any request type is due again
+            return {}
+
+        # Commands queued meanwhile are sent after the cycle, their ACK could
+        # otherwise be taken for the reply of a request type
+        async with self._exchange_lock:
+            tasks = {
+                request_type: asyncio.create_task(timed_request(request_type, request))
+                for request_type, request in requests.items()
+            }
+            deadline = self._rtt.budget(DEFAULT_REQUEST_RETRIES) + self._rtt.min_rto
+            _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+            for task in pending:
+                task.cancel()
+
+        replies = {}
+        for request_type, task in tasks.items():
+            if task in pending:
+                replies[request_type] = (TimeoutError(f"No {request_type.name} reply within cycle deadline"), None)
+            elif task.exception() is not None:
+                replies[request_type] = (task.exception(), None)
+            else:
+                replies[request_type] = task.result()
+        return replies
+
+    async def _send_udp_request(self, request, retries=DEFAULT_REQUEST_RETRIES, timeout=None, reply_key=None):
+        """Send UDP request over the persistent endpoint, with retries.
 
-    def _send_udp_request(self, request, retries=2, timeout=8):
-        """Send UDP request synchronously in a separate thread, with retries."""
+        Unless a fixed timeout is given, each attempt waits for the current
+        retransmission timeout of the charger, doubled on every retransmission.
+        Only replies to the first transmission are used as RTT samples (Karn's
+        algorithm), since a late reply cannot be told apart from a retransmitted one.
+        """
+        rto = self._rtt.rto
         for attempt in range(retries):
-            sock = None
+            attempt_timeout = timeout if timeout is not None else min(rto * 2 ** attempt, self._rtt.max_rto)
+            start_time = time.monotonic()
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.settimeout(timeout)
-                sock.sendto(request, (self.ip_address, self.port))
-
-                response, addr = sock.recvfrom(1024)
-                return response
-            except socket.timeout:
+                response = await self._transport.async_request(request, attempt_timeout, reply_key)
+            except TimeoutError:
                 _LOGGER.warning(
-                    f"UDP request timed out (attempt {attempt + 1}/{retries}). Retrying..."
+                    f"UDP request timed out after {attempt_timeout:.2f}s (attempt {attempt + 1}/{retries}). Retrying..."
                 )
                 if attempt == retries - 1:
+                    if timeout is None:
+                        self._rtt.timed_out()
                     _LOGGER.error(f"UDP request failed after {retries} attempts due to timeout.")
                     raise UpdateFailed(f"Error sending UDP request: timed out after {retries} attempts")
             except Exception as err:
                 _LOGGER.error(f"UDP request failed: {err}")
                 raise UpdateFailed(f"Error sending UDP request: {err}")
-            finally:
-                if sock:
-                    sock.close()
+            else:
+                if attempt == 0:
+                    self._rtt.update(time.monotonic() - start_time)
+                return response
         raise UpdateFailed("Unknown error after retries in _send_udp_request")
 
+    async def async_shutdown(self) -> None:
+        """Cancel refreshes, close the UDP endpoint and save the last data."""
+        # Values set just before unloading still reach the charger
+        for key in list(self._pending_writes):
+            await self.async_flush_write(key)
+        if self._unsub_command_refresh is not None:
+            self._unsub_command_refresh()
+            self._unsub_command_refresh = None
+        if self._command_refreshed is not None:
+            self._command_refreshed.set_result(None)
+            self._command_refreshed = None
+        await super().async_shutdown()
+        if self._scheduler is not None:
+            self._scheduler.unregister(self)
+        self._commands.close()
+        self._transport.close()
+        if self.data:
+            await self._snapshot_store.async_save(self._snapshot())
+        # A delayed save is only flushed by Home Assistant when it stops, not on unload
+        if self._dlb_save_pending:
+            await self._dlb_store.async_save(self._dlb_store_data())
+
+    async def _async_send_command(self, kind: str, request: bytes, refresh: REQUEST_TYPE | None = None) -> bytes:
+        """Queue a command frame and return the reply of the charger.
+
+        A command of the same kind that has not been sent yet is replaced by this one.
+
+        Args:
+            kind (str): kind of the command
+            request (bytes): command frame
+            refresh (REQUEST_TYPE | None): request type whose data the command changes,
+                polled again shortly after the ACK
+
+        """
+        async def send() -> bytes:
+            async with self._exchange_lock:
+                return await self._send_udp_request(request)
+
+        reply = await self._commands.async_submit(kind, send)
+        if refresh is not None:
+            self._async_refresh_after_command(refresh)
+        return reply
+
+    @callback
+    def _async_refresh_after_command(self, *request_types: REQUEST_TYPE) -> None:
+        """Poll the request types changed by a command once, COMMAND_REFRESH_DELAY after its ACK.
+
+        Without request types only the cached DLB config, as confirmed by the
+        ACK, is published. Refreshes requested within the delay are merged.
+        """
+        self._command_refresh_types.update(request_types)
+        if self._unsub_command_refresh is None:
+            self._unsub_command_refresh = async_call_later(
+                self.hass, COMMAND_REFRESH_DELAY, self._async_command_refresh
+            )
+
+    async def _async_command_refresh(self, _now=None) -> None:
+        self._unsub_command_refresh = None
+        request_types, self._command_refresh_types = self._command_refresh_types, set()
+        refreshed, self._command_refreshed = self._command_refreshed, None
+        try:
+            if self.data is None:
+                # Not polled yet, the first refresh fetches everything
+                return
+            # Takes the same in-flight slot and lock as a scheduled poll
+            in_flight = self._scheduler.in_flight if self._scheduler is not None else nullcontext()
+            try:
+                async with in_flight, self._poll_lock:
+                    data = await self._fetch_data(request_types)
+            except UpdateFailed as err:
+                # The next scheduled poll fetches it again
+                _LOGGER.debug(f"Refresh of {sorted(t.name for t in request_types)} after command failed: {err}")  # noqa: G004
+                return
+            self.async_set_updated_data(data)
+        finally:
+            if refreshed is not None and not refreshed.done():
+                refreshed.set_result(None)
+
+    async def async_wait_command_refresh(self) -> None:
+        """Wait until the refresh after the last command has been published.
+
+        A refresh is requested if none is pending, so the data has been
+        refreshed at least once after the command when this returns, also if
+        the refresh failed.
+        """
+        self._async_refresh_after_command()
+        if self._command_refreshed is None:
+            self._command_refreshed = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self._command_refreshed)
+
+    @callback
+    def async_schedule_write(self, key: str, apply: Callable[[], Awaitable[None]]) -> None:
+        """Run a write once no other write of the same key has come for the write delay.
+
+        A write of the key still waiting for the delay is cancelled. After the
+        write the charger is refreshed once to confirm the value.
+
+        Args:
+            key (str): key of the written value, usually the entity key
+            apply (Callable[[], Awaitable[None]]): sends the value to the charger
+
+        """
+        if key in self._pending_writes:
+            self._pending_writes.pop(key)[0]()
+            _LOGGER.debug(f"Pending write of {key} superseded")  # noqa: G004
+        cancel = async_call_later(self.hass, self._write_delay, partial(self._async_run_write, key))
+        self._pending_writes[key] = (cancel, apply)
+
+    async def _async_run_write(self, key: str, _now=None) -> None:
+        _, apply = self._pending_writes.pop(key)
+        self._writing.add(key)
+        try:
+            await apply()
+        except (HomeAssistantError, OSError, ValueError) as err:
+            # UpdateFailed is a HomeAssistantError, ConnectionError of a closed queue or transport an OSError
+            _LOGGER.error(f"Writing {key} failed: {err}")  # noqa: G004
+        finally:
+            self._writing.discard(key)
+        # Entities show the value of the charger again once the write is published
+        self._async_refresh_after_command()
+
+    async def async_flush_write(self, key: str) -> bool:
+        """Run the pending write of a key right away.
+
+        Returns:
+            bool: False if no write of the key was pending
+
+        """
+        if key not in self._pending_writes:
+            return False
+        self._pending_writes[key][0]()
+        await self._async_run_write(key)
+        return True
+
+    def is_write_pending(self, key: str) -> bool:
+        """Return True if a write of the key is waiting or being sent."""
+        return key in self._pending_writes or key in self._writing
+
     async def async_toggle_charging(self, device_name: str, command: str):
         """Start or stop charging service."""
 
@@ -429,16 +1270,14 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 _LOGGER.error(f"Unknown command: {command}")
                 return
 
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, self._send_udp_request, request)
+            await self._async_send_command("charging", request, REQUEST_TYPE.VALUES)
             _LOGGER.info(f"{device_name}: {command} charging command sent")
 
     async def async_set_max_monthly_consumption(self, device_name: str, maximum_consumption: int):
         """Set maximum consumption."""
 
         request = build_message(CLIENT_MESSAGE.SET_MAX_MONTHLY_CONSUMPTION, {"pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN), "maximum_consumption": get_hex(maximum_consumption, 4)}).encode('ascii')
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._send_udp_request, request)
+        await self._async_send_command("max_monthly_consumption", request)
 
         _LOGGER.info(f"{device_name}: maximum consumption set")
 
@@ -446,8 +1285,7 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         """Set maximum consumption."""
 
         request = build_message(CLIENT_MESSAGE.SET_MAX_SESSION_CONSUMPTION, {"pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN), "maximum_consumption": get_hex(maximum_consumption)}).encode('ascii')
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._send_udp_request, request)
+        await self._async_send_command("max_session_consumption", request)
 
         _LOGGER.info(f"{device_name}: maximum consumption set")
 
@@ -461,8 +1299,7 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             timer_data = convert_timer(start_time, end_time)
             timer_data['pin'] = get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN)
             request = build_message(CLIENT_MESSAGE.SET_TIMER, timer_data).encode('ascii')
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, self._send_udp_request, request)
+            await self._async_send_command("timer", request, REQUEST_TYPE.VALUES)
 
             _LOGGER.info(f"{device_name}: charging timer set")
 
@@ -471,8 +1308,7 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         schedule_data = convert_schedule(reversed(weekdays), start_time, end_time)
         schedule_data['pin'] = get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN)
         request = build_message(CLIENT_MESSAGE.SET_SCHEDULE, schedule_data).encode('ascii')
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._send_udp_request, request)
+        await self._async_send_command("schedule", request)
 
         _LOGGER.info(f"{device_name}: charging schedule set")
 
@@ -484,19 +1320,17 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         if state_sensor_value and state_sensor_value.state != CHARGER_STATE.UNPLUGGED.name.lower():
             request = build_message(CLIENT_MESSAGE.RESET_TIMER, {"pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN)}).encode('ascii')
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, self._send_udp_request, request)
+            await self._async_send_command("timer", request, REQUEST_TYPE.VALUES)
 
             _LOGGER.info(f"{device_name}: charging timer reset")
 
     async def async_request_weekly_schedule(self, device_name: str):
         """Get set weekly schedule from charger."""
 
-        request = build_message(CLIENT_MESSAGE.REQUEST_SETTINGS, {"pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN)}).encode('ascii')
-        loop = asyncio.get_running_loop()
-        response = await loop.run_in_executor(None, self._send_udp_request, request)
+        request = self._request_frames[REQUEST_TYPE.SETTINGS]
+        async with self._exchange_lock:
+            response = await self._send_udp_request(request, reply_key=REQUEST_TYPE.SETTINGS)
         # Decode and parse the response
-        response = response.decode('ascii')
         data = read_message(response, SERVER_MESSAGE.SEND_SETTINGS)
         data['start_time'] = f"{data['timer_start_h']}:{data['timer_start_min']}"
         data['end_time'] = f"{data['timer_end_h']}:{data['timer_end_min']}"
@@ -523,8 +1357,7 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             },
         ).encode("ascii")
 
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._send_udp_request, request)
+        await self._async_send_command("max_current", request, REQUEST_TYPE.VALUES)
 
         _LOGGER.info(f"{device_name}: max current set to {max_current}A")
 
@@ -542,10 +1375,11 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         anti_overload: bool | None = None,
         anti_overload_value: int | None = None,
     ) -> None:
-        """Send full DLB config to charger.
+        """Set the desired DLB config and wait until the charger has confirmed it.
 
         Only the supplied keyword arguments are changed — all others are preserved
-        from the local cache so we never accidentally reset a field.
+        from the local cache so we never accidentally reset a field. The full
+        config is sent, changes of several callers in the same tick in one frame.
 
         Args:
             device_name:         Human-readable device label for logging.
@@ -560,8 +1394,14 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             night_end:           Night mode end hour (0-23, 24h).
             anti_overload:       True to enable Anti Overload, False to disable (sets byte to 0x00).
             anti_overload_value: Threshold value (1-99) used when Anti Overload is enabled.
+
+        Raises:
+            ValueError:          A value is out of range, nothing is changed.
+            HomeAssistantError:  The charger did not confirm the config. It is sent
+                                 again after the next successful poll.
         """
-        cfg = self._dlb_config
+        # Changes are made to a copy, taken into use once every value is valid
+        cfg = dict(self._dlb_config)
 
         # Apply any supplied overrides
         if dlb_enabled is not None:
@@ -617,53 +1457,186 @@ class BenyWifiUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             else:
                 cfg["anti_overload"] = 0x00
 
-        # Determine byte12 to send
-        dlb_mode_byte = cfg["dlb_mode"]
-        # If dlb_mode is stored as an int (hybrid current), use it directly
-        # If it's a DLB_MODE enum value use its .value (shouldn't happen but guard anyway)
-        if isinstance(dlb_mode_byte, DLB_MODE):
-            dlb_mode_byte = dlb_mode_byte.value
-
-        request = build_message(
-            CLIENT_MESSAGE.SET_DLB_CONFIG,
-            {
-                "pin":          get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN),
-                "dlb_enabled":  format(cfg["dlb_enabled"],    "02x"),
-                "extreme":      format(cfg["extreme"],        "02x"),
-                "dlb_mode":     format(dlb_mode_byte,         "02x"),
-                "night":        format(cfg["night"],           "02x"),
-                "night_start":  format(cfg["night_start"],     "02x"),
-                "night_end":    format(cfg["night_end"],       "02x"),
-                "anti_overload": format(cfg["anti_overload"],  "02x"),
-            },
-        ).encode("ascii")
-
-        loop = asyncio.get_running_loop()
-        response = await loop.run_in_executor(None, self._send_udp_request, request)
-
-        # Parse the ACK — the charger echoes back the full config it applied.
-        # This confirms what was stored and keeps _dlb_config in sync,
-        # including the anti_overload byte which the user may have set via the Z-Box app.
-        try:
-            ack = read_message(response.decode("ascii"))
-            if ack and ack.get("message_type") == str(SERVER_MESSAGE.SEND_DLB_CONFIG):
-                if "dlb_enabled" in ack:
-                    cfg["dlb_enabled"] = ack["dlb_enabled"]
-                if "anti_overload" in ack:
-                    cfg["anti_overload"] = ack["anti_overload"]
-                    # If non-zero, also update the stored threshold so re-enable restores it
-                    if ack["anti_overload"] != 0x00:
-                        cfg["anti_overload_value"] = ack["anti_overload"]
-                _LOGGER.debug(f"SET_DLB_CONFIG ACK confirmed by charger: {ack}")  # noqa: G004
-        except Exception as ack_err:
-            _LOGGER.debug(f"Could not parse SET_DLB_CONFIG ACK (non-fatal): {ack_err}")  # noqa: G004
-
-        await self._async_persist_dlb_config()
+        self._dlb_config = cfg
+        self._dlb_failed_syncs = 0
+        self._async_persist_dlb_config()
+        # Entities show the desired config right away, with the pending status
+        self._async_publish_dlb_config()
+        # Changes made in the same tick are sent together in one frame
+        if not await self._async_sync_dlb_config():
+            raise HomeAssistantError(f"{device_name}: charger did not confirm the DLB config")
 
         _LOGGER.info(
             f"{device_name}: DLB config set — "
             f"dlb_enabled={cfg['dlb_enabled']:#04x} "
-            f"extreme={cfg['extreme']:#04x} dlb_mode={dlb_mode_byte:#04x} "
+            f"extreme={cfg['extreme']:#04x} dlb_mode={self._dlb_frame()['dlb_mode']:#04x} "
             f"night={cfg['night']:#04x} "
             f"night_start={cfg['night_start']} night_end={cfg['night_end']}"
-        )
\ No newline at end of file
+        )
+
+    async def async_set_hybrid_current(self, device_name: str, current: int) -> None:
+        """Set the current limit of Hybrid mode.
+
+        In Hybrid mode the config is sent to the charger like with
+        async_set_dlb_config(). In any other mode the value is only stored,
+        ready for the next switch to Hybrid mode.
+
+        Args:
+            device_name: Human-readable device label for logging.
+            current:     Current limit in amps (1-98).
+
+        Raises:
+            ValueError:          The current is out of range, nothing is changed.
+            HomeAssistantError:  The charger did not confirm the config.
+        """
+        # Byte12 holds the current directly in Hybrid mode, the other modes are sentinels
+        if HYBRID_CURRENT_MIN <= self._dlb_frame()["dlb_mode"] <= HYBRID_CURRENT_MAX:
+            await self.async_set_dlb_config(device_name, dlb_mode=DLB_MODE.HYBRID, hybrid_current=current)
+            return
+
+        if not (HYBRID_CURRENT_MIN <= current <= HYBRID_CURRENT_MAX):
+            raise ValueError(
+                f"hybrid_current must be between {HYBRID_CURRENT_MIN} and {HYBRID_CURRENT_MAX} amps "
+                f"(99 is reserved as the FULL_SPEED sentinel)"
+            )
+        self._dlb_config = {**self._dlb_config, "hybrid_current": current}
+        self._async_persist_dlb_config()
+        self._async_publish_dlb_config()
+        _LOGGER.info(f"{device_name}: Hybrid current stored as {current}A (applies on next Hybrid mode switch)")  # noqa: G004
+
+    def _dlb_frame(self) -> dict[str, int]:
+        """Return the fields of the desired DLB config sent in SET_DLB_CONFIG."""
+        frame = {field: self._dlb_config[field] for field in _DLB_FRAME_FIELDS}
+        # If dlb_mode is stored as a DLB_MODE enum use its .value (shouldn't happen but guard anyway)
+        if isinstance(frame["dlb_mode"], DLB_MODE):
+            frame["dlb_mode"] = frame["dlb_mode"].value
+        return frame
+
+    @property
+    def dlb_config_pending(self) -> bool:
+        """Return True while the charger has not confirmed the desired DLB config."""
+        return self._dlb_frame() != self._dlb_confirmed
+
+    @property
+    def confirmed_dlb_config(self) -> dict:
+        """Return the DLB config last confirmed by the charger.
+
+        Values the charger does not echo back, the hybrid current outside
+        Hybrid mode and the anti overload threshold, are those last set.
+        """
+        config = {**self._dlb_config, **self._dlb_confirmed}
+        if HYBRID_CURRENT_MIN <= config["dlb_mode"] <= HYBRID_CURRENT_MAX:
+            config["hybrid_current"] = config["dlb_mode"]
+        return config
+
+    def _dlb_config_state(self) -> dict:
+        """Return the desired DLB config with its pending status, as exposed to entities."""
+        return {**self._dlb_config, "pending": self.dlb_config_pending}
+
+    @callback
+    def _async_publish_dlb_config(self) -> None:
+        """Notify the entities showing the DLB config without polling the charger."""
+        if self.data is None:
+            return
+        dlb_config = self._dlb_config_state()
+        if dlb_config != self.data.get("dlb_config"):
+            self.data = {**self.data, "dlb_config": dlb_config}
+            self.async_update_listeners()
+
+    @callback
+    def _async_start_dlb_sync(self) -> asyncio.Task:
+        self._dlb_sync = self.config_entry.async_create_background_task(
+            self.hass, self._async_reconcile_dlb_config(), f"{DOMAIN} DLB config {self.config_entry.entry_id}"
+        )
+        return self._dlb_sync
+
+    async def _async_sync_dlb_config(self) -> bool:
+        """Wait until the charger has confirmed the desired DLB config.
+
+        A sync in progress also sends changes made while it runs, so callers
+        share it instead of sending a frame each.
+
+        Returns:
+            bool: False if the charger did not confirm the config
+
+        """
+        sync = self._dlb_sync
+        if sync is None or sync.done():
+            sync = self._async_start_dlb_sync()
+        return await asyncio.shield(sync)
+
+    async def _async_reconcile_dlb_config(self) -> bool:
+        """Send the desired DLB config until the ACK of the charger echoes it back.
+
+        An ACK with another config, or a reply that is not an ACK, is retried
+        with exponential backoff. Failed syncs are counted, after DLB_SYNC_RETRIES
+        of them the config is no longer sent again after polls.
+
+        Returns:
+            bool: True once the desired config is confirmed, False after
+                DLB_SYNC_ATTEMPTS sends of it were not
+
+        """
+        failures = 0
+        while self.dlb_config_pending:
+            desired = self._dlb_frame()
+            request = build_message(
+                CLIENT_MESSAGE.SET_DLB_CONFIG,
+                {
+                    "pin": get_config_parameter(self.config_entry, SECTION_DEVICE, CONF_PIN),
+                    **{field: format(value, "02x") for field, value in desired.items()},
+                },
+            ).encode("ascii")
+
+            try:
+                ack = self._read_dlb_ack(await self._async_send_command("dlb_config", request))
+            except UpdateFailed as err:
+                # Lost frames were already retransmitted, the charger is not answering at all
+                _LOGGER.warning(f"DLB config not sent: {err}")  # noqa: G004
+                self._async_dlb_sync_failed()
+                return False
+            if ack is not None:
+                self._dlb_confirmed = ack
+                self._async_persist_dlb_config()
+
+            if ack == desired:
+                _LOGGER.debug(f"SET_DLB_CONFIG ACK confirmed by charger: {ack}")  # noqa: G004
+                failures = 0
+                self._dlb_failed_syncs = 0
+                self._async_publish_dlb_config()
+                # Loop again for changes made while the frame was in flight
+                continue
+
+            failures += 1
+            if failures >= DLB_SYNC_ATTEMPTS:
+                _LOGGER.warning(  # noqa: G004
+                    f"Charger did not confirm DLB config {desired} after {failures} attempts (last ACK {ack})"
+                )
+                self._async_dlb_sync_failed()
+                return False
+            await asyncio.sleep(min(DLB_SYNC_BACKOFF_MIN * 2 ** (failures - 1), DLB_SYNC_BACKOFF_MAX))
+        return True
+
+    @callback
+    def _async_dlb_sync_failed(self) -> None:
+        self._dlb_failed_syncs += 1
+        if self._dlb_failed_syncs < DLB_SYNC_RETRIES:
+            _LOGGER.debug("DLB config is sent again after the next successful poll")
+        else:
+            _LOGGER.warning(  # noqa: G004
+                f"Charger at {self.ip_address} did not confirm the DLB config in {self._dlb_failed_syncs} syncs, "
+                "it stays pending until it is changed"
+            )
+        self._async_publish_dlb_config()
+
+    @staticmethod
+    def _read_dlb_ack(response: bytes) -> dict[str, int] | None:
+        """Return the DLB config echoed by a SET_DLB_CONFIG ACK, None if the reply is not one."""
+        try:
+            ack = read_message(response)
+        except ValueError:
+            ack = None
+        if not ack or lookup_message_type(ack["message_type"], ack["message_id"]) is not SERVER_MESSAGE.SEND_DLB_CONFIG:
+            _LOGGER.debug(f"Reply to SET_DLB_CONFIG is not an ACK: {response!r}")  # noqa: G004
+            return None
+        return {field: ack[field] for field in _DLB_FRAME_FIELDS}
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""Async discovery of Beny Wifi chargers on the local network."""
+import asyncio
+from collections.abc import AsyncIterator
+from ipaddress import ip_network
+import logging
+import time
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .communication import build_message, read_message
+from .const import (
+    CLIENT_MESSAGE,
+    DOMAIN,
+    DISCOVERY_RETRIES,
+    DISCOVERY_TIMEOUT,
+    DISCOVERY_WINDOW,
+    HEADER_PREFIXES,
+    REDISCOVERY_CACHE,
+    REDISCOVERY_TTL,
+    REQUEST_TYPE,
+    SWEEP_CONCURRENCY,
+    SWEEP_TIMEOUT,
+)
+from .conversions import convert_serial_to_hex, get_hex
+from .transport import BenyWifiTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+_ACCESS_DENIED = b"55aa100008"
+
+
+def _parse_handshake(address: str, reply: bytes, port: int, serial: str) -> dict | None:
+    """Return the charger described by a handshake reply, None if the reply is invalid."""
+    if reply.startswith(_ACCESS_DENIED):
+        return {"ip_address": address, "port": port, "access_denied": True}
+    try:
+        data = read_message(reply)
+    except ValueError:
+        data = None
+    if data is None:
+        _LOGGER.warning(f"Received handshake reply from {address} but it was invalid, ignoring")  # noqa: G004
+        return None
+    return {
+        "serial_number": data.get("serial", serial),
+        "ip_address": data.get("ip") or address,
+        "port": port or data.get("port"),
+    }
+
+
+class BenyWifiDiscoveryProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol collecting the first handshake reply of every responder."""
+
+    def __init__(self) -> None:
+        """Initialize protocol."""
+        self.replies: dict[str, bytes] = {}
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        """Keep the first datagram received from each address."""
+        self.replies.setdefault(addr[0], data)
+
+
+async def async_discover_chargers(hass: HomeAssistant, serial: str, pin: str, port: int, ip: str | None = None) -> list[dict]:
+    """Broadcast a handshake on all IPv4 networks and collect the chargers that answer.
+
+    The handshake is sent to the broadcast address of every enabled IPv4
+    interface, and straight to ip if given for chargers that do not answer
+    broadcasts. Replies are collected for DISCOVERY_WINDOW seconds.
+
+    Args:
+        hass (HomeAssistant): Home Assistant instance
+        serial (str): serial number of the charger
+        pin (str): pin of the charger as hex
+        port (int): UDP port of the charger
+        ip (str | None): known address of the charger
+
+    Returns:
+        list[dict]: one dict per responder with serial_number, ip_address and port,
+            or with access_denied set if the charger refused the pin
+
+    """
+    request = build_message(
+        CLIENT_MESSAGE.POLL_DEVICES, {"pin": pin, "serial": convert_serial_to_hex(serial)}
+    ).encode('ascii')
+
+    targets = {str(address) for address in await network.async_get_ipv4_broadcast_addresses(hass)}
+    if ip:
+        targets.add(ip)
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        BenyWifiDiscoveryProtocol, local_addr=("0.0.0.0", 0), allow_broadcast=True
+    )
+    try:
+        for target in targets:
+            try:
+                transport.sendto(request, (target, port))
+            except OSError as err:
+                _LOGGER.debug(f"Cannot send handshake to {target}:{port}: {err}")  # noqa: G004
+        _LOGGER.debug(f"Handshake sent to {', '.join(sorted(targets))} on port {port}")  # noqa: G004
+        await asyncio.sleep(DISCOVERY_WINDOW)
+    finally:
+        transport.close()
+
+    chargers = [
+        charger for address, reply in protocol.replies.items()
+        if (charger := _parse_handshake(address, reply, port, serial)) is not None
+    ]
+    _LOGGER.debug(f"Chargers answering handshake: {chargers}")  # noqa: G004
+    return chargers
+
+
+async def async_rediscover_charger(hass: HomeAssistant, serial: str, pin: str, port: int) -> dict | None:
+    """Find the current address of a configured charger by broadcast handshake.
+
+    Replies are cached for REDISCOVERY_TTL seconds, so entries rediscovering
+    at the same time share one broadcast. A serial is broadcast for again only
+    if it was neither found nor asked for during the TTL.
+
+    Args:
+        hass (HomeAssistant): Home Assistant instance
+        serial (str): serial number of the charger
+        pin (str): pin of the charger as hex
+        port (int): UDP port of the charger
+
+    Returns:
+        dict | None: charger with serial_number, ip_address and port, None if it did not answer
+
+    """
+    serial = str(serial)
+    cache = hass.data.setdefault(REDISCOVERY_CACHE, {})
+    cached = cache.get(port)
+    if cached is None or cached["expires"] <= time.monotonic():
+        cached = cache[port] = {
+            "expires": time.monotonic() + REDISCOVERY_TTL,
+            "asked": set(),  # serials broadcast for
+            "chargers": {},  # serial -> charger
+            "task": None,  # broadcast in progress
+        }
+
+    async def broadcast() -> None:
+        try:
+            for charger in await async_discover_chargers(hass, serial, pin, port):
+                if not charger.get("access_denied"):
+                    cached["chargers"][str(charger["serial_number"])] = charger
+        finally:
+            cached["asked"].add(serial)
+            cached["task"] = None
+
+    while serial not in cached["chargers"] and serial not in cached["asked"]:
+        if cached["task"] is None:
+            cached["task"] = hass.async_create_task(broadcast(), f"{DOMAIN} rediscovery {port}")
+        # A broadcast of another entry may answer for this charger too
+        await asyncio.shield(cached["task"])
+
+    return cached["chargers"].get(serial)
+
+
+class BenyWifiSweepProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol resolving the handshake a sweep is waiting for from each host."""
+
+    def __init__(self) -> None:
+        """Initialize protocol."""
+        self.waiting: dict[str, asyncio.Future] = {}
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        """Resolve the handshake of the host the datagram came from."""
+        future = self.waiting.get(addr[0])
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        """Ignore errors of single hosts (e.g. ICMP unreachable), their handshake times out."""
+
+
+async def async_sweep_subnet(serial: str, pin: str, port: int, subnet: str) -> AsyncIterator[dict]:
+    """Send the handshake to every host of a subnet and yield the chargers as they answer.
+
+    For networks that filter broadcasts. At most SWEEP_CONCURRENCY hosts are
+    waited for at once, each for SWEEP_TIMEOUT seconds, all over one shared
+    socket. Stopping the iteration stops the sweep.
+
+    Args:
+        serial (str): serial number of the charger
+        pin (str): pin of the charger as hex
+        port (int): UDP port of the charger
+        subnet (str): network to sweep in CIDR notation, e.g. 192.168.1.0/24
+
+    Yields:
+        dict: charger with serial_number, ip_address and port, or with access_denied set
+
+    """
+    request = build_message(
+        CLIENT_MESSAGE.POLL_DEVICES, {"pin": pin, "serial": convert_serial_to_hex(serial)}
+    ).encode('ascii')
+    hosts = (str(host) for host in ip_network(subnet, strict=False).hosts())
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(BenyWifiSweepProtocol, local_addr=("0.0.0.0", 0))
+    # Chargers found, None once every worker has run out of hosts
+    found: asyncio.Queue[dict | None] = asyncio.Queue()
+    running = SWEEP_CONCURRENCY
+
+    async def sweep() -> None:
+        nonlocal running
+        try:
+            # Every worker takes the next host from the shared generator when its previous one is done
+            for host in hosts:
+                future = protocol.waiting[host] = loop.create_future()
+                try:
+                    transport.sendto(request, (host, port))
+                    async with asyncio.timeout(SWEEP_TIMEOUT):
+                        reply = await future
+                except (TimeoutError, OSError):
+                    continue
+                finally:
+                    del protocol.waiting[host]
+                if (charger := _parse_handshake(host, reply, port, serial)) is not None:
+                    found.put_nowait(charger)
+        finally:
+            running -= 1
+            if not running:
+                found.put_nowait(None)
+
+    workers = [asyncio.create_task(sweep()) for _ in range(SWEEP_CONCURRENCY)]
+    try:
+        while (charger := await found.get()) is not None:
+            yield charger
+    finally:
+        for worker in workers:
+            worker.cancel()
+        transport.close()
+
+
+async def async_identify_charger(ip: str, port: int, pin: str) -> dict:
+    """Read the model of a charger and check the pin.
+
+    The model request is sent with one known header prefix after the other
+    until it is answered, then a values request that only succeeds with the
+    right pin. Requests are sent one at a time, a denial carries no request
+    type and could otherwise be taken for the reply to another request.
+
+    Args:
+        ip (str): address of the charger
+        port (int): UDP port of the charger
+        pin (str): pin of the charger as hex
+
+    Returns:
+        dict: model (None if not answered) and pin_valid (None if the charger did not answer)
+
+    """
+    transport = BenyWifiTransport(ip, port)
+
+    async def request(frame: bytes, reply_key: REQUEST_TYPE) -> bytes | None:
+        for _ in range(DISCOVERY_RETRIES):
+            try:
+                return await transport.async_request(frame, DISCOVERY_TIMEOUT, reply_key)
+            except TimeoutError:
+                continue
+            except OSError as err:
+                _LOGGER.debug(f"Request to {ip}:{port} failed: {err}")  # noqa: G004
+                return None
+        return None
+
+    try:
+        model_reply = None
+        for header_prefix in HEADER_PREFIXES:
+            reply = await request(
+                build_message(
+                    CLIENT_MESSAGE.REQUEST_DATA,
+                    {"pin": pin, "request_type": get_hex(REQUEST_TYPE.MODEL.value)},
+                    header_prefix,
+                ).encode('ascii'),
+                REQUEST_TYPE.MODEL,
+            )
+            # A denial may only mean the charger does not answer this header prefix
+            if reply is not None and not reply.startswith(_ACCESS_DENIED):
+                model_reply = reply
+                break
+        values_reply = await request(
+            build_message(
+                CLIENT_MESSAGE.REQUEST_DATA, {"pin": pin, "request_type": get_hex(REQUEST_TYPE.VALUES.value)}
+            ).encode('ascii'),
+            REQUEST_TYPE.VALUES,
+        )
+    finally:
+        transport.close()
+
+    if values_reply is not None and values_reply.startswith(_ACCESS_DENIED):
+        return {"model": None, "pin_valid": False}
+
+    model = None
+    if model_reply is not None:
+        try:
+            model = (read_message(model_reply) or {}).get("model")
+        except ValueError:
+            _LOGGER.warning(f"Invalid model reply from {ip}: {model_reply!r}")  # noqa: G004
+
+    return {"model": model, "pin_valid": True if values_reply is not None else None}
@@ -1,8 +1,12 @@
 """Number entities for Beny Wifi."""
 
+from abc import abstractmethod
+from functools import partial
 import logging
+
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.const import UnitOfElectricCurrent
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -14,7 +18,6 @@ from .const import (
     DEFAULT_MAX_CURRENT_MIN, 
     DLB, 
     DOMAIN, 
-    DLB_MODE, 
     MODEL, 
     SERIAL,
     SECTION_DEVICE,
@@ -66,11 +69,18 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     async_add_entities(numbers, update_before_add=True)
 
 class BenyWifiBaseNumber(CoordinatorEntity, NumberEntity):
-    """Base class for numbers."""
+    """Base class for numbers.
+
+    A set value is shown right away and written to the charger by the
+    coordinator once it has not changed for the write delay, so dragging a
+    slider sends one frame with the final value.
+    """
+    # Coordinator data key the entity is updated on
+    _data_key = "dlb_config"
     
     def __init__(self, coordinator, key, serial=None, device_model=None, min_value=DEFAULT_MAX_CURRENT_MIN, max_value=DEFAULT_MAX_CURRENT_MAX, step_value=1):
         """Initialize the number entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=self._data_key)
         self.coordinator = coordinator
         self.key = key
         self._attr_translation_key = key
@@ -81,7 +91,50 @@ class BenyWifiBaseNumber(CoordinatorEntity, NumberEntity):
         self._attr_native_max_value = max_value
         self._attr_native_step = step_value
         self._attr_suggested_object_id = key  
-        
+        # Value set but not yet confirmed by the charger
+        self._pending_value: int | None = None
+
+    @property
+    def native_value(self) -> float:
+        """Return the value set last, or the value of the charger."""
+        if self._pending_value is not None:
+            return float(self._pending_value)
+        return self._charger_value()
+
+    @abstractmethod
+    def _charger_value(self) -> float:
+        """Return the value of the charger."""
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Show the value and write it to the charger once it has settled."""
+        self._pending_value = int(value)
+        self.async_write_ha_state()
+        device_name = get_device_id(self.hass, self._serial, self._device_model)
+        self.coordinator.async_schedule_write(self.key, partial(self._async_write, int(value), device_name))
+
+    async def _async_write(self, value: int, device_name: str) -> None:
+        try:
+            await self._async_apply(value, device_name)
+            await self.coordinator.async_wait_command_refresh()
+        finally:
+            # Show the value of the charger again, unless another value was set meanwhile
+            if self._pending_value == value:
+                self._pending_value = None
+            # Writes flushed on unload finish after the entity has been removed
+            if self.hass is not None and self.platform is not None:
+                self.async_write_ha_state()
+
+    @abstractmethod
+    async def _async_apply(self, value: int, device_name: str) -> None:
+        """Send the value to the charger."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Show the value of the charger once no write is pending."""
+        if not self.coordinator.is_write_pending(self.key):
+            self._pending_value = None
+        super()._handle_coordinator_update()
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return device information."""
@@ -96,13 +149,13 @@ class BenyWifiBaseNumber(CoordinatorEntity, NumberEntity):
 class BenyWifiMaxCurrentNumber(BenyWifiBaseNumber):
     """Max Current control number entity."""
     _attr_available = True
+    _data_key = "max_current"
 
     def __init__(self, coordinator, key, serial=None, device_model=None, min_value=DEFAULT_MAX_CURRENT_MIN, max_value=DEFAULT_MAX_CURRENT_MAX):
         """Initialize the number entity."""
         super().__init__(coordinator, key, serial=serial, device_model=device_model, min_value=min_value, max_value=max_value)
         self._attr_native_unit_of_measurement = UnitOfElectricCurrent.AMPERE
         self._attr_mode = NumberMode.SLIDER
-        self._local_value = None
         self._attr_unique_id = f"{serial}_{key}"
         self._attr_icon = "mdi:current-ac"
 
@@ -111,12 +164,8 @@ class BenyWifiMaxCurrentNumber(BenyWifiBaseNumber):
         """Return if entity is available."""
         return True
 
-    @property
-    def native_value(self):
-        """Return the current value - prefer local value, fall back to coordinator."""
-        if self._local_value is not None:
-            return float(self._local_value)
-
+    def _charger_value(self) -> float:
+        """Return the max current reported by the charger."""
         if self.coordinator.data:
             max_current = self.coordinator.data.get("max_current")
             if max_current is not None:
@@ -127,11 +176,9 @@ class BenyWifiMaxCurrentNumber(BenyWifiBaseNumber):
 
         return 16.0
 
-    async def async_set_native_value(self, value: float) -> None:
-        """Store locally — press Send button to apply."""
-        self._local_value = int(value)
-        self.async_write_ha_state()
-        _LOGGER.info(f"Max current control for {self._serial} set to {int(value)}A (stored locally)")
+    async def _async_apply(self, value: int, device_name: str) -> None:
+        """Send the max current to the charger."""
+        await self.coordinator.async_set_max_current(device_name, value)
 
     @property
     def should_poll(self) -> bool:
@@ -146,8 +193,9 @@ class BenyWifiHybridCurrentNumber(BenyWifiBaseNumber):
     by the charger as a mode switch rather than a current limit. 98A is the safe
     maximum for hybrid current.
 
-    Adjusting this while already in Hybrid mode immediately resends the config.
-    Adjusting it in any other mode stores the value ready for the next switch.
+    Adjusting this while already in Hybrid mode resends the config once the
+    value has settled. Adjusting it in any other mode stores the value ready
+    for the next switch.
     """
 
     def __init__(self, coordinator, key, serial=None, device_model=None):
@@ -161,32 +209,13 @@ class BenyWifiHybridCurrentNumber(BenyWifiBaseNumber):
         self._attr_mode = NumberMode.SLIDER
         self._attr_unique_id = f"{serial}_{key}"
 
-    @property
-    def native_value(self) -> float:
+    def _charger_value(self) -> float:
         """Return current hybrid current limit from coordinator cache."""
-        return float(self.coordinator._dlb_config.get("hybrid_current", 16))
+        return float(self.coordinator.confirmed_dlb_config.get("hybrid_current", 16))
 
-    async def async_set_native_value(self, value: float) -> None:
+    async def _async_apply(self, current: int, device_name: str) -> None:
         """Update hybrid current; resend to charger if currently in Hybrid mode."""
-        current = int(value)
-        device_name = get_device_id(self.hass, self._serial, self._device_model)
-
-        self.coordinator._dlb_config["hybrid_current"] = current
-
-        # Detect Hybrid mode: byte12 holds the current value directly.
-        # Valid hybrid range is HYBRID_CURRENT_MIN–HYBRID_CURRENT_MAX (1–98).
-        # Values 0 (PURE_PV), 99/0x63 (FULL_SPEED), and 255/0xFF (DLB_BOX) are sentinels.
-        raw = self.coordinator._dlb_config.get("dlb_mode")
-        if raw is not None and HYBRID_CURRENT_MIN <= raw <= HYBRID_CURRENT_MAX:
-            await self.coordinator.async_set_dlb_config(
-                device_name,
-                dlb_mode=DLB_MODE.HYBRID,
-                hybrid_current=current,
-            )
-            _LOGGER.info(f"{device_name}: Hybrid current updated to {current}A (sent to charger)")
-        else:
-            self.async_write_ha_state()
-            _LOGGER.info(f"{device_name}: Hybrid current stored as {current}A (applies on next Hybrid mode switch)")
+        await self.coordinator.async_set_hybrid_current(device_name, current)
 
 class BenyWifiNightStartNumber(BenyWifiBaseNumber):
     """Night Mode start hour (0–23, whole hours only).
@@ -201,15 +230,12 @@ class BenyWifiNightStartNumber(BenyWifiBaseNumber):
         self._attr_mode = NumberMode.BOX
         self._attr_unique_id = f"{serial}_{key}"
 
-    @property
-    def native_value(self) -> float:
+    def _charger_value(self) -> float:
         """Return current night start hour from coordinator cache."""
-        return float(self.coordinator._dlb_config.get("night_start", 22))
+        return float(self.coordinator.confirmed_dlb_config.get("night_start", 22))
 
-    async def async_set_native_value(self, value: float) -> None:
+    async def _async_apply(self, hour: int, device_name: str) -> None:
         """Update night start hour and resend config to charger."""
-        hour = int(value)
-        device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, night_start=hour)
         _LOGGER.info(f"{device_name}: Night Mode start hour set to {hour:02d}:00")
 
@@ -226,14 +252,11 @@ class BenyWifiNightEndNumber(BenyWifiBaseNumber):
         self._attr_mode = NumberMode.BOX
         self._attr_unique_id = f"{serial}_{key}"
 
-    @property
-    def native_value(self) -> float:
+    def _charger_value(self) -> float:
         """Return current night end hour from coordinator cache."""
-        return float(self.coordinator._dlb_config.get("night_end", 6))
+        return float(self.coordinator.confirmed_dlb_config.get("night_end", 6))
 
-    async def async_set_native_value(self, value: float) -> None:
+    async def _async_apply(self, hour: int, device_name: str) -> None:
         """Update night end hour and resend config to charger."""
-        hour = int(value)
-        device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, night_end=hour)
         _LOGGER.info(f"{device_name}: Night Mode end hour set to {hour:02d}:00")
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Poll scheduling across all Beny Wifi chargers."""
+import asyncio
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BenyWifiPollScheduler:
+    """Spreads the polls of all chargers evenly over their poll intervals.
+
+    Every registered coordinator gets a phase, an even fraction of its poll
+    interval, in registration order. Its polls are scheduled at the times the
+    event loop clock is a whole number of intervals past the phase, so N
+    chargers polling at the same interval are interval / N apart instead of
+    all firing together after a restart. Phases are recomputed and pending
+    polls rescheduled whenever a charger is added or removed. At most
+    max_in_flight polls run at the same time.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        """Initialize scheduler."""
+        self._coordinators: list[Any] = []
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+
+    def __contains__(self, coordinator) -> bool:
+        """Return True if the coordinator is scheduled."""
+        return coordinator in self._coordinators
+
+    def register(self, coordinator) -> None:
+        """Add a coordinator to the schedule."""
+        if coordinator not in self._coordinators:
+            self._coordinators.append(coordinator)
+            self._rebalance()
+
+    def unregister(self, coordinator) -> None:
+        """Remove a coordinator from the schedule."""
+        if coordinator in self._coordinators:
+            self._coordinators.remove(coordinator)
+            self._rebalance()
+
+    def _rebalance(self) -> None:
+        _LOGGER.debug(f"Spreading polls of {len(self._coordinators)} chargers")  # noqa: G004
+        for coordinator in self._coordinators:
+            coordinator.async_reschedule()
+
+    def phase(self, coordinator) -> float:
+        """Return the offset of the coordinator's polls as a fraction of its interval."""
+        return self._coordinators.index(coordinator) / len(self._coordinators)
+
+    def next_slot(self, coordinator, now: float, interval: float) -> float:
+        """Return the loop time of the next poll of the coordinator.
+
+        The next poll is at least a quarter interval away, so a slow poll
+        that ends right before the next slot does not run twice in a row.
+
+        Args:
+            coordinator: registered coordinator
+            now (float): current loop time
+            interval (float): poll interval in seconds
+
+        Returns:
+            float: loop time of the coordinator's next slot
+
+        """
+        offset = self.phase(coordinator) * interval
+        slot = now + interval - (now - offset) % interval
+        if slot - now < interval / 4:
+            slot += interval
+        return slot
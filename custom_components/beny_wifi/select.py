@@ -53,7 +53,7 @@ class BenyWifiDlbModeSelect(CoordinatorEntity, SelectEntity):
 
     def __init__(self, coordinator, key, serial=None, device_model=None):
         """Initialize the select entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context="dlb_config")
         self.coordinator = coordinator
         self.key = key
         self._attr_translation_key = key
@@ -65,26 +65,19 @@ class BenyWifiDlbModeSelect(CoordinatorEntity, SelectEntity):
         self._attr_unique_id = f"{serial}_{key}"
         self._attr_suggested_object_id = key  
 
-        # Optimistic label — set on user action, cleared on coordinator refresh
-        self._optimistic_label: str | None = None
-
     @property
     def current_option(self) -> str:
         """Return the currently selected option.
 
         Priority:
-          1. Optimistic label (set immediately when user makes a selection,
-             so the UI snaps to the new value without waiting for a poll).
-          2. Coordinator's _dlb_config cache (authoritative after any command).
-          3. Safe default.
+          1. Coordinator's _dlb_config cache (the desired config, updated as
+             soon as the user makes a selection, see pending attribute).
+          2. Safe default.
 
         Hybrid mode detection: byte12 stores the current limit directly (1–98A).
         Sentinel values are: 0x00=PURE_PV, 0x63/99=FULL_SPEED, 0xFF=DLB_BOX.
         Any byte12 value in the range HYBRID_CURRENT_MIN–HYBRID_CURRENT_MAX is Hybrid.
         """
-        if self._optimistic_label is not None:
-            return self._optimistic_label
-
         raw = self.coordinator._dlb_config.get("dlb_mode")
         if raw is not None:
             if raw == DLB_MODE.PURE_PV.value:
@@ -98,10 +91,10 @@ class BenyWifiDlbModeSelect(CoordinatorEntity, SelectEntity):
 
         return _MODE_TO_LABEL[DLB_MODE.DLB_BOX]
 
-    def _handle_coordinator_update(self) -> None:
-        """Clear optimistic state when the coordinator delivers fresh data."""
-        self._optimistic_label = None
-        super()._handle_coordinator_update()
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Expose whether the charger has yet to confirm the DLB config."""
+        return {"pending": self.coordinator.dlb_config_pending}
 
     async def async_select_option(self, option: str) -> None:
         """Handle user selecting a new DLB mode."""
@@ -113,10 +106,6 @@ class BenyWifiDlbModeSelect(CoordinatorEntity, SelectEntity):
         device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, dlb_mode=mode)
 
-        # Snap the UI immediately — don't wait for next coordinator poll
-        self._optimistic_label = option
-        self.async_write_ha_state()
-
     @property
     def device_info(self) -> DeviceInfo:
         """Return device information."""
@@ -1,13 +1,16 @@
 """Sensors for Beny Wifi."""
 
 import logging
+import time
 
 from homeassistant.const import (
+    EntityCategory,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
     UnitOfEnergy,
     UnitOfPower,
-    UnitOfTemperature
+    UnitOfTemperature,
+    UnitOfTime
 )
 
 from homeassistant.components.sensor import (
@@ -16,7 +19,9 @@ from homeassistant.components.sensor import (
     SensorEntity,
 )
 
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
@@ -34,6 +39,46 @@ from .const import (
 _LOGGER = logging.getLogger(__name__)
 
 
+class PublishPolicy:
+    """Decides which new values of a measurement sensor are written to the state machine.
+
+    A change is published when it exceeds the deadband (the larger of the
+    absolute and the relative band) and at least min_interval seconds have
+    passed since the previous write. Smaller changes are published anyway
+    once heartbeat seconds have passed, and so is an unchanged value, so the
+    state is written at least once per heartbeat while updates arrive.
+    Changes to or from None (unavailable data) are always published.
+    """
+
+    def __init__(self, deadband: float = 0.0, relative_deadband: float = 0.0, min_interval: float = 0.0, heartbeat: float = 300.0) -> None:
+        """Initialize publishing policy."""
+        self.deadband = deadband
+        self.relative_deadband = relative_deadband
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+
+    def significant(self, published, value) -> bool:
+        """Return True if value differs from the published value by more than the deadband."""
+        if published is None or value is None:
+            return published is not value
+        return abs(value - published) > max(self.deadband, self.relative_deadband * abs(published))
+
+    def next_publish(self, published, value, elapsed: float, attributes_changed: bool = False) -> float | None:
+        """Return seconds until value may be published, 0 if right away or None if there is nothing to write.
+
+        A change of the state attributes alone is published like a significant change.
+        """
+        if elapsed >= self.heartbeat:
+            return 0.0
+        if value == published:
+            return max(self.min_interval - elapsed, 0.0) if attributes_changed else None
+        if published is None or value is None:
+            return 0.0
+        if self.significant(published, value):
+            return max(self.min_interval - elapsed, 0.0)
+        return max(self.heartbeat - elapsed, 0.0)
+
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up sensor platform."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
@@ -58,7 +103,9 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             BenyWifiTimerSensor(coordinator, "timer_start", icon="mdi:timer-sand-full", device_model=device_model, serial=serial),
             BenyWifiTimerSensor(coordinator, "timer_end", icon="mdi:timer-sand-empty", device_model=device_model, serial=serial),
             BenyWifiSensor(coordinator, "fault_code", icon="mdi:alert-circle-outline", device_model=device_model, serial=serial),
-            BenyWifiLatencySensor(coordinator, "udp_latency", device_model=device_model, serial=serial)
+            BenyWifiLatencySensor(coordinator, "udp_latency", device_model=device_model, serial=serial),
+            BenyWifiPollIntervalSensor(coordinator, "poll_interval", device_model=device_model, serial=serial),
+            BenyWifiScheduleLagSensor(coordinator, "schedule_lag", device_model=device_model, serial=serial)
         ]
 
     # add all three phases if model supports them
@@ -79,7 +126,9 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             BenyWifiTimerSensor(coordinator, "timer_start", icon="mdi:timer-sand-full", device_model=device_model, serial=serial),
             BenyWifiTimerSensor(coordinator, "timer_end", icon="mdi:timer-sand-empty", device_model=device_model, serial=serial),
             BenyWifiSensor(coordinator, "fault_code", icon="mdi:alert-circle-outline", device_model=device_model, serial=serial),
-            BenyWifiLatencySensor(coordinator, "udp_latency", device_model=device_model, serial=serial)
+            BenyWifiLatencySensor(coordinator, "udp_latency", device_model=device_model, serial=serial),
+            BenyWifiPollIntervalSensor(coordinator, "poll_interval", device_model=device_model, serial=serial),
+            BenyWifiScheduleLagSensor(coordinator, "schedule_lag", device_model=device_model, serial=serial)
         ]
 
     # TODO: DLB
@@ -96,10 +145,12 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 class BenyWifiSensor(CoordinatorEntity, SensorEntity):
     """Charger sensor model."""
     _attr_has_entity_name = True
+    # Publishing policy of the entity class, None writes every change
+    _publish_policy: PublishPolicy | None = None
 
     def __init__(self, coordinator, key, device_model=None, serial=None, icon=None):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=key)
         self.coordinator = coordinator
         self.key = key
         self._attr_translation_key = key
@@ -111,13 +162,100 @@ class BenyWifiSensor(CoordinatorEntity, SensorEntity):
         self._last_valid_state = None
         self._attr_suggested_object_id = key
 
-    @property
-    def native_value(self):
-        """Return the current state of the sensor."""
+        # Last written value and availability when a publishing policy is used
+        self._published_value = None
+        self._published_available = None
+        self._published_at: float | None = None
+        self._published_attributes = None
+        self._suppressed = 0
+        self._cancel_publish = None
+
+    def _coordinator_value(self):
         if self.coordinator.data is None:
             return None
         return self.coordinator.data.get(self.key)
 
+    @property
+    def native_value(self):
+        """Return the current state of the sensor."""
+        if self._publish_policy is None or self._published_at is None:
+            return self._coordinator_value()
+        return self._published_value
+
+    @property
+    def extra_state_attributes(self):
+        """Return the age of restored data and the number of updates held back by the publishing policy."""
+        attributes = {}
+        if self.coordinator.restored_age is not None:
+            attributes["restored_age"] = self.coordinator.restored_age
+        if self._publish_policy is not None:
+            attributes["suppressed_updates"] = self._suppressed
+        return attributes or None
+
+    async def async_added_to_hass(self) -> None:
+        """Publish the initial value and cancel a pending delayed write on removal."""
+        await super().async_added_to_hass()
+        if self._publish_policy is not None:
+            self._mark_published()
+            self.async_on_remove(self._cancel_delayed_publish)
+
+    def _mark_published(self) -> None:
+        self._published_value = self._coordinator_value()
+        self._published_available = self.available
+        self._published_at = time.monotonic()
+        self._published_attributes = self._compared_attributes()
+
+    def _compared_attributes(self) -> dict:
+        # The suppressed updates counter changes only because a write was held back
+        attributes = dict(self.extra_state_attributes or {})
+        attributes.pop("suppressed_updates", None)
+        return attributes
+
+    @callback
+    def _cancel_delayed_publish(self) -> None:
+        if self._cancel_publish is not None:
+            self._cancel_publish()
+            self._cancel_publish = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new value if the publishing policy lets it through.
+
+        A held back value is written later, once min_interval or the heartbeat
+        has passed, unless a newer value has replaced it by then.
+        """
+        policy = self._publish_policy
+        if policy is None or self._published_at is None:
+            super()._handle_coordinator_update()
+            return
+
+        self._cancel_delayed_publish()
+        value = self._coordinator_value()
+        if self.available != self._published_available:
+            delay = 0.0
+        else:
+            delay = policy.next_publish(
+                self._published_value,
+                value,
+                time.monotonic() - self._published_at,
+                attributes_changed=self._compared_attributes() != self._published_attributes,
+            )
+            if delay is None:
+                return
+
+        if delay > 0:
+            self._suppressed += 1
+            self._cancel_publish = async_call_later(self.hass, delay, self._async_delayed_publish)
+            return
+
+        self._mark_published()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_delayed_publish(self, _now) -> None:
+        self._cancel_publish = None
+        self._handle_coordinator_update()
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return device information."""
@@ -146,6 +284,7 @@ class BenyWifiCurrentSensor(BenyWifiSensor):
     _attr_device_class = SensorDeviceClass.CURRENT
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = UnitOfElectricCurrent.AMPERE
+    _publish_policy = PublishPolicy(deadband=0.2, heartbeat=300)
 
     def __init__(self, coordinator, key, device_model=None, serial=None, icon="mdi:sine-wave"):
         """Initialize sensor."""
@@ -156,6 +295,7 @@ class BenyWifiVoltageSensor(BenyWifiSensor):
     _attr_device_class = SensorDeviceClass.VOLTAGE
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = UnitOfElectricPotential.VOLT
+    _publish_policy = PublishPolicy(deadband=2, heartbeat=300)
 
     def __init__(self, coordinator, key, device_model=None, serial=None, icon="mdi:flash-triangle"):
         """Initialize sensor."""
@@ -166,6 +306,7 @@ class BenyWifiPowerSensor(BenyWifiSensor):
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = UnitOfPower.KILO_WATT
+    _publish_policy = PublishPolicy(deadband=0.05, relative_deadband=0.02, heartbeat=300)
 
     def __init__(self, coordinator, key, device_model=None, serial=None, icon="mdi:ev-plug-type2"):
         """Initialize sensor."""
@@ -173,11 +314,11 @@ class BenyWifiPowerSensor(BenyWifiSensor):
             
     @property
     def available(self) -> bool:
-        """Return False once a DLB field has been None for STALE_THRESHOLD consecutive polls.
+        """Return False once a DLB field has had no valid value for the coordinator's stale window.
 
         For non-DLB power fields, delegates entirely to CoordinatorEntity.available
         which already handles device-unreachable via last_update_success.
-        For DLB fields, also checks the per-field stale counter so each can go
+        For DLB fields, also checks the per-field stale state so each can go
         unavailable independently of the overall coordinator state.
         """
         if self.key in ("grid_power", "solar_power", "ev_power", "house_power"):
@@ -216,7 +357,43 @@ class BenyWifiLatencySensor(BenyWifiSensor):
     """Latency sensor class."""
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "ms"
+    _publish_policy = PublishPolicy(deadband=5, relative_deadband=0.25, min_interval=60, heartbeat=900)
 
     def __init__(self, coordinator, key, device_model=None, serial=None, icon="mdi:timer-outline"):
         """Initialize sensor."""
         super().__init__(coordinator, key, serial=serial, device_model=device_model, icon=icon)
+
+    @property
+    def extra_state_attributes(self):
+        """Return RTT estimates (ms), command queue and shared endpoint counters of the charger."""
+        attributes = {**self.coordinator.rtt_estimates, **(super().extra_state_attributes or {})}
+        attributes["commands"] = self.coordinator.command_stats
+        if (transport_stats := self.coordinator.transport_stats) is not None:
+            attributes["shared_endpoint"] = transport_stats
+        return attributes
+
+class BenyWifiScheduleLagSensor(BenyWifiSensor):
+    """Sensor showing how late the last scheduled poll of the charger started."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "ms"
+    _publish_policy = PublishPolicy(deadband=50, relative_deadband=0.25, min_interval=60, heartbeat=900)
+
+    def __init__(self, coordinator, key, device_model=None, serial=None, icon="mdi:timer-alert-outline"):
+        """Initialize sensor."""
+        super().__init__(coordinator, key, serial=serial, device_model=device_model, icon=icon)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the offset of the charger's polls as a fraction of the poll interval."""
+        return {"phase": self.coordinator.schedule_phase, **(super().extra_state_attributes or {})}
+
+class BenyWifiPollIntervalSensor(BenyWifiSensor):
+    """Sensor showing the current charger value update interval."""
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+
+    def __init__(self, coordinator, key, device_model=None, serial=None, icon="mdi:update"):
+        """Initialize sensor."""
+        super().__init__(coordinator, key, serial=serial, device_model=device_model, icon=icon)
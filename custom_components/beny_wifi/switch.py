@@ -58,7 +58,7 @@ class BenyWifiDlbSwitch(CoordinatorEntity, SwitchEntity):
 
     def __init__(self, coordinator, key, serial=None, device_model=None):
         """Initialize the switch entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context="dlb_config")
         self.coordinator = coordinator
         self.key = key
         self._attr_translation_key = key
@@ -66,9 +66,13 @@ class BenyWifiDlbSwitch(CoordinatorEntity, SwitchEntity):
         self._device_model = device_model
         self._attr_has_entity_name = True
         self._attr_unique_id = f"{serial}_{key}"
-        self._optimistic_state: bool | None = None
         self._attr_suggested_object_id = key  
 
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Expose whether the charger has yet to confirm the DLB config."""
+        return {"pending": self.coordinator.dlb_config_pending}
+
     def _get_cached_byte(self, field: str) -> int:
         """Read a byte from the coordinator's DLB config cache."""
         if self.coordinator.data:
@@ -103,31 +107,20 @@ class BenyWifiDlbEnabledSwitch(BenyWifiDlbSwitch):
     @property
     def is_on(self) -> bool:
         """Return True if DLB is enabled."""
-        if self._optimistic_state is not None:
-            return self._optimistic_state
         return self.coordinator._dlb_config.get("dlb_enabled", 0x01) == 0x01
 
     async def async_turn_on(self, **kwargs) -> None:
         """Enable PV Dynamic Load Balance."""
         device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, dlb_enabled=True)
-        self._optimistic_state = True
-        self.async_write_ha_state()
         _LOGGER.info(f"{device_name}: PV Dynamic Load Balance enabled")
 
     async def async_turn_off(self, **kwargs) -> None:
         """Disable PV Dynamic Load Balance."""
         device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, dlb_enabled=False)
-        self._optimistic_state = False
-        self.async_write_ha_state()
         _LOGGER.info(f"{device_name}: PV Dynamic Load Balance disabled")
 
-    def _handle_coordinator_update(self) -> None:
-        """Clear optimistic state on coordinator refresh."""
-        self._optimistic_state = None
-        super()._handle_coordinator_update()
-
 
 class BenyWifiExtremeModeSwitch(BenyWifiDlbSwitch):
     """Switch to enable/disable Extreme Mode.
@@ -144,31 +137,20 @@ class BenyWifiExtremeModeSwitch(BenyWifiDlbSwitch):
     @property
     def is_on(self) -> bool:
         """Return True if Extreme Mode is active."""
-        if self._optimistic_state is not None:
-            return self._optimistic_state
         return self._get_cached_byte("extreme") == 0x01
 
     async def async_turn_on(self, **kwargs) -> None:
         """Enable Extreme Mode."""
         device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, extreme_mode=True)
-        self._optimistic_state = True
-        self.async_write_ha_state()
         _LOGGER.info(f"{device_name}: Extreme Mode enabled")
 
     async def async_turn_off(self, **kwargs) -> None:
         """Disable Extreme Mode."""
         device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, extreme_mode=False)
-        self._optimistic_state = False
-        self.async_write_ha_state()
         _LOGGER.info(f"{device_name}: Extreme Mode disabled")
 
-    def _handle_coordinator_update(self) -> None:
-        """Clear optimistic state on coordinator refresh."""
-        self._optimistic_state = None
-        super()._handle_coordinator_update()
-
 
 class BenyWifiNightModeSwitch(BenyWifiDlbSwitch):
     """Switch to enable/disable Night Mode (automatic full-speed window).
@@ -187,8 +169,6 @@ class BenyWifiNightModeSwitch(BenyWifiDlbSwitch):
     @property
     def is_on(self) -> bool:
         """Return True if Night Mode is active."""
-        if self._optimistic_state is not None:
-            return self._optimistic_state
         return self._get_cached_byte("night") == 0x01
 
     @property
@@ -197,28 +177,20 @@ class BenyWifiNightModeSwitch(BenyWifiDlbSwitch):
         if self.coordinator.data:
             cfg = self.coordinator.data.get("dlb_config", {})
             return {
+                **super().extra_state_attributes,
                 "night_start_hour": cfg.get("night_start"),
                 "night_end_hour":   cfg.get("night_end"),
             }
-        return {}
+        return super().extra_state_attributes
 
     async def async_turn_on(self, **kwargs) -> None:
         """Enable Night Mode."""
         device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, night_mode=True)
-        self._optimistic_state = True
-        self.async_write_ha_state()
         _LOGGER.info(f"{device_name}: Night Mode enabled")
 
     async def async_turn_off(self, **kwargs) -> None:
         """Disable Night Mode."""
         device_name = get_device_id(self.hass, self._serial, self._device_model)
         await self.coordinator.async_set_dlb_config(device_name, night_mode=False)
-        self._optimistic_state = False
-        self.async_write_ha_state()
-        _LOGGER.info(f"{device_name}: Night Mode disabled")
-
-    def _handle_coordinator_update(self) -> None:
-        """Clear optimistic state on coordinator refresh."""
-        self._optimistic_state = None
-        super()._handle_coordinator_update()
\ No newline at end of file
+        _LOGGER.info(f"{device_name}: Night Mode disabled")
\ No newline at end of file
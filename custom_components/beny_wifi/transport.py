@@ -0,0 +1,520 @@
+"""UDP transport for Beny Wifi chargers."""
+import asyncio
+from binascii import unhexlify
+from collections.abc import Awaitable, Callable
+import logging
+import random
+from typing import Any
+
+from .const import CIRCUIT_STATE, REQUEST_TYPE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BenyWifiProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol forwarding received frames to the owning transport or hub."""
+
+    def __init__(self, owner: "BenyWifiTransport | BenyWifiTransportHub") -> None:
+        """Initialize protocol."""
+        self._owner = owner
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        """Handle a datagram received from the network."""
+        self._owner.handle_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        """Handle a send/receive error reported by the OS (e.g. ICMP unreachable)."""
+        self._owner.handle_error(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Handle the endpoint being closed."""
+        self._owner.handle_connection_lost(exc)
+
+
+class BenyWifiTransportHub:
+    """One UDP endpoint shared by the transports of all chargers.
+
+    Received frames are routed to the transport of the charger they came from
+    by source address, which correlates them with its own outstanding
+    requests. The endpoint is opened with the first request and closed when
+    the last charger is unregistered.
+    """
+
+    def __init__(self) -> None:
+        """Initialize hub."""
+        self._transport: asyncio.DatagramTransport | None = None
+        self._open_lock = asyncio.Lock()
+        # charger address -> transport of the charger
+        self._chargers: dict[str, BenyWifiTransport] = {}
+        self.sent = 0
+        self.received = 0
+        self.unrouted = 0
+        self.errors = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if the endpoint is open."""
+        return self._transport is not None and not self._transport.is_closing()
+
+    def register(self, charger: "BenyWifiTransport", ip_address: str | None = None) -> None:
+        """Route frames received from ip_address (default: the charger's address) to the charger."""
+        ip_address = ip_address or charger.ip_address
+        existing = self._chargers.get(ip_address)
+        if existing is not None and existing is not charger:
+            _LOGGER.warning(f"Two chargers configured at {ip_address}, routing its frames to the latest")  # noqa: G004
+        self._chargers[ip_address] = charger
+
+    def unregister(self, charger: "BenyWifiTransport", ip_address: str | None = None) -> None:
+        """Stop routing frames to the charger, closing the endpoint after the last one."""
+        ip_address = ip_address or charger.ip_address
+        if self._chargers.get(ip_address) is charger:
+            del self._chargers[ip_address]
+        if not self._chargers:
+            self.close()
+
+    async def async_open(self) -> None:
+        """Open the shared UDP endpoint if it is not open already."""
+        async with self._open_lock:
+            if self.is_open:
+                return
+
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: BenyWifiProtocol(self),
+                local_addr=("0.0.0.0", 0),
+            )
+        _LOGGER.debug("Shared UDP endpoint opened")
+
+    def close(self) -> None:
+        """Close the shared UDP endpoint."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def sendto(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Send a frame from the shared endpoint."""
+        self._transport.sendto(data, addr)
+        self.sent += 1
+
+    def handle_datagram(self, data: bytes, addr) -> None:
+        """Route a received frame to the charger it came from."""
+        self.received += 1
+        charger = self._chargers.get(addr[0])
+        if charger is None:
+            self.unrouted += 1
+            _LOGGER.debug(f"Ignoring datagram from unknown address {addr}: {data!r}")  # noqa: G004
+            return
+        charger.handle_datagram(data, addr)
+
+    def handle_error(self, exc: Exception) -> None:
+        """Count an error reported by the OS.
+
+        The error does not tell which charger it is about, so the requests
+        it concerns are left to time out instead of failing every charger.
+        """
+        self.errors += 1
+        _LOGGER.debug(f"Shared UDP endpoint error: {exc}")  # noqa: G004
+
+    def handle_connection_lost(self, exc: Exception | None) -> None:
+        """Forget the endpoint and fail the outstanding requests of every charger."""
+        self._transport = None
+        for charger in self._chargers.values():
+            charger.handle_connection_lost(exc)
+
+    def as_dict(self) -> dict:
+        """Return the number of chargers and frames sent, received and dropped."""
+        return {
+            "chargers": len(self._chargers),
+            "sent": self.sent,
+            "received": self.received,
+            "unrouted": self.unrouted,
+            "errors": self.errors,
+        }
+
+
+class BenyWifiTransport:
+    """Long-lived UDP endpoint used for all requests to a single charger.
+
+    The endpoint is opened lazily on the first request and kept open until
+    close() is called. Requests are sent and received on the event loop, the
+    reply future is resolved from datagram_received(). With a hub the hub's
+    shared endpoint is used instead of an own one.
+
+    Several requests may be outstanding at once. Each request declares the
+    REQUEST_TYPE its reply will carry and replies are correlated back by the
+    request_type byte of the received frame. Replies without a usable request
+    type (ACKs, access denied) resolve the oldest outstanding request.
+    """
+
+    def __init__(self, ip_address: str, port: int, hub: BenyWifiTransportHub | None = None) -> None:
+        """Initialize transport."""
+        self._ip_address = ip_address
+        self.port = port
+        self._hub = hub
+        self._transport: asyncio.DatagramTransport | None = None
+        self._open_lock = asyncio.Lock()
+        # Outstanding requests in send order: (expected reply key, future)
+        self._pending: list[tuple[REQUEST_TYPE | None, asyncio.Future]] = []
+
+    @property
+    def ip_address(self) -> str:
+        """Return the address of the charger."""
+        return self._ip_address
+
+    @ip_address.setter
+    def ip_address(self, ip_address: str) -> None:
+        """Send to and accept replies from a new address of the charger."""
+        if self._hub is not None:
+            self._hub.register(self, ip_address)
+            self._hub.unregister(self, self._ip_address)
+        self._ip_address = ip_address
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if the endpoint is open."""
+        if self._hub is not None:
+            return self._hub.is_open
+        return self._transport is not None and not self._transport.is_closing()
+
+    async def async_open(self) -> None:
+        """Open the UDP endpoint if it is not open already."""
+        if self._hub is not None:
+            self._hub.register(self)
+            await self._hub.async_open()
+            return
+
+        async with self._open_lock:
+            if self.is_open:
+                return
+
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: BenyWifiProtocol(self),
+                local_addr=("0.0.0.0", 0),
+            )
+        _LOGGER.debug(f"UDP endpoint opened for {self.ip_address}:{self.port}")  # noqa: G004
+
+    def close(self) -> None:
+        """Close the UDP endpoint and fail any pending request."""
+        if self._hub is not None:
+            self._hub.unregister(self)
+        elif self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self._fail_pending(ConnectionError("UDP endpoint closed"))
+
+    async def async_request(self, request: bytes, timeout: float, reply_key: REQUEST_TYPE | None = None) -> bytes:
+        """Send a request and wait for the matching reply from the charger.
+
+        Args:
+            request (bytes): ascii hex frame to send
+            timeout (float): seconds to wait for the reply
+            reply_key (REQUEST_TYPE | None): request type the reply is expected to carry,
+                None for commands that are answered with a plain ACK
+
+        Returns:
+            bytes: raw reply frame
+
+        Raises:
+            TimeoutError: no reply within timeout
+            OSError: endpoint could not send or the OS reported an error
+
+        """
+        await self.async_open()
+
+        entry = (reply_key, asyncio.get_running_loop().create_future())
+        self._pending.append(entry)
+        try:
+            (self._hub or self._transport).sendto(request, (self.ip_address, self.port))
+            async with asyncio.timeout(timeout):
+                return await entry[1]
+        finally:
+            self._pending.remove(entry)
+
+    def handle_datagram(self, data: bytes, addr) -> None:
+        """Resolve the outstanding request matching a frame received from the charger."""
+        if addr[0] != self.ip_address:
+            _LOGGER.debug(f"Ignoring datagram from unexpected address {addr}: {data!r}")  # noqa: G004
+            return
+
+        key = reply_key(data)
+        future = next(
+            (future for pending_key, future in self._pending if pending_key == key and not future.done()),
+            None,
+        )
+        if future is None:
+            # Replies without a request type (ACKs, access denied) go to the oldest
+            # outstanding request, unmatched typed replies only to a waiting command.
+            future = next(
+                (
+                    future for pending_key, future in self._pending
+                    if not future.done() and (key is None or pending_key is None)
+                ),
+                None,
+            )
+
+        if future is None:
+            _LOGGER.debug(f"Ignoring unsolicited datagram from {addr}: {data!r}")  # noqa: G004
+            return
+
+        future.set_result(data)
+
+    def handle_error(self, exc: Exception) -> None:
+        """Fail outstanding requests with an error reported by the OS."""
+        _LOGGER.debug(f"UDP endpoint error for {self.ip_address}:{self.port}: {exc}")  # noqa: G004
+        self._fail_pending(exc)
+
+    def handle_connection_lost(self, exc: Exception | None) -> None:
+        """Forget the endpoint so the next request reopens it."""
+        self._transport = None
+        self._fail_pending(exc or ConnectionError("UDP endpoint closed"))
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for _, future in self._pending:
+            if not future.done():
+                future.set_exception(exc)
+
+
+class RttEstimator:
+    """Round-trip time estimator driving the retransmission timeout.
+
+    Follows the TCP retransmission timer (RFC 6298): a smoothed RTT and RTT
+    variance are updated from every valid sample and the retransmission timeout
+    is SRTT + 4 * RTTVAR, clamped between a floor and a ceiling. The timeout
+    doubles on every expiry until the next valid sample arrives.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, min_rto: float, max_rto: float, initial_rto: float) -> None:
+        """Initialize estimator."""
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self.rto = self._clamp(initial_rto)
+
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.min_rto), self.max_rto)
+
+    def update(self, sample: float) -> None:
+        """Update the estimates with a measured round-trip time (seconds)."""
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - sample)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * sample
+        self.rto = self._clamp(self.srtt + self.K * self.rttvar)
+
+    def timed_out(self) -> None:
+        """Back off the retransmission timeout after an expiry."""
+        self.rto = self._clamp(self.rto * 2)
+
+    def budget(self, attempts: int) -> float:
+        """Return the worst-case time spent on a request with the given number of attempts."""
+        total = 0.0
+        rto = self.rto
+        for _ in range(attempts):
+            total += rto
+            rto = self._clamp(rto * 2)
+        return total
+
+    def as_dict(self) -> dict:
+        """Return the current estimates in milliseconds."""
+        return {
+            "srtt": round(self.srtt * 1000, 2) if self.srtt is not None else None,
+            "rttvar": round(self.rttvar * 1000, 2) if self.rttvar is not None else None,
+            "rto": round(self.rto * 1000, 2),
+            "min_rto": round(self.min_rto * 1000, 2),
+            "max_rto": round(self.max_rto * 1000, 2),
+        }
+
+
+class CircuitBreaker:
+    """Circuit breaker guarding polls of a charger that has gone offline.
+
+    Closed: every poll goes to the charger. After failure_threshold consecutive
+    failed polls the breaker opens and polls are refused until the backoff
+    window has passed. The window starts at min_backoff, doubles every time a
+    probe fails up to max_backoff and is randomized by +-jitter so several
+    chargers do not probe in lockstep. Once the window has passed the breaker
+    is half-open and allows exactly one probe; its outcome closes the breaker
+    or opens it again for a longer window.
+    """
+
+    def __init__(self, failure_threshold: int, min_backoff: float, max_backoff: float, jitter: float) -> None:
+        """Initialize circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.state = CIRCUIT_STATE.CLOSED
+        self.failures = 0
+        self.backoff = 0.0
+        self.retry_at = 0.0
+
+    def allow_probe(self, now: float) -> bool:
+        """Return True and go half-open if an open breaker's backoff window has passed."""
+        if self.state is not CIRCUIT_STATE.OPEN or now < self.retry_at:
+            return False
+        self.state = CIRCUIT_STATE.HALF_OPEN
+        return True
+
+    def retry_now(self, now: float) -> None:
+        """Let an open breaker probe right away, e.g. after the charger was found at a new address."""
+        if self.state is CIRCUIT_STATE.OPEN:
+            self.retry_at = now
+
+    def record_success(self) -> bool:
+        """Record a successful poll or probe.
+
+        Returns:
+            bool: True if the breaker was not closed before
+
+        """
+        recovered = self.state is not CIRCUIT_STATE.CLOSED
+        self.state = CIRCUIT_STATE.CLOSED
+        self.failures = 0
+        self.backoff = 0.0
+        return recovered
+
+    def record_failure(self, now: float) -> bool:
+        """Record a failed poll or probe.
+
+        Returns:
+            bool: True if the breaker opened because of this failure
+
+        """
+        self.failures += 1
+        if self.state is CIRCUIT_STATE.HALF_OPEN:
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+        elif self.state is CIRCUIT_STATE.CLOSED and self.failures >= self.failure_threshold:
+            self.backoff = self.min_backoff
+        else:
+            return False
+
+        opened = self.state is CIRCUIT_STATE.CLOSED
+        self.state = CIRCUIT_STATE.OPEN
+        self.retry_at = now + self.backoff * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return opened
+
+
+class CommandQueue:
+    """Queue sending the commands to a single charger one at a time.
+
+    Commands are sent in the order their kind was first queued. A command
+    queued while another of the same kind is still waiting replaces it, so
+    only the latest value is sent (last writer wins). Every caller gets its
+    own future; the callers of a replaced command get the result of the one
+    that replaced it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize command queue."""
+        # kind -> (send coroutine factory, caller futures), in the order queued
+        self._queued: dict[str, tuple[Callable[[], Awaitable[Any]], list[asyncio.Future]]] = {}
+        self._worker: asyncio.Task | None = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._sending = False
+        self.sent = 0
+        self.coalesced = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of commands waiting or being sent."""
+        return len(self._queued) + self._sending
+
+    async def async_submit(self, kind: str, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Queue a command and wait for it, or the command replacing it, to be sent.
+
+        Args:
+            kind (str): kind of the command, a queued command of the same kind is replaced
+            send (Callable[[], Awaitable[Any]]): sends the command and returns the reply
+
+        Returns:
+            Any: result of send
+
+        """
+        future = asyncio.get_running_loop().create_future()
+        if kind in self._queued:
+            _, futures = self._queued[kind]
+            self._queued[kind] = (send, [*futures, future])
+            self.coalesced += 1
+            _LOGGER.debug(f"Queued {kind} command replaced by a newer one")  # noqa: G004
+        else:
+            self._queued[kind] = (send, [future])
+
+        if self._worker is None or self._worker.done():
+            self._idle.clear()
+            self._worker = asyncio.create_task(self._async_run())
+        return await future
+
+    async def _async_run(self) -> None:
+        try:
+            while self._queued:
+                kind = next(iter(self._queued))
+                send, futures = self._queued.pop(kind)
+                self._sending = True
+                try:
+                    result = await send()
+                except Exception as err:
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(err)
+                else:
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(result)
+                finally:
+                    self._sending = False
+                    self.sent += 1
+                    # Left unresolved only if the queue was closed while sending
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(ConnectionError("Command queue closed"))
+        finally:
+            self._idle.set()
+
+    async def async_wait_idle(self) -> None:
+        """Wait until every queued command has been sent."""
+        await self._idle.wait()
+
+    def close(self) -> None:
+        """Stop sending and fail the queued commands."""
+        if self._worker is not None:
+            self._worker.cancel()
+        for _, futures in self._queued.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(ConnectionError("Command queue closed"))
+        self._queued.clear()
+
+    def as_dict(self) -> dict:
+        """Return the queue depth and the number of commands sent and replaced."""
+        return {"depth": self.depth, "sent": self.sent, "coalesced": self.coalesced}
+
+
+def reply_key(data: bytes) -> REQUEST_TYPE | None:
+    """Return the request type a reply frame answers, or None if it carries none.
+
+    Frames without payload (header and checksum only, like access denied)
+    carry no request type. Only the request type byte is decoded, straight
+    from the received buffer.
+
+    Args:
+        data (bytes): raw frame as received (ascii hex)
+
+    Returns:
+        REQUEST_TYPE | None: request type of the reply
+
+    """
+    if len(data) < 14:
+        return None
+    try:
+        return REQUEST_TYPE(unhexlify(memoryview(data)[10:12])[0])
+    except ValueError:  # binascii.Error is a ValueError
+        return None
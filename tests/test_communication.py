@@ -1,6 +1,7 @@
 # tests/test_communication.py
+import pytest
 from custom_components.beny_wifi.communication import read_message, build_message, get_message_type
-from custom_components.beny_wifi.const import SERVER_MESSAGE, CLIENT_MESSAGE, CHARGER_STATE, TIMER_STATE, REQUEST_TYPE, CHARGER_COMMAND
+from custom_components.beny_wifi.const import SERVER_MESSAGE, CLIENT_MESSAGE, CHARGER_STATE, TIMER_STATE, REQUEST_TYPE, CHARGER_COMMAND, calculate_checksum
 
 def test_read_message_valid():
     data = "55aa10001103075BCD15c0a801220d0504"
@@ -32,6 +33,7 @@ def test_read_message_no_msg_type():
 def test_build_message():
     message = CLIENT_MESSAGE.SET_TIMER
     params = {
+        "pin": "0cb34",
         "start_h": "08",
         "start_min": "00",
         "end_h": "10",
@@ -44,6 +46,7 @@ def test_build_message():
 def test_build_message_no_end_time():
     message = CLIENT_MESSAGE.SET_TIMER
     params = {
+        "pin": "0cb34",
         "start_h": "08",
         "start_min": "00",
         "end_h": "10",
@@ -53,6 +56,11 @@ def test_build_message_no_end_time():
     expected_hex = "55aa10001c0000cb3469000160080000000008000010300017153bab"
     assert build_message(message, params) == expected_hex
 
+def test_build_message_missing_value():
+    # every placeholder of the template needs a value, the pin is missing here
+    with pytest.raises(ValueError, match=r"Missing value for \[pin\]"):
+        build_message(CLIENT_MESSAGE.REQUEST_DATA, {"request_type": "01"})
+
 def test_read_message_state_parsing():
     # Simulated data with 'state' field at a specific position
     data = "55aa1000237000000000e600e800e6000000005e05000000000000000f0000000003cb"  # (state: waiting)
@@ -142,4 +150,52 @@ def test_set_timer():
     assert result["start_h"] == 0
     assert result["start_min"] == 0
     assert result["end_h"] == 8
-    assert result["end_min"] == 0
\ No newline at end of file
+    assert result["end_min"] == 0
+def test_read_message_3p_nibble_fields():
+    # 3-phase currents are single hex digits inside a byte
+    data = "55aa100023700d0d0d00e500e500e2005b00af5f06000000000000000f0000000003f6"
+    result = read_message(data, SERVER_MESSAGE.SEND_VALUES_3P)
+    assert (result["current1"], result["current2"], result["current3"]) == (13, 13, 13)
+    assert (result["voltage1"], result["voltage2"], result["voltage3"]) == (229, 229, 226)
+    assert result["state"] == CHARGER_STATE.CHARGING.name
+    assert result["fault_code_numeric"] == 0
+
+def test_read_message_dlb_signed_power():
+    # grid power 0xff9c is -100 (exporting 1.00 kW)
+    data = "55aa7b00117b0000011200000200ff9cb6"
+    result = read_message(data)
+    assert result["solar_power"] == 2.74
+    assert result["ev_power"] == 0.0
+    assert result["house_power"] == 5.12
+    assert result["grid_power"] == -1.0
+
+def test_read_message_dlb_3p_too_short():
+    # a truncated 3-phase DLB frame is rejected like the other frames
+    body = "55aa7b00217b000001120000"
+    data = body + f"{sum(bytes.fromhex(body)) % 256:02x}"
+    with pytest.raises(ValueError):
+        read_message(data, SERVER_MESSAGE.SEND_DLB_3P)
+
+def test_build_message_checksum_odd_alignment():
+    # 5-digit pin and timer fields shift later parameters to odd nibble positions
+    params = {
+        "pin": "0cb34",
+        "start_h": "08",
+        "start_min": "00",
+        "end_h": "10",
+        "end_min": "30",
+        "end_timer_set": "11111"
+    }
+    msg = build_message(CLIENT_MESSAGE.SET_TIMER, params)
+    assert msg == "55aa10001c0000cb3469000160080001111108000010300017153b" + f"{calculate_checksum(msg):02x}"
+    assert build_message(CLIENT_MESSAGE.SET_TIMER, params) == msg
+
+def test_build_message_header_prefix():
+    msg = build_message(CLIENT_MESSAGE.REQUEST_DATA, {"pin": "0cb34", "request_type": "04"}, header_prefix="55aa7b")
+    assert msg == "55aa7b000b0000cb340488"
+
+def test_read_message_from_received_bytes():
+    # frames are parsed as received from the socket, without decoding to str first
+    data = "55aa7b00117b0000011200000200ff9cb6"
+    assert read_message(data.encode("ascii")) == read_message(data)
+    assert read_message(memoryview(data.encode("ascii"))) == read_message(data)
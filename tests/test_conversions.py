@@ -6,7 +6,10 @@ from custom_components.beny_wifi.conversions import (
     convert_weekdays_to_hex,
     get_hex,
     get_message_type,
-    get_model
+    get_model,
+    lookup_message_type,
+    register_message_type,
+    UNKNOWN_MESSAGE_TYPES,
 )
 
 from custom_components.beny_wifi.const import CLIENT_MESSAGE, SERVER_MESSAGE
@@ -82,6 +85,27 @@ def test_get_message_type():
     # Test for invalid msg_int
     assert get_message_type("55aafff0fff000000000e600e800e6000000006102000000000000000f0000000003cb") is None, "get_message_type should return None for unknown msg_int"
 
+def test_get_message_type_by_type_and_id():
+    # message_id 17 is a DLB frame for message_type 7b and a handshake otherwise
+    assert lookup_message_type(0x7b, 17) == SERVER_MESSAGE.SEND_DLB
+    assert lookup_message_type(0x10, 17) == SERVER_MESSAGE.HANDSHAKE
+    assert lookup_message_type(0x7b, 33) == SERVER_MESSAGE.SEND_DLB_3P
+    assert lookup_message_type(0x10, 33) is None
+    assert lookup_message_type(0x6b, 18) == SERVER_MESSAGE.SEND_DLB_CONFIG
+
+def test_register_message_type():
+    before = UNKNOWN_MESSAGE_TYPES[(0x10, 37)]
+    assert lookup_message_type(0x10, 37) is None
+    assert UNKNOWN_MESSAGE_TYPES[(0x10, 37)] == before + 1
+
+    register_message_type(SERVER_MESSAGE.SEND_VALUES_3P, 37)
+    assert lookup_message_type(0x10, 37) == SERVER_MESSAGE.SEND_VALUES_3P
+
+    # a type specific registration takes precedence over the id-only one
+    register_message_type(SERVER_MESSAGE.SEND_DLB_3P, 37, 0x7b)
+    assert lookup_message_type(0x7b, 37) == SERVER_MESSAGE.SEND_DLB_3P
+    assert lookup_message_type(0x10, 37) == SERVER_MESSAGE.SEND_VALUES_3P
+
 def test_get_model():
     # Test data with model value 'BCP-AT1N-L'
     data = "0000000000000000000000000000000000000000000000004243502d4154314e2d4c0000000000000000000000000000000000000000"
@@ -1,15 +1,50 @@
+import asyncio
 import pytest
-import socket
-from unittest.mock import patch, MagicMock, AsyncMock, call
+from unittest.mock import patch, MagicMock, AsyncMock
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.update_coordinator import UpdateFailed
 from custom_components.beny_wifi.coordinator import BenyWifiUpdateCoordinator
+from custom_components.beny_wifi.const import (
+    CAPABILITIES,
+    DLB_CONFIG_SAVE_DELAY,
+    DLB_SYNC_ATTEMPTS,
+    DLB_SYNC_RETRIES,
+    CONF_PIN,
+    CONF_SERIAL,
+    DLB,
+    DLB_MODE,
+    REQUEST_TYPE,
+    SECTION_CONNECTION,
+    SECTION_DEVICE,
+    SECTION_DLB,
+)
 from datetime import datetime, timedelta
 
-@pytest.fixture
-def mock_send_udp_request():
-    """Mock the '_send_udp_request' method."""
-    return AsyncMock()
+ACCESS_DENIED = b"55aa10000869"
+COMMAND_ACK = b"55aa10000c0000cb34060121"
+# VALUES reply of a charger in standby without a timer, and an empty STATUS reply
+STANDBY_VALUES = b"55aa1000237000000000e600e600e6000000005e02000000000000000f0000000003c6"
+STATUS_REPLY = b"55aa1000156e0000000000000000"
+
+
+class FakeCharger:
+    """UDP endpoint answering the frames sent to the charger with the replies of answer()."""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.sent = []
+        # frame -> (reply, delay in seconds) or None
+        self.answer = lambda frame: None
+
+    def sendto(self, data, addr):
+        self.sent.append(data)
+        if (reply := self.answer(data)) is not None:
+            asyncio.get_running_loop().call_later(reply[1], self.transport.handle_datagram, reply[0], addr)
+
+    def is_closing(self):
+        return False
+
 
 @pytest.fixture
 def mock_hass():
@@ -17,313 +52,352 @@ def mock_hass():
     hass = MagicMock(HomeAssistant)
     # Mock the states object
     hass.states = MagicMock()
+    hass.data = {}
+    hass.config = MagicMock()
     return hass
 
 @pytest.fixture
-def coordinator(mock_hass):
-    """Fixture to create a BenyWifiUpdateCoordinator instance."""
-    # Mock the config_entry data
+def mock_config_entry():
+    """Fixture to mock the config entry of a charger."""
     config_entry = MagicMock()
+    config_entry.entry_id = "test"
     config_entry.data = {
-        "serial": "1234567890"  # Mock the serial number
+        SECTION_DEVICE: {CONF_PIN: "0cb34", CONF_SERIAL: "1234567890"},
+        SECTION_CONNECTION: {},
+        SECTION_DLB: {DLB: False},
     }
-    coordinator = BenyWifiUpdateCoordinator(
+    config_entry.options = {}
+    return config_entry
+
+@pytest.fixture
+def coordinator(mock_hass, mock_config_entry):
+    """Fixture to create a BenyWifiUpdateCoordinator instance."""
+    return BenyWifiUpdateCoordinator(
         hass=mock_hass,
+        config_entry=mock_config_entry,
         ip_address="192.168.1.100",
         port=502,
         scan_interval=10,
     )
-    coordinator.config_entry = config_entry  # Mock config_entry to avoid 'NoneType' error
+
+@pytest.fixture
+def polled_coordinator(coordinator):
+    """Fixture of a coordinator whose charger capabilities are known and that does not save its data."""
+    coordinator._probe_capabilities = False
+    coordinator._snapshot_store = MagicMock()
     return coordinator
 
+@pytest.fixture
+def charger_state():
+    """Patch the state of the charger state sensor, charging unless a test changes it."""
+    state = MagicMock(state="charging")
+    with patch("custom_components.beny_wifi.coordinator.get_entity_state_by_key", return_value=state):
+        yield state
+
 @pytest.fixture
 def mock_get_states(mock_hass):
     """Fixture to mock hass.states.get."""
     with patch.object(mock_hass.states, "get") as mock_get:
         yield mock_get
 
-@patch("custom_components.beny_wifi.coordinator.BenyWifiUpdateCoordinator._send_udp_request")
-@patch("custom_components.beny_wifi.coordinator.read_message")
-async def test_successful_data_fetch(mock_read_message, mock_send_udp_request, coordinator):
+@pytest.mark.asyncio
+async def test_successful_data_fetch(polled_coordinator):
     """Test successful data fetch from the coordinator."""
-    
-    # Prepare mock response from UDP request (simulated)
-    mock_send_udp_request.return_value = b"55aa1000237000000000e600e600e6000000005e06000000000000000f0000000003ca"
-    
-    # Simulate a valid read_message response
-    mock_read_message.return_value = {
-        "state": "standby",
-        "power": 0.0,
-        "total_kwh": 0.0,
-        "timer_start_h": 8,
-        "timer_start_min": 0,
-        "timer_end_h": 7,
-        "timer_end_min": 30,
-        "timer_state": "UNSET"
-    }
 
-    # Call the update function
-    data = await coordinator._async_update_data()
+    with patch.object(polled_coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp_request:
+        # Charger in standby, timer not set
+        mock_send_udp_request.return_value = STANDBY_VALUES
+
+        data = await polled_coordinator._async_update_data()
 
     # Check if the data was correctly transformed and returned
-    assert data["state"] == "standby"
+    assert data["state"] == "STANDBY"
     assert data["power"] == 0.0
     assert data["total_kwh"] == 0.0
     assert data["timer_start"] == "not_set"
     assert data["timer_end"] == "not_set"
     assert data["timer_state"] == "UNSET"
 
-
-@patch("custom_components.beny_wifi.coordinator.BenyWifiUpdateCoordinator._send_udp_request")
-async def test_udp_request_failure(mock_send_udp_request, coordinator):
+@pytest.mark.asyncio
+async def test_udp_request_failure(polled_coordinator):
     """Test that the coordinator raises an error when the UDP request fails."""
 
-    # Simulate a failure in sending the UDP request
-    mock_send_udp_request.side_effect = Exception("UDP request failed")
-
-    # Call the update function and check if it raises UpdateFailed
-    with pytest.raises(UpdateFailed):
-        await coordinator._async_update_data()  # Ensure this is awaited
-
-@patch("custom_components.beny_wifi.coordinator.read_message")
-@patch("socket.socket")
-async def test_async_toggle_charging_start_with_socket(mock_socket, mock_read_message, coordinator):
-    """Test toggling charging start with simulated socket."""
-
-    # Create a mock socket instance
-    mock_socket_instance = MagicMock()
-    mock_socket.return_value = mock_socket_instance
-
-    # Simulate sending data with `sendto`
-    def mock_sendto(data, addr):
-        assert data == b"55aa10000b0000cb347089"  # Verify the correct request data is sent
-        assert addr == ("192.168.1.100", 502)  # Verify correct IP and port
-    mock_socket_instance.sendto.side_effect = mock_sendto
-
-    # Simulate receiving data with `recvfrom`
-    mock_socket_instance.recvfrom.return_value = (b"55aa10001103499602D2c0a801640d05d8", ("192.168.1.100", 502))
-
-    # Mock the parsed message structure returned by `read_message`
-    mock_read_message.return_value = {
-        "state": "standby",
-        "power": 0.0,
-        "total_kwh": 0.0,
-        "timer_start_h": 8,
-        "timer_start_min": 0,
-        "timer_end_h": 10,
-        "timer_end_min": 30,
-        "timer_state": "START_END_TIME"
-    }
-
-    # Mock the built message
-    with patch("custom_components.beny_wifi.communication.build_message") as mock_build_message:
-        mock_build_message.return_value = b"mocked_request"
+    with patch.object(polled_coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp_request:
+        # Simulate a failure in sending the UDP request
+        mock_send_udp_request.side_effect = UpdateFailed("UDP request failed")
 
-        # Call the coordinator's update method
-        data = await coordinator._async_update_data()
+        with pytest.raises(UpdateFailed, match="UDP request failed"):
+            await polled_coordinator._async_update_data()
 
-        # Assertions
-        assert data["state"] == "standby"
-        assert data["power"] == 0.0
-        assert data["total_kwh"] == 0.0
-        assert isinstance(data["timer_start"], datetime)
-        assert isinstance(data["timer_end"], datetime)
+@pytest.mark.asyncio
+async def test_async_toggle_charging_start_with_transport(polled_coordinator, charger):
+    """Test data fetch over the persistent UDP transport."""
+    values = polled_coordinator._request_frames[REQUEST_TYPE.VALUES]
+    # Charger in standby, timer set from 08:00 to 10:30
+    timer_values = b"55aa1000237000000000e600e600e6000000005e0203000800000a1e0f0000000003f9"
+    charger.answer = lambda frame: (timer_values, 0.01) if frame == values else (STATUS_REPLY, 0.01)
 
-        # Verify socket operations
-        mock_socket.assert_called_once_with(socket.AF_INET, socket.SOCK_DGRAM)
-        mock_socket_instance.settimeout.assert_called_once_with(5)
-        mock_socket_instance.close.assert_called_once()
+    data = await polled_coordinator._async_update_data()
 
-@patch("socket.socket")
-async def test_socket_exception(mock_socket, coordinator):
-    """Test that a socket exception is correctly handled and raises UpdateFailed."""
+    assert data["state"] == "STANDBY"
+    assert data["power"] == 0.0
+    assert data["total_kwh"] == 0.0
+    assert isinstance(data["timer_start"], datetime)
+    assert isinstance(data["timer_end"], datetime)
+    assert (data["timer_start"].hour, data["timer_end"].hour, data["timer_end"].minute) == (8, 10, 30)
 
-    # Create a mock socket instance
-    mock_socket_instance = MagicMock()
-    mock_socket.return_value = mock_socket_instance
+    # Every request went through the transport, not a new socket
+    assert set(charger.sent) == set(polled_coordinator._poll_frames.values())
 
-    # Simulate a socket exception when sending data
-    mock_socket_instance.sendto.side_effect = socket.error("Mocked socket error")
+@pytest.mark.asyncio
+async def test_transport_exception(polled_coordinator):
+    """Test that a transport exception is correctly handled and raises UpdateFailed."""
 
-    # Mock the built message
-    with patch("custom_components.beny_wifi.communication.build_message") as mock_build_message:
-        mock_build_message.return_value = b"55aa10000b0000cb347089"
+    with patch.object(polled_coordinator._transport, "async_request", new_callable=AsyncMock) as mock_request:
+        # Simulate an OS error when sending data
+        mock_request.side_effect = OSError("Mocked socket error")
 
         # Call the coordinator's update method and ensure it raises UpdateFailed
-        with pytest.raises(UpdateFailed, match="Error sending UDP request: Mocked socket error"):
-            await coordinator._async_update_data()
+        with pytest.raises(UpdateFailed, match="Mocked socket error"):
+            await polled_coordinator._async_update_data()
 
-    # Print the mock calls for debugging (optional)
-    print(mock_socket_instance.mock_calls)
+        # Not retried, one attempt per polled request type
+        assert mock_request.await_count == len(polled_coordinator._poll_frames)
 
-    # Verify socket operations
-    mock_socket.assert_called_once_with(socket.AF_INET, socket.SOCK_DGRAM)
-    mock_socket_instance.settimeout.assert_called_once_with(5)
-    mock_socket_instance.sendto.assert_called_once_with(b"55aa10000b0000cb347089", ("192.168.1.100", 502))
-    mock_socket_instance.close.assert_called_once()
+@pytest.mark.asyncio
+async def test_transport_timeout_retries(coordinator):
+    """Test that a timed out request is retried before UpdateFailed is raised."""
 
-@patch("custom_components.beny_wifi.conversions.get_hex")
-@patch("custom_components.beny_wifi.communication.build_message")
-@patch("custom_components.beny_wifi.coordinator.BenyWifiUpdateCoordinator._send_udp_request")
-async def test_toggle_charging_start(mock_send_udp_request, mock_build_message, mock_get_hex, coordinator, mock_hass):
-    """Test the start charging command, with multiple UDP requests."""
+    with patch.object(coordinator._transport, "async_request", new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = TimeoutError()
 
-    # Mock the charger state as 'standby'
-    mock_hass.states.get.return_value = "standby"
+        rto = coordinator._rtt.rto
+        with pytest.raises(UpdateFailed, match="timed out after 3 attempts"):
+            await coordinator._send_udp_request(b"55aa10000b0000cb347089")
 
-    # Mock get_hex to return valid hex string for the start command
-    mock_get_hex.return_value = "01"  # Hex string for 'start' command
+        assert mock_request.await_count == 3
+        # Retransmission timeout doubles on every attempt
+        assert [c.args[1] for c in mock_request.await_args_list] == [rto, rto * 2, rto * 4]
+        assert coordinator._rtt.rto == rto * 2
 
-    # Mock build_message to return a valid request string
-    mock_build_message.return_value = "55aa10000c0000cb34060121"
+@pytest.mark.asyncio
+async def test_state_adaptive_interval(coordinator):
+    """Test values are polled faster right away and slower only after the hold-down."""
 
-    # Mock _send_udp_request to simulate a successful response for each call
-    mock_send_udp_request.side_effect = [
-        b"55aa10000c0000cb34060121",  # First call: charge start request
-    ]
+    coordinator._adapt_values_interval("CHARGING")
+    assert coordinator._poll_intervals[REQUEST_TYPE.VALUES] == coordinator._state_intervals["CHARGING"]
 
-    # Simulate calling async_toggle_charging with 'start' command
-    await coordinator.async_toggle_charging(device_name="Charger1", command="start")
+    # Slowing down waits for the hold-down period
+    coordinator._adapt_values_interval("UNPLUGGED")
+    assert coordinator._poll_intervals[REQUEST_TYPE.VALUES] == coordinator._state_intervals["CHARGING"]
 
-    # Verify the expected sequence of calls to _send_udp_request
-    mock_send_udp_request.assert_has_calls([
-        call("55aa10000c0000cb34060121".encode('ascii')),  # Start charging request
-    ])
+    coordinator._hold_until = 0
+    coordinator._adapt_values_interval("UNPLUGGED")
+    assert coordinator._poll_intervals[REQUEST_TYPE.VALUES] == coordinator._state_intervals["UNPLUGGED"]
 
-    # Check that the sleep and update calls happened (e.g., ensuring async steps)
-    # You can add additional mocks or checks for asyncio.sleep if needed
+    # Starting a session speeds up immediately
+    coordinator._adapt_values_interval("STARTING")
+    assert coordinator._poll_intervals[REQUEST_TYPE.VALUES] == coordinator._state_intervals["STARTING"]
+    assert coordinator.update_interval.total_seconds() == min(coordinator._poll_intervals.values())
 
+@pytest.mark.asyncio
+async def test_unsupported_requests_not_polled(coordinator):
+    """Test request types the charger does not answer are left out of the poll."""
+
+    coordinator.config_entry.data = {
+        **coordinator.config_entry.data,
+        CAPABILITIES: {
+            "header_prefix": "55aa10",
+            "model": "BCP-AT1N-L",
+            "supported": ["MODEL", "VALUES"],
+            "unsupported": ["STATUS", "SETTINGS"],
+        },
+    }
+    coordinator._update_request_frames()
 
+    assert REQUEST_TYPE.VALUES in coordinator._poll_frames
+    assert REQUEST_TYPE.STATUS not in coordinator._poll_frames
+    assert not coordinator._probe_capabilities
 
-@patch("custom_components.beny_wifi.conversions.get_hex")
-@patch("custom_components.beny_wifi.communication.build_message")
-@patch("custom_components.beny_wifi.coordinator.BenyWifiUpdateCoordinator._send_udp_request")
-async def test_toggle_charging_stop(mock_send_udp_request, mock_build_message, mock_get_hex, coordinator, mock_hass):
-    """Test the start charging command, with multiple UDP requests."""
+@pytest.mark.asyncio
+async def test_fault_from_values_without_status(coordinator):
+    """Test the fault keys come from the summary fault code when the charger does not answer STATUS."""
+
+    coordinator.config_entry.data = {
+        **coordinator.config_entry.data,
+        CAPABILITIES: {
+            "header_prefix": "55aa10",
+            "model": "BCP-AT1N-L",
+            "supported": ["MODEL", "VALUES"],
+            "unsupported": ["STATUS", "SETTINGS"],
+        },
+    }
+    coordinator._update_request_frames()
+    # Summary fault code 3 (overload)
+    values = b"55aa100023700d0d0d00e500e500e2005b00af5f06000300000000000f0000000003f9"
 
-    # Mock the charger state as 'standby'
-    mock_hass.states.get.return_value = "standby"
+    with patch.object(coordinator, "_async_request_cycle", new_callable=AsyncMock) as mock_cycle:
+        mock_cycle.return_value = {REQUEST_TYPE.VALUES: (values, 0.01)}
+        data = await coordinator._fetch_data()
 
-    # Mock get_hex to return valid hex string for the start command
-    mock_get_hex.return_value = "00"  # Hex string for 'start' command
+    assert data["fault_code"] == "overload"
+    assert data["overload_fault"] is True
+    assert data["over_voltage_fault"] is False
 
-    # Mock build_message to return a valid request string
-    mock_build_message.return_value = "55aa10000c0000cb34060020"
+@pytest.mark.asyncio
+async def test_probe_timeout_not_unsupported(coordinator):
+    """Test a request type that timed out is probed again instead of marked unsupported."""
 
-    # Mock _send_udp_request to simulate a successful response for each call
-    mock_send_udp_request.side_effect = [
-        b"55aa10000c0000cb34060020",  # First call: charge start request
-    ]
+    replies = {
+        REQUEST_TYPE.MODEL: b"55aa1000200400014243502d4154314e2d4c00000000000000000000011a01df",
+        REQUEST_TYPE.VALUES: b"55aa100023700d0d0d00e500e500e2005b00af5f06000000000000000f0000000003f6",
+        REQUEST_TYPE.SETTINGS: b"55aa10000800",
+    }
 
-    # Simulate calling async_toggle_charging with 'start' command
-    await coordinator.async_toggle_charging(device_name="Charger1", command="stop")
+    async def request(frame, timeout, request_type):
+        if request_type not in replies:
+            raise TimeoutError
+        return replies[request_type]
 
-    # Verify the expected sequence of calls to _send_udp_request
-    mock_send_udp_request.assert_has_calls([
-        call("55aa10000c0000cb34060020".encode('ascii')),  # Start charging request
-    ])
+    with patch.object(coordinator._transport, "async_request", side_effect=request):
+        capabilities = await coordinator.async_probe_capabilities()
 
-    # Check that the sleep and update calls happened (e.g., ensuring async steps)
-    # You can add additional mocks or checks for asyncio.sleep if needed
+    assert capabilities["supported"] == ["MODEL", "VALUES"]
+    assert capabilities["unsupported"] == ["SETTINGS"]
+
+    coordinator.config_entry.data = {**coordinator.config_entry.data, CAPABILITIES: capabilities}
+    coordinator._update_request_frames()
+    assert REQUEST_TYPE.STATUS in coordinator._poll_frames
+    assert coordinator._probe_capabilities
 
 @pytest.mark.asyncio
-async def test_async_set_timer(coordinator):
-    """Test async_set_timer method."""
-    # Mock config_entry and SERIAL
-    coordinator.config_entry = MagicMock()
-    coordinator.config_entry.data = {"serial": "some_serial"}
+async def test_listeners_notified_on_change(coordinator):
+    """Test only listeners of changed data keys are notified."""
+
+    calls = []
+    for key in ("power", "charger_state", "grid_power", None):
+        coordinator.async_add_listener(lambda key=key: calls.append(key), key)
+
+    coordinator.last_update_success = True
+    coordinator.data = {"power": 1.0, "charger_state": "charging"}
+    coordinator.async_update_listeners()
+    assert calls == ["power", "charger_state", "grid_power", None]
+
+    calls.clear()
+    coordinator.data = {"power": 2.0, "charger_state": "charging"}
+    coordinator.async_update_listeners()
+    assert calls == [None, "power"]
+
+    # A field going stale changes its availability
+    calls.clear()
+    coordinator._update_stale("grid_power", None)
+    coordinator._valid_at["grid_power"] -= coordinator.stale_window
+    coordinator._update_stale("grid_power", None)
+    coordinator.async_update_listeners()
+    assert calls == [None, "grid_power"]
+
+    # Failed update changes availability of every entity
+    calls.clear()
+    coordinator.last_update_success = False
+    coordinator.async_update_listeners()
+    assert calls == ["power", "charger_state", "grid_power", None]
+
+def test_field_stale_after_window(coordinator):
+    """Test a DLB field goes stale after the stale window without a value, however often it is polled."""
+    for _ in range(100):
+        coordinator._update_stale("grid_power", None)
+    assert not coordinator.is_field_stale("grid_power")
+
+    coordinator._valid_at["grid_power"] -= coordinator.stale_window
+    coordinator._update_stale("grid_power", None)
+    assert coordinator.is_field_stale("grid_power")
+
+    coordinator._update_stale("grid_power", 1200)
+    assert not coordinator.is_field_stale("grid_power")
 
-    # Mock state sensor in Home Assistant
+@pytest.mark.asyncio
+async def test_toggle_charging_start(coordinator, charger_state):
+    """Test the start charging command, and the refresh of the values it changes."""
+    charger_state.state = "standby"
+
+    with (
+        patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock, return_value=COMMAND_ACK) as mock_send_udp_request,
+        patch.object(coordinator, "_async_refresh_after_command") as mock_refresh,
+    ):
+        await coordinator.async_toggle_charging(device_name="Charger1", command="start")
+
+    mock_send_udp_request.assert_awaited_once_with(b"55aa10000c0000cb34060121")
+    mock_refresh.assert_called_once_with(REQUEST_TYPE.VALUES)
+
+@pytest.mark.asyncio
+async def test_toggle_charging_stop(coordinator, charger_state):
+    """Test the stop charging command."""
+    with (
+        patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock, return_value=COMMAND_ACK) as mock_send_udp_request,
+        patch.object(coordinator, "_async_refresh_after_command"),
+    ):
+        await coordinator.async_toggle_charging(device_name="Charger1", command="stop")
+
+    mock_send_udp_request.assert_awaited_once_with(b"55aa10000c0000cb34060020")
+
+@pytest.mark.asyncio
+async def test_async_set_timer(coordinator, charger_state):
+    """Test async_set_timer method."""
     device_name = "Test Charger"
-    start_time = "08:00"
-    end_time = "10:00"
-    state_sensor_id = "sensor.some_serial_charger_state"
-    state_sensor_value = "charging"
-    coordinator.hass.states.get.return_value = state_sensor_value
 
     # Mock the _send_udp_request and build_message
     with patch("custom_components.beny_wifi.coordinator.build_message", return_value="mock_message"), \
          patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp, \
+         patch.object(coordinator, "_async_refresh_after_command") as mock_refresh, \
          patch("custom_components.beny_wifi.coordinator._LOGGER") as mock_logger:
-        # mock_send_udp will return bytes, so no need to encode
-        mock_send_udp.return_value = b"mock_message"
-
-        await coordinator.async_set_timer(device_name, start_time, end_time)
+        mock_send_udp.return_value = COMMAND_ACK
 
-        # Verify the state sensor was checked
-        coordinator.hass.states.get.assert_called_once_with(state_sensor_id)
+        await coordinator.async_set_timer(device_name, "08:00", "10:00")
 
         # Verify the UDP request was sent with the mock message as bytes
         mock_send_udp.assert_called_once_with(b"mock_message")
+        mock_refresh.assert_called_once_with(REQUEST_TYPE.VALUES)
 
         # Verify logging
         mock_logger.info.assert_called_once_with(f"{device_name}: charging timer set")
 
-
 @pytest.mark.asyncio
-async def test_async_reset_timer(coordinator):
+async def test_async_reset_timer(coordinator, charger_state):
     """Test async_reset_timer method."""
-    # Mock config_entry and SERIAL
-    coordinator.config_entry = MagicMock()
-    coordinator.config_entry.data = {"serial": "some_serial"}
-
-    # Mock state sensor in Home Assistant
     device_name = "Test Charger"
-    state_sensor_id = "sensor.some_serial_charger_state"
-    state_sensor_value = "charging"
-    coordinator.hass.states.get.return_value = state_sensor_value
 
-    # Mock the _send_udp_request and build_message
-    with patch("custom_components.beny_wifi.coordinator.build_message", return_value="mock_message"), \
-         patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp, \
+    with patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp, \
+         patch.object(coordinator, "_async_refresh_after_command"), \
          patch("custom_components.beny_wifi.coordinator._LOGGER") as mock_logger:
-        # mock_send_udp will return bytes, so no need to encode
-        mock_send_udp.return_value = b"mock_message"
+        mock_send_udp.return_value = COMMAND_ACK
 
         await coordinator.async_reset_timer(device_name)
 
-        # Verify the state sensor was checked
-        coordinator.hass.states.get.assert_called_once_with(state_sensor_id)
-
-        # Verify the UDP request was sent with the mock message as bytes
-        mock_send_udp.assert_called_once_with(b"mock_message")
+        mock_send_udp.assert_called_once_with(b"55aa10001c0000cb34690000000000000000000000000000171035ef")
 
         # Verify logging
         mock_logger.info.assert_called_once_with(f"{device_name}: charging timer reset")
 
 @pytest.mark.asyncio
-async def test_async_set_timer_unplugged(coordinator):
+async def test_async_set_timer_unplugged(coordinator, charger_state):
     """Test async_set_timer method when charger is unplugged."""
-    device_name = "Test Charger"
-    start_time = "08:00"
-    end_time = "10:00"
-    state_sensor_value = "unplugged"
-    coordinator.hass.states.get.return_value = state_sensor_value
+    charger_state.state = "unplugged"
 
     # Ensure _send_udp_request is not called
     with patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp:
-        await coordinator.async_set_timer(device_name, start_time, end_time)
-
-        # Verify the state sensor was checked
-        coordinator.hass.states.get.assert_called_once()
+        await coordinator.async_set_timer("Test Charger", "08:00", "10:00")
 
         # Verify no UDP request was sent
         mock_send_udp.assert_not_called()
 
-
 @pytest.mark.asyncio
-async def test_async_reset_timer_unplugged(coordinator):
+async def test_async_reset_timer_unplugged(coordinator, charger_state):
     """Test async_reset_timer method when charger is unplugged."""
-    device_name = "Test Charger"
-    state_sensor_value = "unplugged"
-    coordinator.hass.states.get.return_value = state_sensor_value
+    charger_state.state = "unplugged"
 
     # Ensure _send_udp_request is not called
     with patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp:
-        await coordinator.async_reset_timer(device_name)
-
-        # Verify the state sensor was checked
-        coordinator.hass.states.get.assert_called_once()
+        await coordinator.async_reset_timer("Test Charger")
 
         # Verify no UDP request was sent
         mock_send_udp.assert_not_called()
@@ -353,25 +427,414 @@ async def test_timer_end_adjustment(coordinator):
     assert end == "not_set"
 
 @pytest.mark.asyncio
-async def test_edge_case_midnight(coordinator):
+async def test_edge_case_midnight(coordinator, charger_state):
     """Test timer logic for midnight as start and end times."""
-    device_name = "Test Charger"
-    start_time = "00:00"
-    end_time = "23:59"
-
-    with patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp:
-        await coordinator.async_set_timer(device_name, start_time, end_time)
+    with patch.object(coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp, \
+         patch.object(coordinator, "_async_refresh_after_command"):
+        mock_send_udp.return_value = COMMAND_ACK
+        await coordinator.async_set_timer("Test Charger", "00:00", "23:59")
         mock_send_udp.assert_called_once()
 
-@patch("custom_components.beny_wifi.coordinator.BenyWifiUpdateCoordinator._send_udp_request")
-async def test_state_mapping(mock_send_udp_request, coordinator):
+@pytest.mark.asyncio
+async def test_state_mapping(polled_coordinator):
     """Test state mapping to verify proper translation."""
 
-    # Mock valid UDP response data
-    mock_send_udp_request.return_value = b"55aa1000237000000000e600e700e6000000005e06000000000000000f0000000003cb"
+    with patch.object(polled_coordinator, "_send_udp_request", new_callable=AsyncMock) as mock_send_udp_request:
+        # Mock valid UDP response data
+        mock_send_udp_request.return_value = b"55aa1000237000000000e600e700e6000000005e06000000000000000f0000000003cb"
 
-    # Call update method
-    data = await coordinator._async_update_data()
+        # Call update method
+        data = await polled_coordinator._async_update_data()
 
     # Validate state mapping
-    assert data["state"] == "CHARGING"  # Expected mapping for 6102
\ No newline at end of file
+    assert data["state"] == "CHARGING"  # Expected mapping for 6102
+
+def test_read_dlb_ack():
+    """Test the config echoed by a SET_DLB_CONFIG ACK is read, other replies are not ACKs."""
+    assert BenyWifiUpdateCoordinator._read_dlb_ack(b"55aa6b00120000cb346b0100ff0016063f41") == {
+        "dlb_enabled": 1,
+        "extreme": 0,
+        "dlb_mode": 0xff,
+        "night": 0,
+        "night_start": 22,
+        "night_end": 6,
+        "anti_overload": 0x3f,
+    }
+    assert BenyWifiUpdateCoordinator._read_dlb_ack(b"55aa10000869") is None
+
+
+@pytest.fixture
+def call_later():
+    """Patch async_call_later to run the action on the event loop after the delay."""
+
+    def async_call_later(hass, delay, action):
+        loop = asyncio.get_running_loop()
+        handle = loop.call_later(delay, lambda: loop.create_task(action(None)))
+        return handle.cancel
+
+    with patch("custom_components.beny_wifi.coordinator.async_call_later", side_effect=async_call_later) as mock:
+        yield mock
+
+
+@pytest.mark.asyncio
+async def test_schedule_write_debounced(coordinator, call_later):
+    """Test only the last write of a key within the write delay is sent."""
+    coordinator._write_delay = 0.01
+    first, last = AsyncMock(), AsyncMock()
+
+    with patch.object(coordinator, "_async_refresh_after_command") as mock_refresh:
+        coordinator.async_schedule_write("max_current", first)
+        coordinator.async_schedule_write("max_current", last)
+        assert coordinator.is_write_pending("max_current")
+        await asyncio.sleep(0.05)
+
+    first.assert_not_awaited()
+    last.assert_awaited_once()
+    mock_refresh.assert_called_once()
+    assert not coordinator.is_write_pending("max_current")
+
+
+@pytest.mark.asyncio
+async def test_flush_write(coordinator, call_later):
+    """Test a pending write is sent right away when flushed, and only once."""
+    coordinator._write_delay = 0.01
+    apply = AsyncMock()
+
+    with patch.object(coordinator, "_async_refresh_after_command"):
+        coordinator.async_schedule_write("max_current", apply)
+        assert await coordinator.async_flush_write("max_current")
+        apply.assert_awaited_once()
+        assert not await coordinator.async_flush_write("max_current")
+        await asyncio.sleep(0.05)
+
+    apply.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_write_failure_logged(coordinator, call_later):
+    """Test a write failing on a closed queue is logged and the charger refreshed."""
+    coordinator._write_delay = 0.01
+    apply = AsyncMock(side_effect=ConnectionError("Command queue closed"))
+
+    with patch.object(coordinator, "_async_refresh_after_command") as mock_refresh:
+        coordinator.async_schedule_write("max_current", apply)
+        await asyncio.sleep(0.05)
+
+    apply.assert_awaited_once()
+    mock_refresh.assert_called_once()
+    assert not coordinator.is_write_pending("max_current")
+
+
+@pytest.mark.asyncio
+async def test_command_refresh_waits_for_poll(coordinator):
+    """Test the refresh after a command polls only the changed types, never during a poll."""
+    coordinator.data = {"power": 1.0}
+    data = {"power": 1.0, "charger_state": "charging"}
+
+    with (
+        patch("custom_components.beny_wifi.coordinator.async_call_later") as mock_call_later,
+        patch.object(coordinator, "_fetch_data", new_callable=AsyncMock, return_value=data) as mock_fetch,
+        patch.object(coordinator, "async_set_updated_data") as mock_set_updated,
+    ):
+        coordinator._async_refresh_after_command(REQUEST_TYPE.STATUS)
+        coordinator._async_refresh_after_command(REQUEST_TYPE.VALUES)
+        mock_call_later.assert_called_once()
+
+        async with coordinator._poll_lock:
+            refresh = asyncio.create_task(coordinator._async_command_refresh())
+            await asyncio.sleep(0)
+            mock_fetch.assert_not_awaited()
+        await refresh
+
+    mock_fetch.assert_awaited_once_with({REQUEST_TYPE.STATUS, REQUEST_TYPE.VALUES})
+    mock_set_updated.assert_called_once_with(data)
+
+
+@pytest.mark.asyncio
+async def test_wait_command_refresh(coordinator, call_later):
+    """Test waiting for the refresh after a command returns once it has been published."""
+    coordinator.data = {"max_current": 16}
+    data = {"max_current": 10}
+
+    with (
+        patch("custom_components.beny_wifi.coordinator.COMMAND_REFRESH_DELAY", 0.01),
+        patch.object(coordinator, "_fetch_data", new_callable=AsyncMock, return_value=data) as mock_fetch,
+        patch.object(coordinator, "async_set_updated_data") as mock_set_updated,
+    ):
+        coordinator._async_refresh_after_command(REQUEST_TYPE.VALUES)
+        await asyncio.wait_for(coordinator.async_wait_command_refresh(), 1)
+        mock_set_updated.assert_called_once_with(data)
+
+        # Without a pending refresh one is requested
+        await asyncio.wait_for(coordinator.async_wait_command_refresh(), 1)
+
+    assert mock_fetch.await_args_list[0].args == ({REQUEST_TYPE.VALUES},)
+    assert mock_fetch.await_count == 2
+
+
+@pytest.fixture
+def dlb_coordinator(coordinator):
+    """Fixture of a polled coordinator whose DLB config frames are echoed back by the charger."""
+    coordinator.data = {}
+    coordinator.config_entry.async_create_background_task = (
+        lambda hass, coro, name: asyncio.get_running_loop().create_task(coro)
+    )
+
+    async def echo(kind, request, refresh=None):
+        return request
+
+    with (
+        patch.object(coordinator, "_async_send_command", side_effect=echo) as mock_send,
+        patch.object(coordinator, "_async_persist_dlb_config"),
+        patch("custom_components.beny_wifi.coordinator.DLB_SYNC_BACKOFF_MIN", 0),
+        patch("custom_components.beny_wifi.coordinator.DLB_SYNC_BACKOFF_MAX", 0),
+    ):
+        yield coordinator, mock_send
+
+
+@pytest.mark.asyncio
+async def test_set_dlb_config_confirmed(dlb_coordinator):
+    """Test the desired DLB config is confirmed by the echoing ACK."""
+    coordinator, mock_send = dlb_coordinator
+
+    await coordinator.async_set_dlb_config("charger", night_start=21)
+
+    mock_send.assert_awaited_once()
+    assert coordinator._dlb_confirmed["night_start"] == 21
+    assert not coordinator.dlb_config_pending
+    assert coordinator.data["dlb_config"]["pending"] is False
+
+
+@pytest.mark.asyncio
+async def test_set_hybrid_current(dlb_coordinator):
+    """Test the hybrid current is only stored outside Hybrid mode and sent in it."""
+    coordinator, mock_send = dlb_coordinator
+
+    await coordinator.async_set_hybrid_current("charger", 20)
+    mock_send.assert_not_awaited()
+    assert coordinator.data["dlb_config"]["hybrid_current"] == 20
+    assert not coordinator.dlb_config_pending
+    coordinator._async_persist_dlb_config.assert_called_once()
+
+    with pytest.raises(ValueError):
+        await coordinator.async_set_hybrid_current("charger", 99)
+    assert coordinator.data["dlb_config"]["hybrid_current"] == 20
+
+    await coordinator.async_set_dlb_config("charger", dlb_mode=DLB_MODE.HYBRID)
+    await coordinator.async_set_hybrid_current("charger", 12)
+    assert mock_send.await_count == 2
+    assert coordinator._dlb_confirmed["dlb_mode"] == 12
+
+
+@pytest.mark.asyncio
+async def test_confirmed_dlb_config(dlb_coordinator):
+    """Test the confirmed DLB config keeps the values of the charger until it echoes the desired ones."""
+    coordinator, mock_send = dlb_coordinator
+    mock_send.side_effect = lambda kind, request, refresh=None: b"55aa10000869"
+
+    with (
+        patch("custom_components.beny_wifi.coordinator.DLB_SYNC_ATTEMPTS", 1),
+        pytest.raises(HomeAssistantError),
+    ):
+        await coordinator.async_set_dlb_config("charger", dlb_mode=DLB_MODE.HYBRID, hybrid_current=12, night_start=21)
+
+    assert coordinator.data["dlb_config"]["night_start"] == 21
+    assert coordinator.confirmed_dlb_config["night_start"] == coordinator._dlb_confirmed["night_start"] != 21
+    assert coordinator.confirmed_dlb_config["hybrid_current"] == 12
+    assert coordinator.confirmed_dlb_config["dlb_mode"] == 0xff
+
+
+@pytest.mark.asyncio
+async def test_set_dlb_config_invalid_not_applied(dlb_coordinator):
+    """Test nothing is changed or sent when a later argument is out of range."""
+    coordinator, mock_send = dlb_coordinator
+    desired = dict(coordinator._dlb_config)
+
+    with pytest.raises(ValueError):
+        await coordinator.async_set_dlb_config("charger", night_start=21, anti_overload_value=150)
+
+    assert coordinator._dlb_config == desired
+    assert not coordinator.dlb_config_pending
+    mock_send.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_set_dlb_config_coalesced(dlb_coordinator):
+    """Test changes made while a frame is in flight are sent together in the next frame."""
+    coordinator, mock_send = dlb_coordinator
+    in_flight, release = asyncio.Event(), asyncio.Event()
+    frames = []
+
+    async def slow_echo(kind, request, refresh=None):
+        frames.append(request)
+        in_flight.set()
+        await release.wait()
+        return request
+
+    mock_send.side_effect = slow_echo
+    first = asyncio.create_task(coordinator.async_set_dlb_config("charger", night_start=21))
+    await in_flight.wait()
+    second = asyncio.create_task(coordinator.async_set_dlb_config("charger", night_end=5))
+    third = asyncio.create_task(coordinator.async_set_dlb_config("charger", night_mode=True))
+    await asyncio.sleep(0)
+    assert coordinator.dlb_config_pending
+    release.set()
+    await asyncio.gather(first, second, third)
+
+    assert len(frames) == 2
+    assert BenyWifiUpdateCoordinator._read_dlb_ack(frames[1]) == coordinator._dlb_frame()
+    assert (coordinator._dlb_confirmed["night_start"], coordinator._dlb_confirmed["night_end"]) == (21, 5)
+    assert coordinator._dlb_confirmed["night"] == 1
+    assert not coordinator.dlb_config_pending
+
+
+@pytest.mark.asyncio
+async def test_set_dlb_config_not_confirmed(dlb_coordinator):
+    """Test a config the charger does not echo is retried with backoff, then stays pending."""
+    coordinator, mock_send = dlb_coordinator
+    mock_send.side_effect = None
+    mock_send.return_value = b"55aa10000869"
+
+    with (
+        patch("custom_components.beny_wifi.coordinator.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+        pytest.raises(HomeAssistantError),
+    ):
+        await coordinator.async_set_dlb_config("charger", night_start=21)
+
+    assert mock_send.await_count == DLB_SYNC_ATTEMPTS
+    assert mock_sleep.await_count == DLB_SYNC_ATTEMPTS - 1
+    assert coordinator.dlb_config_pending
+    assert coordinator.data["dlb_config"]["pending"] is True
+    assert coordinator._dlb_failed_syncs == 1
+
+
+@pytest.mark.asyncio
+async def test_dlb_config_retried_after_poll(dlb_coordinator):
+    """Test a pending config is sent again after successful polls until it failed DLB_SYNC_RETRIES syncs."""
+    coordinator, _ = dlb_coordinator
+    coordinator._dlb_config = {**coordinator._dlb_config, "night_start": 21}
+    coordinator._probe_capabilities = False
+
+    with (
+        patch.object(coordinator, "_fetch_data", new_callable=AsyncMock, return_value={}),
+        patch.object(coordinator._snapshot_store, "async_delay_save"),
+        patch.object(coordinator, "_async_start_dlb_sync") as mock_start_sync,
+    ):
+        for failed_syncs in range(DLB_SYNC_RETRIES + 1):
+            coordinator._dlb_failed_syncs = failed_syncs
+            await coordinator._async_poll_charger()
+
+    assert mock_start_sync.call_count == DLB_SYNC_RETRIES
+
+
+@pytest.mark.asyncio
+async def test_dlb_config_moved_from_options(mock_hass, mock_config_entry):
+    """Test a DLB config kept in the entry options is moved to the store as confirmed."""
+    mock_config_entry.options = {"dlb_config": {"night_start": 21}, "other": 1}
+    coordinator = BenyWifiUpdateCoordinator(mock_hass, mock_config_entry, "192.168.1.100", 502, 10)
+
+    with (
+        patch.object(coordinator._dlb_store, "async_load", new_callable=AsyncMock, return_value=None),
+        patch.object(coordinator._dlb_store, "async_save", new_callable=AsyncMock) as mock_save,
+    ):
+        await coordinator.async_load_dlb_config()
+
+    saved = mock_save.await_args.args[0]
+    assert saved["desired"]["night_start"] == saved["confirmed"]["night_start"] == 21
+    mock_hass.config_entries.async_update_entry.assert_called_once_with(mock_config_entry, options={"other": 1})
+    assert not coordinator.dlb_config_pending
+
+
+@pytest.mark.asyncio
+async def test_dlb_config_loaded_pending(coordinator):
+    """Test a desired config the charger had not confirmed is still pending after a restart."""
+    confirmed = coordinator._dlb_frame()
+    desired = {**coordinator._dlb_config, "night_start": 21}
+
+    with patch.object(
+        coordinator._dlb_store, "async_load", new_callable=AsyncMock,
+        return_value={"desired": desired, "confirmed": confirmed},
+    ):
+        await coordinator.async_load_dlb_config()
+
+    assert coordinator._dlb_config == desired
+    assert coordinator._dlb_confirmed == confirmed
+    assert coordinator.dlb_config_pending
+
+
+def test_dlb_config_delayed_save(coordinator):
+    """Test changes of the DLB config are saved with a delay, desired and confirmed apart."""
+    coordinator._dlb_config = {**coordinator._dlb_config, "night_start": 21}
+
+    with patch.object(coordinator._dlb_store, "async_delay_save") as mock_delay_save:
+        coordinator._async_persist_dlb_config()
+        mock_delay_save.assert_called_once_with(coordinator._dlb_store_data, DLB_CONFIG_SAVE_DELAY)
+        assert coordinator._dlb_save_pending
+
+        saved = coordinator._dlb_store_data()
+        assert saved["desired"]["night_start"] == 21
+        assert saved["confirmed"] == coordinator._dlb_confirmed
+        assert not coordinator._dlb_save_pending
+
+        # Nothing changed since it was written
+        coordinator._async_persist_dlb_config()
+        mock_delay_save.assert_called_once()
+
+
+def test_snapshot_without_dlb_config(coordinator):
+    """Test the DLB config is left out of the snapshot, it has its own store."""
+    coordinator.data = {"power": 1.0, "dlb_config": coordinator._dlb_config_state()}
+
+    assert coordinator._snapshot()["data"] == {"power": 1.0}
+
+
+@pytest.fixture
+def charger(coordinator):
+    """Fixture of a fake charger behind the coordinator's transport."""
+    charger = FakeCharger(coordinator._transport)
+    coordinator._transport._transport = charger
+    return charger
+
+
+@pytest.mark.asyncio
+async def test_command_waits_for_request_in_flight(coordinator, charger):
+    """Test a command is sent only once the request in flight has its reply, so replies are not swapped."""
+    values = coordinator._request_frames[REQUEST_TYPE.VALUES]
+    command = b"55aa10000c0000cb34060121"
+    # The denial of the probe arrives before the ACK of the command would
+    charger.answer = lambda frame: (ACCESS_DENIED, 0.02) if frame == values else (COMMAND_ACK, 0.02)
+
+    probe = asyncio.create_task(coordinator._async_probe())
+    await asyncio.sleep(0)
+    reply = await coordinator._async_send_command("charging", command)
+
+    assert reply == COMMAND_ACK
+    assert await probe
+    assert charger.sent == [values, command]
+
+
+@pytest.mark.asyncio
+async def test_command_waits_for_request_cycle(coordinator, charger):
+    """Test a command queued during a pipelined cycle neither takes nor gives away its replies."""
+    requests = {
+        request_type: coordinator._request_frames[request_type]
+        for request_type in (REQUEST_TYPE.VALUES, REQUEST_TYPE.STATUS)
+    }
+    status_reply = b"55aa1000156e0000000000000000"
+    command = b"55aa10000c0000cb34060121"
+    replies = {
+        requests[REQUEST_TYPE.VALUES]: (ACCESS_DENIED, 0.01),
+        requests[REQUEST_TYPE.STATUS]: (status_reply, 0.01),
+        command: (COMMAND_ACK, 0.02),
+    }
+    charger.answer = replies.get
+
+    cycle = asyncio.create_task(coordinator._async_request_cycle(requests))
+    await asyncio.sleep(0)
+    reply = await coordinator._async_send_command("charging", command)
+    result = await cycle
+
+    assert reply == COMMAND_ACK
+    assert result[REQUEST_TYPE.VALUES][0] == ACCESS_DENIED
+    assert result[REQUEST_TYPE.STATUS][0] == status_reply
+    assert charger.sent[-1] == command
@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from custom_components.beny_wifi.const import REQUEST_TYPE
+from custom_components.beny_wifi.discovery import (
+    BenyWifiDiscoveryProtocol,
+    BenyWifiSweepProtocol,
+    async_identify_charger,
+    async_rediscover_charger,
+    async_sweep_subnet,
+)
+
+MODEL_REPLY = b"55aa1000200400004243502d4154314e2d4c00c2"
+VALUES_REPLY = b"55aa1000237000000000e600e600e6000000005e06000000000000000f0000000003ca"
+ACCESS_DENIED = b"55aa10000869"
+HANDSHAKE_REPLY = b"55aa03001100075bcd157f0000010d05e9"
+
+
+def test_discovery_protocol_keeps_first_reply():
+    """Test only the first reply of every responder is kept."""
+    protocol = BenyWifiDiscoveryProtocol()
+    protocol.datagram_received(b"first", ("192.168.1.10", 3333))
+    protocol.datagram_received(b"second", ("192.168.1.10", 3333))
+    protocol.datagram_received(b"other", ("192.168.1.11", 3333))
+
+    assert protocol.replies == {"192.168.1.10": b"first", "192.168.1.11": b"other"}
+
+
+@pytest.mark.asyncio
+async def test_identify_charger():
+    """Test model and pin are read in one exchange."""
+    async def reply(request, timeout, reply_key):
+        return MODEL_REPLY if reply_key is REQUEST_TYPE.MODEL else VALUES_REPLY
+
+    with patch("custom_components.beny_wifi.discovery.BenyWifiTransport.async_request", side_effect=reply):
+        assert await async_identify_charger("192.168.1.10", 3333, "0cb34") == {
+            "model": "BCP-AT1N-L",
+            "pin_valid": True,
+        }
+
+
+@pytest.mark.asyncio
+async def test_identify_charger_other_header_prefix():
+    """Test a model request denied for its header prefix does not mark the pin invalid."""
+    async def reply(request, timeout, reply_key):
+        if reply_key is REQUEST_TYPE.MODEL:
+            return ACCESS_DENIED if request.startswith(b"55aa10") else MODEL_REPLY
+        return VALUES_REPLY
+
+    with patch(
+        "custom_components.beny_wifi.discovery.BenyWifiTransport.async_request", side_effect=reply
+    ) as mock_request:
+        assert await async_identify_charger("192.168.1.10", 3333, "0cb34") == {
+            "model": "BCP-AT1N-L",
+            "pin_valid": True,
+        }
+
+    # one request at a time: both header prefixes, then the values
+    assert [c.args[2] for c in mock_request.await_args_list] == [REQUEST_TYPE.MODEL, REQUEST_TYPE.MODEL, REQUEST_TYPE.VALUES]
+
+
+@pytest.mark.asyncio
+async def test_identify_charger_wrong_pin():
+    """Test a denied request marks the pin invalid."""
+    with patch(
+        "custom_components.beny_wifi.discovery.BenyWifiTransport.async_request",
+        new_callable=AsyncMock,
+        return_value=ACCESS_DENIED,
+    ):
+        assert await async_identify_charger("192.168.1.10", 3333, "0cb34") == {"model": None, "pin_valid": False}
+
+
+@pytest.mark.asyncio
+async def test_identify_charger_no_reply():
+    """Test a charger that does not answer is reported as such."""
+    with patch(
+        "custom_components.beny_wifi.discovery.BenyWifiTransport.async_request",
+        new_callable=AsyncMock,
+        side_effect=TimeoutError(),
+    ) as mock_request:
+        assert await async_identify_charger("192.168.1.10", 3333, "0cb34") == {"model": None, "pin_valid": None}
+
+    # every request is retried once
+    assert mock_request.await_count == 6
+
+
+def test_sweep_protocol_resolves_waiting_host():
+    """Test a reply resolves only the handshake waiting for its address."""
+    loop = asyncio.new_event_loop()
+    protocol = BenyWifiSweepProtocol()
+    future = protocol.waiting["192.168.1.10"] = loop.create_future()
+
+    protocol.datagram_received(b"other", ("192.168.1.11", 3333))
+    assert not future.done()
+    protocol.datagram_received(b"reply", ("192.168.1.10", 3333))
+    protocol.datagram_received(b"again", ("192.168.1.10", 3333))
+    assert future.result() == b"reply"
+    loop.close()
+
+
+@pytest.mark.asyncio
+async def test_sweep_subnet():
+    """Test the sweep yields the charger answering in the subnet."""
+    loop = asyncio.get_running_loop()
+    sent = []
+
+    async def create_datagram_endpoint(protocol_factory, local_addr):
+        protocol = protocol_factory()
+        transport = MagicMock()
+
+        def sendto(data, addr):
+            sent.append(addr)
+            if addr[0] == "127.0.0.1":
+                # only the charger answers, the other host times out
+                loop.call_soon(protocol.datagram_received, HANDSHAKE_REPLY, addr)
+
+        transport.sendto = sendto
+        return transport, protocol
+
+    with (
+        patch.object(loop, "create_datagram_endpoint", side_effect=create_datagram_endpoint),
+        patch("custom_components.beny_wifi.discovery.SWEEP_TIMEOUT", 0.1),
+    ):
+        chargers = [charger async for charger in async_sweep_subnet("123456789", "0cb34", 3333, "127.0.0.0/30")]
+
+    assert chargers == [{"serial_number": 123456789, "ip_address": "127.0.0.1", "port": 3333}]
+    assert sorted(sent) == [("127.0.0.1", 3333), ("127.0.0.2", 3333)]
+
+
+@pytest.mark.asyncio
+async def test_rediscover_charger_shares_broadcast():
+    """Test entries rediscovering at once share one broadcast and its replies are cached."""
+    hass = MagicMock()
+    hass.data = {}
+    hass.async_create_task = lambda coro, name=None: asyncio.get_running_loop().create_task(coro)
+    chargers = [
+        {"serial_number": 123456789, "ip_address": "192.168.1.20", "port": 3333},
+        {"serial_number": 987654321, "ip_address": "192.168.1.21", "port": 3333},
+    ]
+
+    with patch(
+        "custom_components.beny_wifi.discovery.async_discover_chargers",
+        new_callable=AsyncMock,
+        return_value=chargers,
+    ) as mock_discover:
+        found = await asyncio.gather(
+            async_rediscover_charger(hass, "123456789", "0cb34", 3333),
+            async_rediscover_charger(hass, "987654321", "0cb34", 3333),
+        )
+        assert found == chargers
+        assert mock_discover.await_count == 1
+
+        # a charger that did not answer is not broadcast for again within the TTL
+        assert await async_rediscover_charger(hass, "111111111", "0cb34", 3333) is None
+        assert await async_rediscover_charger(hass, "111111111", "0cb34", 3333) is None
+        assert mock_discover.await_count == 2
@@ -1,11 +1,11 @@
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 
-from custom_components.beny_wifi import async_setup_entry, async_unload_entry
-from custom_components.beny_wifi.const import DOMAIN, CONF_IP, CONF_PORT, SCAN_INTERVAL, PLATFORMS
+from custom_components.beny_wifi import async_remove_entry, async_setup_entry, async_unload_entry
+from custom_components.beny_wifi.const import DOMAIN, IP_ADDRESS, PORT, SCAN_INTERVAL, PLATFORMS, SECTION_CONNECTION
 
 @pytest.mark.asyncio
 async def test_async_setup_entry(hass: HomeAssistant):
@@ -15,9 +15,11 @@ async def test_async_setup_entry(hass: HomeAssistant):
         domain=DOMAIN,
         title="Beny WiFi",
         data={
-            CONF_IP: "192.168.1.100",
-            CONF_PORT: 8080,
-            SCAN_INTERVAL: 10,
+            SECTION_CONNECTION: {
+                IP_ADDRESS: "192.168.1.100",
+                PORT: 8080,
+                SCAN_INTERVAL: 10,
+            },
         },
         source="user",
         entry_id="test",
@@ -28,15 +30,19 @@ async def test_async_setup_entry(hass: HomeAssistant):
     )
 
     coordinator_mock = AsyncMock()
-    
+    coordinator_mock.async_reschedule = MagicMock()
+
     with patch("custom_components.beny_wifi.BenyWifiUpdateCoordinator", return_value=coordinator_mock) as mock_coordinator, \
          patch("custom_components.beny_wifi.async_setup_services", new_callable=AsyncMock) as mock_setup_services, \
          patch("homeassistant.config_entries.ConfigEntries.async_forward_entry_setups", new_callable=AsyncMock) as mock_forward_setups:
 
-        # Test successful setup
+        # Test successful setup, no saved data so the first refresh is awaited
+        coordinator_mock.async_restore_snapshot.return_value = False
         coordinator_mock.async_config_entry_first_refresh.return_value = None
         assert await async_setup_entry(hass, entry) is True
-        mock_coordinator.assert_called_once_with(hass, "192.168.1.100", 8080, 10)
+        mock_coordinator.assert_called_once_with(hass, entry, "192.168.1.100", 8080, 10, ANY, ANY)
+        coordinator_mock.async_load_dlb_config.assert_awaited_once()
+        coordinator_mock.async_config_entry_first_refresh.assert_awaited_once()
         mock_setup_services.assert_awaited_once()
         mock_forward_setups.assert_awaited_once_with(entry, PLATFORMS)
         assert DOMAIN in hass.data
@@ -47,6 +53,14 @@ async def test_async_setup_entry(hass: HomeAssistant):
         with pytest.raises(ConfigEntryNotReady):
             await async_setup_entry(hass, entry)
 
+        # Test setup from saved data, the charger is polled in the background
+        coordinator_mock.async_config_entry_first_refresh.reset_mock()
+        coordinator_mock.async_restore_snapshot.return_value = True
+        assert await async_setup_entry(hass, entry) is True
+        await hass.async_block_till_done()
+        coordinator_mock.async_refresh.assert_awaited_once()
+        coordinator_mock.async_config_entry_first_refresh.assert_not_awaited()
+
 
 @pytest.mark.asyncio
 async def test_async_unload_entry(hass: HomeAssistant):
@@ -56,9 +70,11 @@ async def test_async_unload_entry(hass: HomeAssistant):
         domain=DOMAIN,
         title="Beny WiFi",
         data={
-            CONF_IP: "192.168.1.100",
-            CONF_PORT: 8080,
-            SCAN_INTERVAL: 10,
+            SECTION_CONNECTION: {
+                IP_ADDRESS: "192.168.1.100",
+                PORT: 8080,
+                SCAN_INTERVAL: 10,
+            },
         },
         source="user",
         entry_id="test",
@@ -79,3 +95,17 @@ async def test_async_unload_entry(hass: HomeAssistant):
         assert await async_unload_entry(hass, entry) is True
         mock_unload_platforms.assert_awaited_once_with(entry, PLATFORMS)
         assert entry.entry_id not in hass.data[DOMAIN]
+
+
+@pytest.mark.asyncio
+async def test_async_remove_entry(hass: HomeAssistant):
+    """Test the snapshot and the DLB config of a removed entry are deleted."""
+    entry = MagicMock()
+    entry.entry_id = "test"
+
+    with patch("custom_components.beny_wifi.Store") as mock_store:
+        mock_store.return_value.async_remove = AsyncMock()
+        await async_remove_entry(hass, entry)
+
+    assert [c.args[2] for c in mock_store.call_args_list] == [f"{DOMAIN}.test", f"{DOMAIN}.test.dlb_config"]
+    assert mock_store.return_value.async_remove.await_count == 2
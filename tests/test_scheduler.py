@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import MagicMock
+from custom_components.beny_wifi.scheduler import BenyWifiPollScheduler
+
+
+def test_slots_spread_over_interval():
+    """Test chargers polling at the same interval get evenly spaced slots."""
+    scheduler = BenyWifiPollScheduler(max_in_flight=2)
+    coordinators = [MagicMock() for _ in range(4)]
+    for coordinator in coordinators:
+        scheduler.register(coordinator)
+
+    assert [scheduler.next_slot(coordinator, 100.0, 10) for coordinator in coordinators] == [
+        pytest.approx(110.0),
+        pytest.approx(102.5),
+        pytest.approx(105.0),
+        pytest.approx(107.5),
+    ]
+
+
+def test_slot_keeps_distance_from_previous_poll():
+    """Test a slot less than a quarter interval away is skipped."""
+    scheduler = BenyWifiPollScheduler(max_in_flight=2)
+    first, second = MagicMock(), MagicMock()
+    scheduler.register(first)
+    scheduler.register(second)
+
+    assert scheduler.next_slot(second, 104.0, 10) == pytest.approx(105.0 + 10)
+    assert scheduler.next_slot(second, 102.0, 10) == pytest.approx(105.0)
+
+
+def test_rebalance_on_add_and_remove():
+    """Test phases are recomputed and polls rescheduled when chargers come and go."""
+    scheduler = BenyWifiPollScheduler(max_in_flight=2)
+    first, second = MagicMock(), MagicMock()
+    scheduler.register(first)
+    assert scheduler.phase(first) == 0
+
+    scheduler.register(second)
+    assert scheduler.phase(second) == 0.5
+    first.async_reschedule.assert_called()
+
+    first.async_reschedule.reset_mock()
+    scheduler.unregister(first)
+    assert first not in scheduler
+    assert scheduler.phase(second) == 0
+    second.async_reschedule.assert_called()
+    first.async_reschedule.assert_not_called()
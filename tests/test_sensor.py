@@ -7,8 +7,8 @@ from custom_components.beny_wifi.sensor import (
     BenyWifiEnergySensor,
     BenyWifiPowerSensor,
     BenyWifiSensor,
-    BenyWifiTimerSensor
-
+    BenyWifiTimerSensor,
+    PublishPolicy,
 )
 from custom_components.beny_wifi.const import DOMAIN
 from custom_components.beny_wifi.sensor import async_setup_entry
@@ -155,3 +155,24 @@ async def test_async_setup_entry(mock_hass, mock_config_entry, mock_coordinator)
     assert sensor.entity_id == "sensor.1234567890_charger_state"
     assert sensor.unique_id == "1234567890_charger_state"
     assert sensor.state is None
+
+
+def test_publish_policy():
+    """Test deadband, minimum interval and heartbeat of the publishing policy."""
+    policy = PublishPolicy(deadband=5, relative_deadband=0.25, min_interval=60, heartbeat=900)
+
+    assert policy.next_publish(40, 40, 0) is None
+    # Inside the deadband, held back until the heartbeat
+    assert policy.next_publish(40, 44, 100) == 800
+    assert policy.next_publish(40, 44, 1000) == 0
+    # Outside the deadband, held back until the minimum interval
+    assert policy.next_publish(40, 60, 10) == 50
+    assert policy.next_publish(40, 60, 60) == 0
+    # Data becoming unavailable or available again is published right away
+    assert policy.next_publish(40, None, 0) == 0
+    assert policy.next_publish(None, 40, 0) == 0
+    # An unchanged value is written again once the heartbeat has passed
+    assert policy.next_publish(40, 40, 900) == 0
+    # Changed attributes are published like a significant change
+    assert policy.next_publish(40, 40, 10, attributes_changed=True) == 50
+    assert policy.next_publish(40, 40, 60, attributes_changed=True) == 0
@@ -0,0 +1,154 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from custom_components.beny_wifi.const import CIRCUIT_STATE, REQUEST_TYPE
+from custom_components.beny_wifi.transport import (
+    BenyWifiTransport,
+    BenyWifiTransportHub,
+    CircuitBreaker,
+    CommandQueue,
+    RttEstimator,
+    reply_key,
+)
+
+
+def test_rtt_first_sample():
+    """Test first sample initializes SRTT and RTTVAR."""
+    rtt = RttEstimator(min_rto=0.2, max_rto=8.0, initial_rto=2.0)
+    assert rtt.rto == 2.0
+
+    rtt.update(0.1)
+    assert rtt.srtt == pytest.approx(0.1)
+    assert rtt.rttvar == pytest.approx(0.05)
+    assert rtt.rto == pytest.approx(0.3)
+
+
+def test_rtt_smoothing():
+    """Test subsequent samples are smoothed."""
+    rtt = RttEstimator(min_rto=0.01, max_rto=8.0, initial_rto=2.0)
+    rtt.update(0.1)
+    rtt.update(0.2)
+    assert rtt.rttvar == pytest.approx(0.75 * 0.05 + 0.25 * 0.1)
+    assert rtt.srtt == pytest.approx(0.875 * 0.1 + 0.125 * 0.2)
+    assert rtt.rto == pytest.approx(rtt.srtt + 4 * rtt.rttvar)
+
+
+def test_rtt_clamped_to_bounds():
+    """Test RTO stays between floor and ceiling."""
+    rtt = RttEstimator(min_rto=0.2, max_rto=1.0, initial_rto=2.0)
+    assert rtt.rto == 1.0
+
+    rtt.update(0.001)
+    assert rtt.rto == 0.2
+
+    rtt.update(5.0)
+    assert rtt.rto == 1.0
+
+
+def test_rtt_backoff_and_budget():
+    """Test RTO backs off on timeout and budget follows retransmissions."""
+    rtt = RttEstimator(min_rto=0.2, max_rto=1.0, initial_rto=0.3)
+    assert rtt.budget(3) == pytest.approx(0.3 + 0.6 + 1.0)
+
+    rtt.timed_out()
+    assert rtt.rto == pytest.approx(0.6)
+    rtt.timed_out()
+    assert rtt.rto == 1.0
+
+
+def test_circuit_breaker_opens_after_threshold():
+    """Test breaker opens after consecutive failures and allows one probe per window."""
+    breaker = CircuitBreaker(failure_threshold=3, min_backoff=10, max_backoff=40, jitter=0)
+    assert not breaker.record_failure(0)
+    assert not breaker.record_failure(1)
+    assert breaker.record_failure(2)
+    assert breaker.state == CIRCUIT_STATE.OPEN
+    assert breaker.retry_at == 12
+
+    assert not breaker.allow_probe(11)
+    assert breaker.allow_probe(12)
+    assert breaker.state == CIRCUIT_STATE.HALF_OPEN
+    assert not breaker.allow_probe(12)
+
+
+def test_circuit_breaker_backoff():
+    """Test failed probes double the backoff up to the maximum."""
+    breaker = CircuitBreaker(failure_threshold=1, min_backoff=10, max_backoff=25, jitter=0)
+    breaker.record_failure(0)
+
+    for now, backoff in ((10, 20), (30, 25), (55, 25)):
+        assert breaker.allow_probe(now)
+        assert not breaker.record_failure(now)
+        assert breaker.backoff == backoff
+        assert breaker.retry_at == now + backoff
+
+    breaker.retry_now(60)
+    assert breaker.retry_at == 60
+    assert breaker.allow_probe(60)
+    assert breaker.record_success()
+    assert breaker.state == CIRCUIT_STATE.CLOSED
+    assert not breaker.record_success()
+
+
+def test_reply_key():
+    """Test replies are keyed by their request type byte."""
+    assert reply_key(b"55aa7b00117b0000011200000200ff9cb6") == REQUEST_TYPE.DLB
+    # access denied has no payload, the byte after the header is the checksum
+    assert reply_key(b"55aa10000869") is None
+    assert reply_key(b"55aa10000b00zz") is None
+
+
+def test_hub_routes_by_source_address():
+    """Test frames reach the transport of the charger they came from, also after it moved."""
+    hub = BenyWifiTransportHub()
+    first = BenyWifiTransport("192.168.1.10", 3333, hub)
+    second = BenyWifiTransport("192.168.1.11", 3333, hub)
+    first.handle_datagram = MagicMock()
+    second.handle_datagram = MagicMock()
+    hub.register(first)
+    hub.register(second)
+
+    hub.handle_datagram(b"frame", ("192.168.1.11", 3333))
+    second.handle_datagram.assert_called_once_with(b"frame", ("192.168.1.11", 3333))
+    first.handle_datagram.assert_not_called()
+
+    first.ip_address = "192.168.1.20"
+    hub.handle_datagram(b"frame", ("192.168.1.10", 3333))
+    hub.handle_datagram(b"frame", ("192.168.1.20", 3333))
+    first.handle_datagram.assert_called_once_with(b"frame", ("192.168.1.20", 3333))
+
+    assert hub.as_dict() == {"chargers": 2, "sent": 0, "received": 3, "unrouted": 1, "errors": 0}
+
+    first.close()
+    second.close()
+    assert hub.as_dict()["chargers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_command_queue_coalesces_superseded_writes():
+    """Test commands are sent one at a time and only the latest of a kind waiting is sent."""
+    queue = CommandQueue()
+    sent = []
+    release = asyncio.Event()
+
+    def command(value):
+        async def send():
+            sent.append(value)
+            await release.wait()
+            return value
+        return send
+
+    first = asyncio.create_task(queue.async_submit("max_current", command(10)))
+    await asyncio.sleep(0)
+    # queued while the first one is being sent
+    second = asyncio.create_task(queue.async_submit("max_current", command(12)))
+    timer = asyncio.create_task(queue.async_submit("timer", command("timer")))
+    third = asyncio.create_task(queue.async_submit("max_current", command(16)))
+    await asyncio.sleep(0)
+    assert queue.as_dict() == {"depth": 3, "sent": 0, "coalesced": 1}
+
+    release.set()
+    assert await asyncio.gather(first, second, timer, third) == [10, 16, "timer", 16]
+    assert sent == [10, 16, "timer"]
+    await queue.async_wait_idle()
+    assert queue.as_dict() == {"depth": 0, "sent": 3, "coalesced": 1}
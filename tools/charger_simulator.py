@@ -4,6 +4,7 @@ import time
 import os
 import binascii
 import re
+import sys
 from copy import deepcopy
 
 from const import SERVER_MESSAGE
@@ -14,8 +15,9 @@ import struct
 
 CONFIG_FILE = "messages_beny_pedrov.json"
 #CONFIG_FILE = "messages_22032025.json"
-UDP_IP = "0.0.0.0"
-UDP_PORT = 3333
+# Bind address and port can be given as arguments, e.g. to run several chargers on 127.0.0.x
+UDP_IP = sys.argv[1] if len(sys.argv) > 1 else "0.0.0.0"
+UDP_PORT = int(sys.argv[2]) if len(sys.argv) > 2 else 3333
 
 def ip_to_hex(ip: str) -> str:
     """Convert an IPv4 address string to a hex string."""
@@ -52,7 +54,7 @@ last_modified = None
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 sock.bind((UDP_IP, UDP_PORT))
 
-print(f"Listening for UDP packets on port {UDP_PORT}...")
+print(f"Listening for UDP packets on {UDP_IP}:{UDP_PORT}...")
 
 while True:
     try: